@@ -2,21 +2,115 @@
 # app/api/routes/chat.py
 # ======================
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+import asyncio
+import json
 import time
-from typing import Dict, Any
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 
-from app.models.chat import ChatRequest, ChatResponse, ErrorResponse, HealthResponse
-from app.services.search_service import SearchService
+from app.models.chat import (
+    BatchChatRequest, BatchChatResponse, BatchChatResult, ChatRequest, ChatResponse, ErrorResponse, HealthResponse
+)
+from app.services.search_service import WALRUS_NETWORK_FALLBACK, SearchService
 from app.services.ai_service import AIService
 from app.services.validation_service import ValidationService
-from app.core.dependencies import get_search_service, get_ai_service, get_validation_service
+from app.services.answer_cache import AnswerCache
+from app.services.semantic_cache import SemanticAnswerCache
+from app.core.config import settings
+from app.core.dependencies import (
+    get_search_service, get_ai_service, get_validation_service, get_answer_cache, get_semantic_cache
+)
+from app.utils.deadline import deadline_scope
 from app.utils.exceptions import SuiBotException, ValidationError, SearchError, AIServiceError
 from app.utils.logger import get_logger
+from app.utils.metrics import SPECULATION, STAGE_SECONDS
+from app.utils.tracing import set_attributes
 
 router = APIRouter()
 logger = get_logger(__name__)
 
+NO_CONTEXT_FALLBACK = "No specific search results found, but I can provide information based on my training data about blockchain, Sui, Move, and Walrus topics."
+SEARCH_ERROR_RESPONSE = "I couldn't find information about your question in the Sui docs or Move book. Please try rephrasing your question."
+
+
+async def _cached_answer(
+        query: str, answer_cache: AnswerCache, semantic_cache: Optional[SemanticAnswerCache]
+) -> Optional[str]:
+    """Exact-match answer first, then the answer to a near-duplicate question"""
+    answer = await answer_cache.get(query) if settings.answer_cache_enabled else None
+    if answer is None and semantic_cache is not None:
+        answer = await semantic_cache.get(query)
+    set_attributes({"cache.hit": answer is not None})
+    return answer
+
+
+async def _remember_answer(
+        query: str,
+        answer: str,
+        context: Optional[str],
+        answer_cache: AnswerCache,
+        semantic_cache: Optional[SemanticAnswerCache]
+) -> None:
+    # Without real search context (nothing found, deadline spent, circuits open, an upstream
+    # outage) the answer is a degraded one; caching it would keep serving it after a recovery
+    if context is None or context == WALRUS_NETWORK_FALLBACK:
+        logger.info("Not caching an answer generated without search context")
+        return
+    if settings.answer_cache_enabled:
+        await answer_cache.set(query, answer)
+    if semantic_cache is not None:
+        await semantic_cache.set(query, answer)
+
+
+def _discard_result(task: asyncio.Future) -> None:
+    # Retrieve the outcome of a task nobody awaits, so asyncio does not log it as never retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+async def _speculative_answer(
+        query: str, search_service: SearchService, ai_service: AIService, deadline: Optional[float]
+) -> Tuple[str, Optional[str]]:
+    """Answer ``query``, overlapping a no-context (STEP 11) answer with the external search.
+
+    Local knowledge is checked first. If it has nothing, the no-context answer and
+    the external search start together: a search that finds context within the
+    grace window cancels the speculative call and a contextual answer is
+    generated; otherwise the speculative answer is used. Both search phases
+    share the one ``deadline``, as in search_sui_docs.
+
+    Returns the answer and the search context it was generated from (None for
+    the speculative answer).
+    """
+    with deadline_scope(deadline if deadline is not None else settings.search_deadline_seconds):
+        context = await search_service.search_local(query, deadline=deadline)
+        if context is None:
+            search = asyncio.ensure_future(search_service.search_external(query, deadline=deadline))
+    if context is not None:
+        set_attributes({"search.context_found": True})
+        return await ai_service.agenerate_response(query, context), context
+
+    speculative = asyncio.ensure_future(ai_service.agenerate_response(query, NO_CONTEXT_FALLBACK))
+    try:
+        done, _ = await asyncio.wait({search}, timeout=settings.speculative_grace_seconds)
+        context = search.result() if done else None
+        set_attributes({"search.context_found": context is not None})
+        if context is None:
+            outcome = "speculative" if not done else "no_context"
+            logger.info(f"Using speculative answer ({outcome})")
+            SPECULATION.inc(outcome=outcome)
+            return await speculative, None
+
+        speculative.cancel()
+        SPECULATION.inc(outcome="contextual")
+        return await ai_service.agenerate_response(query, context), context
+    finally:
+        for task in (speculative, search):
+            if not task.done():
+                task.cancel()
+            task.add_done_callback(_discard_result)
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -30,7 +124,9 @@ async def chat(
         request: ChatRequest,
         search_service: SearchService = Depends(get_search_service),
         ai_service: AIService = Depends(get_ai_service),
-        validation_service: ValidationService = Depends(get_validation_service)
+        validation_service: ValidationService = Depends(get_validation_service),
+        answer_cache: AnswerCache = Depends(get_answer_cache),
+        semantic_cache: Optional[SemanticAnswerCache] = Depends(get_semantic_cache)
 ):
 
     start_time = time.time()
@@ -38,16 +134,38 @@ async def chat(
     try:
         logger.info(f"Received chat request: {request.query[:50]}...")
 
-        validated_query = validation_service.validate_query(request.query)
+        with STAGE_SECONDS.time(stage="validation"):
+            validated_query = validation_service.validate_query(request.query)
 
+        # Live price/network answers go stale quickly, so they bypass the cache
+        use_cache = not search_service.is_realtime_query(validated_query)
+        if use_cache:
+            cached_answer = await _cached_answer(validated_query, answer_cache, semantic_cache)
+            if cached_answer is not None:
+                processing_time = time.time() - start_time
+                logger.info(f"Served cached answer in {processing_time:.2f}s")
+                return ChatResponse(
+                    success=True,
+                    response=cached_answer,
+                    query=validated_query,
+                    context_found=True,
+                    processing_time=round(processing_time, 2),
+                    cached=True
+                )
 
-        context = search_service.search_sui_docs(validated_query)
+        if settings.speculative_generation_enabled:
+            ai_response, context = await _speculative_answer(
+                validated_query, search_service, ai_service, request.search_deadline
+            )
+        else:
+            context = await search_service.search_sui_docs(validated_query, deadline=request.search_deadline)
+            set_attributes({"search.context_found": context is not None})
 
-        # If no context found, still let AI service handle with its knowledge
-        if context is None:
-            context = "No specific search results found, but I can provide information based on my training data about blockchain, Sui, Move, and Walrus topics."
+            # If no context found, still let AI service handle with its knowledge
+            ai_response = await ai_service.agenerate_response(validated_query, context or NO_CONTEXT_FALLBACK)
 
-        ai_response = ai_service.generate_response(validated_query, context)
+        if use_cache:
+            await _remember_answer(validated_query, ai_response, context, answer_cache, semantic_cache)
 
         processing_time = time.time() - start_time
 
@@ -71,7 +189,7 @@ async def chat(
         logger.error(f"Search error: {e.message}")
         return ChatResponse(
             success=False,
-            response="I couldn't find information about your question in the Sui docs or Move book. Please try rephrasing your question.",
+            response=SEARCH_ERROR_RESPONSE,
             query=request.query,
             context_found=False,
             processing_time=round(time.time() - start_time, 2)
@@ -90,6 +208,218 @@ async def chat(
         )
 
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+        request: ChatRequest,
+        search_service: SearchService = Depends(get_search_service),
+        ai_service: AIService = Depends(get_ai_service),
+        validation_service: ValidationService = Depends(get_validation_service),
+        answer_cache: AnswerCache = Depends(get_answer_cache),
+        semantic_cache: Optional[SemanticAnswerCache] = Depends(get_semantic_cache)
+):
+    """Server-Sent Events version of /chat.
+
+    Emits ``token`` events (``{"text": ...}``) as the answer is generated and a final
+    ``done`` event carrying the ChatResponse; generation failures end the stream
+    with an ``error`` event instead.
+    """
+    start_time = time.time()
+    logger.info(f"Received streaming chat request: {request.query[:50]}...")
+
+    # Validation errors still get a regular HTTP error, before the stream starts
+    try:
+        with STAGE_SECONDS.time(stage="validation"):
+            validated_query = validation_service.validate_query(request.query)
+    except ValidationError as e:
+        logger.warning(f"Validation error: {e.message}")
+        raise HTTPException(
+            status_code=e.status_code,
+            detail={"error": "Validation Error", "message": e.message}
+        )
+
+    use_cache = not search_service.is_realtime_query(validated_query)
+
+    def done(response: str, success: bool = True, context_found: bool = True, cached: bool = False) -> str:
+        return _sse("done", ChatResponse(
+            success=success,
+            response=response,
+            query=validated_query,
+            context_found=context_found,
+            processing_time=round(time.time() - start_time, 2),
+            cached=cached
+        ).model_dump())
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            cached_answer = await _cached_answer(validated_query, answer_cache, semantic_cache) if use_cache else None
+            if cached_answer is not None:
+                yield _sse("token", {"text": cached_answer})
+                yield done(cached_answer, cached=True)
+                return
+
+            try:
+                context = await search_service.search_sui_docs(validated_query, deadline=request.search_deadline)
+            except SearchError as e:
+                logger.error(f"Search error: {e.message}")
+                yield _sse("token", {"text": SEARCH_ERROR_RESPONSE})
+                yield done(SEARCH_ERROR_RESPONSE, success=False, context_found=False)
+                return
+
+            parts = []
+            async for text in ai_service.astream_response(validated_query, context or NO_CONTEXT_FALLBACK):
+                parts.append(text)
+                yield _sse("token", {"text": text})
+            ai_response = "".join(parts)
+
+            if use_cache:
+                await _remember_answer(validated_query, ai_response, context, answer_cache, semantic_cache)
+
+            logger.info(f"Successfully streamed response in {time.time() - start_time:.2f}s")
+            yield done(ai_response)
+
+        except AIServiceError as e:
+            logger.error(f"AI service error: {e.message}")
+            yield _sse("error", {"error": "AI Service Error", "message": "Failed to generate response"})
+        except Exception as e:
+            logger.error(f"Unexpected error: {str(e)}")
+            yield _sse("error", {"error": "Internal Server Error", "message": "An unexpected error occurred"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the client as they are produced
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch(
+        request: BatchChatRequest,
+        search_service: SearchService = Depends(get_search_service),
+        ai_service: AIService = Depends(get_ai_service),
+        validation_service: ValidationService = Depends(get_validation_service),
+        answer_cache: AnswerCache = Depends(get_answer_cache),
+        semantic_cache: Optional[SemanticAnswerCache] = Depends(get_semantic_cache)
+):
+    """Answer a list of questions in one request.
+
+    Queries that normalise to the same text are answered once. Retrieval for all
+    unique queries runs concurrently, generation is limited to
+    ``batch_generation_concurrency`` OpenAI calls at a time, and results come back
+    in request order with per-item errors.
+    """
+    start_time = time.time()
+    logger.info(f"Received batch chat request with {len(request.queries)} queries")
+
+    # Validate every item up front; invalid ones become error results
+    validated: List[Optional[str]] = []
+    errors: Dict[int, str] = {}
+    for index, query in enumerate(request.queries):
+        try:
+            with STAGE_SECONDS.time(stage="validation"):
+                validated.append(validation_service.validate_query(query))
+        except ValidationError as e:
+            validated.append(None)
+            errors[index] = e.message
+
+    unique: Dict[str, str] = {}
+    for query in validated:
+        if query is not None:
+            unique.setdefault(validation_service.normalize_query(query), query)
+
+    search_limit = asyncio.Semaphore(settings.batch_search_concurrency)
+    generation_limit = asyncio.Semaphore(settings.batch_generation_concurrency)
+
+    async def answer(query: str) -> Tuple[bool, str, bool, bool]:
+        """(success, response, context_found, cached) for one unique query"""
+        use_cache = not search_service.is_realtime_query(query)
+        if use_cache:
+            cached_answer = await _cached_answer(query, answer_cache, semantic_cache)
+            if cached_answer is not None:
+                return True, cached_answer, True, True
+
+        async with search_limit:
+            try:
+                context = await search_service.search_sui_docs(query, deadline=request.search_deadline)
+            except SearchError as e:
+                logger.error(f"Search error: {e.message}")
+                return False, SEARCH_ERROR_RESPONSE, False, False
+
+        async with generation_limit:
+            ai_response = await ai_service.agenerate_response(query, context or NO_CONTEXT_FALLBACK)
+
+        if use_cache:
+            await _remember_answer(query, ai_response, context, answer_cache, semantic_cache)
+        return True, ai_response, True, False
+
+    outcomes = await asyncio.gather(*(answer(query) for query in unique.values()), return_exceptions=True)
+    answers = dict(zip(unique, outcomes))
+
+    results = []
+    for index, query in enumerate(validated):
+        if query is None:
+            results.append(BatchChatResult(success=False, query=request.queries[index], error=errors[index]))
+            continue
+        outcome = answers[validation_service.normalize_query(query)]
+        if isinstance(outcome, AIServiceError):
+            results.append(BatchChatResult(success=False, query=query, error="Failed to generate response"))
+        elif isinstance(outcome, BaseException):
+            logger.error(f"Unexpected error in batch item {index}: {str(outcome)}")
+            results.append(BatchChatResult(success=False, query=query, error="An unexpected error occurred"))
+        else:
+            success, response, context_found, cached = outcome
+            results.append(BatchChatResult(
+                success=success, response=response, query=query, context_found=context_found, cached=cached
+            ))
+
+    processing_time = time.time() - start_time
+    logger.info(f"Processed batch of {len(results)} ({len(unique)} unique) in {processing_time:.2f}s")
+
+    return BatchChatResponse(
+        results=results,
+        total=len(results),
+        unique_queries=len(unique),
+        processing_time=round(processing_time, 2)
+    )
+
+
+@router.get("/cache/stats")
+async def cache_stats(
+        search_service: SearchService = Depends(get_search_service),
+        ai_service: AIService = Depends(get_ai_service),
+        semantic_cache: Optional[SemanticAnswerCache] = Depends(get_semantic_cache)
+) -> Dict[str, Any]:
+    return {
+        "search": search_service.search_cache.stats() if search_service.search_cache else None,
+        "semantic": semantic_cache.stats() if semantic_cache else None,
+        "single_flight": {
+            "search": search_service.inflight.stats(),
+            "generation": ai_service.inflight.stats()
+        }
+    }
+
+
+@router.get("/live-data")
+async def live_data_status(search_service: SearchService = Depends(get_search_service)) -> Dict[str, Any]:
+    return {
+        "running": search_service.live_data.running,
+        "snapshots": search_service.live_data.status()
+    }
+
+
+@router.get("/circuits")
+async def circuit_status(search_service: SearchService = Depends(get_search_service)) -> Dict[str, Any]:
+    return {
+        "enabled": settings.circuit_breaker_enabled,
+        "providers": search_service.circuit_status(),
+        "hedging": search_service.hedging_status()
+    }
+
+
 @router.get("/info")
 async def get_api_info() -> Dict[str, Any]:
     return {
@@ -1,6 +1,6 @@
 # app/core/config.py
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -9,6 +9,9 @@ class Settings(BaseSettings):
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    # gunicorn.conf.py: worker processes (0 = one per CPU core) and seconds before a stuck worker is restarted
+    web_workers: int = 0
+    web_worker_timeout: int = 120
 
     openai_api_key: str
     tavily_api_key: Optional[str] = None
@@ -16,7 +19,100 @@ class Settings(BaseSettings):
     ai_model: str = "gpt-4o-mini"
     ai_max_tokens: int = 500
     ai_temperature: float = 0.2
+    ai_max_connections: int = 50
+    ai_request_timeout: float = 30.0
+    # Sends prompt_cache_key with every completion; turn off for OpenAI-compatible servers that reject unknown fields
+    ai_prompt_cache_key_enabled: bool = True
 
+    # Upstream API base URLs; point them at local stubs for load tests (see benchmarks/load_test.py)
+    openai_base_url: Optional[str] = None
+    tavily_base_url: str = "https://api.tavily.com"
+    duckduckgo_base_url: str = "https://api.duckduckgo.com"
+    coingecko_base_url: str = "https://api.coingecko.com/api/v3"
+    walrusscan_base_url: str = "https://api.walrusscan.com/api/v1"
+    suiscan_base_url: str = "https://api.suiscan.xyz/api/v1"
+
+    # Outbound HTTP: limits apply to each host's own connection pool
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 10.0
+    http2_enabled: bool = False
+    http_dns_cache_ttl: float = 300.0
+    # Skip a provider for circuit_breaker_recovery_seconds after this many failed/slow calls in a row
+    circuit_breaker_enabled: bool = True
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_slow_call_seconds: float = 5.0
+    circuit_breaker_recovery_seconds: float = 30.0
+    # Hedging: duplicate a provider call still running after its p90 latency, first answer wins
+    hedging_enabled: bool = True
+    hedge_quantile: float = 0.9
+    hedge_window: int = 200
+    hedge_min_samples: int = 20
+    hedge_min_delay_seconds: float = 0.05
+    # Hedging a POST repeats it; Tavily bills every search, so only idempotent GETs are hedged by default
+    hedge_post_requests: bool = False
+    # "sequential" walks search tiers one by one, "fanout" starts them all at once
+    search_mode: Literal["sequential", "fanout"] = "sequential"
+    # Total time search_sui_docs may spend before the AI answers without context;
+    # requests may ask for less or more, up to the max
+    search_deadline_seconds: float = 8.0
+    search_deadline_max_seconds: float = 30.0
+    # Start a no-context answer alongside the external search; use it unless the
+    # search finds context within the grace window
+    speculative_generation_enabled: bool = False
+    speculative_grace_seconds: float = 1.5
+
+    # Semantic answer cache: near-duplicate questions reuse an earlier answer
+    # Off by default: needs OpenAI embeddings ("hashing" is accepted but refused, it matches unrelated questions)
+    semantic_cache_enabled: bool = False
+    semantic_cache_embedding_model: str = "text-embedding-3-small"
+    semantic_cache_threshold: float = 0.85
+    semantic_cache_max_entries: int = 1000
+
+    search_cache_enabled: bool = True
+    search_cache_max_entries: int = 2000
+    search_cache_docs_ttl: int = 86400
+    search_cache_web_ttl: int = 21600
+    search_cache_price_ttl: int = 60
+    search_cache_stats_ttl: int = 300
+    search_cache_stale_factor: float = 1.0
+
+    live_data_refresh_enabled: bool = True
+    live_data_refresh_interval: float = 60.0
+
+    semantic_search_enabled: bool = True
+    embedding_index_path: str = "app/data/embeddings/local_chunks.npy"
+    embedding_dim: int = 1024
+    semantic_search_top_k: int = 3
+    # Hashed word-overlap cosine: unrelated questions reach ~0.3 against some chunk, so stay above that
+    semantic_search_min_score: float = 0.4
+
+    # Concurrent identical queries share one search / OpenAI call
+    single_flight_enabled: bool = True
+
+    # Prompt context: token budget, passage size for ranking, overlap at which a passage counts as a duplicate
+    context_max_tokens: int = 1500
+    context_passage_tokens: int = 200
+    context_dedupe_threshold: float = 0.8
+
+    # Metrics
+    metrics_enabled: bool = True
+
+    # Tracing
+    tracing_exporter: Literal["none", "console", "file"] = "none"
+    tracing_file_path: str = "traces.jsonl"
+
+    # Batch chat: queries per request and how many run search / OpenAI at once
+    batch_max_queries: int = 500
+    batch_search_concurrency: int = 20
+    batch_generation_concurrency: int = 8
+
+    answer_cache_enabled: bool = True
+    answer_cache_backend: Literal["memory", "redis"] = "memory"
+    answer_cache_ttl: int = 3600
+    answer_cache_max_entries: int = 1000
+    redis_url: Optional[str] = None
 
     log_level: str = "INFO"
 
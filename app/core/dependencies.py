@@ -2,9 +2,12 @@
 # app/core/dependencies.py
 # ======================
 from functools import lru_cache
+from typing import Optional
 from app.services.search_service import SearchService
 from app.services.ai_service import AIService
 from app.services.validation_service import ValidationService
+from app.services.answer_cache import AnswerCache, build_answer_cache
+from app.services.semantic_cache import SemanticAnswerCache, build_semantic_cache
 
 @lru_cache()
 def get_search_service() -> SearchService:
@@ -18,3 +21,10 @@ def get_ai_service() -> AIService:
 def get_validation_service() -> ValidationService:
     return ValidationService()
 
+@lru_cache()
+def get_answer_cache() -> AnswerCache:
+    return build_answer_cache()
+
+@lru_cache()
+def get_semantic_cache() -> Optional[SemanticAnswerCache]:
+    return build_semantic_cache(get_ai_service())
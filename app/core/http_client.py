@@ -0,0 +1,153 @@
+# ======================
+# app/core/http_client.py
+# ======================
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+import ssl
+import time
+import typing
+from typing import Dict, List, Optional, Tuple
+
+import httpcore
+import httpx
+
+from app.core.config import settings
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_dns_backend: Optional["CachingDNSBackend"] = None
+_ssl_context: Optional[ssl.SSLContext] = None
+
+
+class CachingDNSBackend(httpcore.AsyncNetworkBackend):
+    """Network backend that caches name resolution for ``ttl`` seconds.
+
+    The connection is opened to a cached address while TLS still verifies the
+    original hostname, which httpcore passes separately as the SNI name.
+    """
+
+    def __init__(self, ttl: float, backend: Optional[httpcore.AsyncNetworkBackend] = None):
+        self.ttl = ttl
+        self._backend = backend or httpcore.AnyIOBackend()
+        self._cache: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+
+    async def resolve(self, host: str, port: int) -> List[str]:
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+
+        entry = self._cache.get((host, port))
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except OSError as e:
+            raise httpcore.ConnectError(f"Could not resolve {host}: {e}") from e
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+        return addresses
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: Optional[float] = None,
+        local_address: Optional[str] = None,
+        socket_options: Optional[typing.Iterable[httpcore.SOCKET_OPTION]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        last_error: Optional[Exception] = None
+        for address in await self.resolve(host, port):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout=timeout, local_address=local_address, socket_options=socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                last_error = e
+        # Every cached address failed: resolve again on the next attempt
+        self._cache.pop((host, port), None)
+        raise last_error or httpcore.ConnectError(f"No addresses for {host}")
+
+    async def connect_unix_socket(
+        self,
+        path: str,
+        timeout: Optional[float] = None,
+        socket_options: Optional[typing.Iterable[httpcore.SOCKET_OPTION]] = None,
+    ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout=timeout, socket_options=socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def _http2_enabled() -> bool:
+    if not settings.http2_enabled:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the h2 package is not installed - using HTTP/1.1")
+        return False
+    return True
+
+
+def prepare_http_resources() -> None:
+    """Build the process-wide SSL context (CA bundle load) and DNS cache that every pool shares.
+
+    Safe to call before forking workers: neither holds sockets or an event loop.
+    """
+    global _dns_backend, _ssl_context
+    if _ssl_context is None:
+        _ssl_context = httpx.create_ssl_context()
+    if settings.http_dns_cache_ttl > 0 and _dns_backend is None:
+        _dns_backend = CachingDNSBackend(ttl=settings.http_dns_cache_ttl)
+
+
+def _use_network_backend(transport: httpx.AsyncHTTPTransport, backend: httpcore.AsyncNetworkBackend) -> bool:
+    """Swap the network backend of the transport's httpcore pool.
+
+    httpx has no resolver hook, so this sets private attributes of httpx
+    (``_pool``) and httpcore (``_network_backend``). Both packages are pinned to
+    the major versions that have them and a test checks they still exist; if
+    they ever disappear the pool keeps its own backend and only DNS caching is lost.
+    """
+    pool = getattr(transport, "_pool", None)
+    if not isinstance(pool, httpcore.AsyncConnectionPool) or not hasattr(pool, "_network_backend"):
+        logger.warning("httpx transport has no httpcore network backend to replace - DNS cache disabled")
+        return False
+    pool._network_backend = backend
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    prepare_http_resources()
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry,
+    )
+    transport = httpx.AsyncHTTPTransport(verify=_ssl_context, limits=limits, http2=_http2_enabled())
+    if _dns_backend is not None:
+        _use_network_backend(transport, _dns_backend)
+    return httpx.AsyncClient(transport=transport, timeout=settings.http_timeout, follow_redirects=True)
+
+
+def get_http_client(url: str) -> httpx.AsyncClient:
+    """Return the pooled client for ``url``'s host and port (one pool per host), creating it on first use."""
+    host = httpx.URL(url).netloc.decode("ascii")
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _clients[host] = _build_client()
+    return client
+
+
+async def close_http_client() -> None:
+    """Close every per-host client opened since startup (called from the app lifespan)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
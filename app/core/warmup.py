@@ -0,0 +1,60 @@
+# ======================
+# app/core/warmup.py
+# ======================
+import gc
+import time
+
+from app.core.dependencies import (
+    get_ai_service, get_answer_cache, get_search_service, get_semantic_cache, get_validation_service
+)
+from app.core.http_client import prepare_http_resources
+from app.services.context_assembler import count_tokens
+from app.services.embedding_index import get_embedding_index
+from app.services.intent_classifier import classify_query
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Touch each classifier and retrieval path once so lazily built state exists up front
+WARMUP_QUERIES = (
+    "What is Sui?",
+    "How many validators does Walrus have?",
+    "What is the Walrus token price?",
+    "How do I write a Move module?",
+)
+
+
+def warm_up() -> None:
+    """Build the read-only state every request needs: knowledge base and indexes,
+    compiled classifier patterns, tokenizer, services and the HTTP SSL context.
+
+    Runs once per process at startup. Under gunicorn with ``preload_app`` it runs
+    in the master before workers fork, so workers inherit these pages
+    copy-on-write instead of each building their own. No sockets or event-loop
+    bound objects are created here; connection pools open lazily in each worker.
+    """
+    start = time.perf_counter()
+    search_service = get_search_service()
+    get_ai_service()
+    get_validation_service()
+    get_answer_cache()
+    get_semantic_cache()
+    # Map the embedding index now rather than on the first query
+    get_embedding_index()
+    prepare_http_resources()
+    for query in WARMUP_QUERIES:
+        classify_query(query)
+        search_service._check_local_info(query)
+        count_tokens(query)
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+def freeze_for_fork() -> None:
+    """Move everything allocated so far into the GC's permanent generation.
+
+    The collector then never traverses (and so never writes to) these objects,
+    which keeps the inherited pages shared between forked workers.
+    """
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Froze {gc.get_freeze_count()} objects before forking workers")
@@ -2,12 +2,14 @@
 # app/models/chat.py
 # ======================
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from app.core.config import settings
 
 
 class ChatRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=settings.max_input_length)
+    # Overrides SEARCH_DEADLINE_SECONDS for this request
+    search_deadline: Optional[float] = Field(None, gt=0, le=settings.search_deadline_max_seconds)
 
     @validator('query')
     def validate_query(cls, v):
@@ -22,6 +24,29 @@ class ChatResponse(BaseModel):
     query: Optional[str] = None
     context_found: bool = False
     processing_time: Optional[float] = None
+    cached: bool = False
+
+
+class BatchChatRequest(BaseModel):
+    # Items are validated one by one so a bad query only fails its own result
+    queries: List[str] = Field(..., min_length=1, max_length=settings.batch_max_queries)
+    search_deadline: Optional[float] = Field(None, gt=0, le=settings.search_deadline_max_seconds)
+
+
+class BatchChatResult(BaseModel):
+    success: bool
+    response: Optional[str] = None
+    query: str
+    context_found: bool = False
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class BatchChatResponse(BaseModel):
+    results: List[BatchChatResult]
+    total: int
+    unique_queries: int
+    processing_time: float
 
 
 class ErrorResponse(BaseModel):
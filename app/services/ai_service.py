@@ -1,10 +1,29 @@
 # ======================
 # app/services/ai_service.py
 # ======================
-from openai import OpenAI
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+import numpy as np
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
+
 from app.core.config import settings
+from app.services.context_assembler import ContextAssembler
+from app.services.prompts import CHAT_PROMPT
+from app.services.validation_service import ValidationService
 from app.utils.exceptions import AIServiceError
 from app.utils.logger import get_logger
+from app.utils.metrics import STAGE_SECONDS, record_token_usage
+from app.utils.singleflight import SingleFlight
+from app.utils.tracing import span
+
+
+USAGE_ATTRIBUTES = {
+    "prompt": "gen_ai.usage.input_tokens",
+    "cached_prompt": "gen_ai.usage.cached_input_tokens",
+    "completion": "gen_ai.usage.output_tokens",
+}
 
 
 class AIService:
@@ -12,54 +31,133 @@ class AIService:
         if not settings.openai_api_key:
             raise AIServiceError("OpenAI API key not configured")
 
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.client = OpenAI(api_key=settings.openai_api_key, base_url=settings.openai_base_url)
+        self._async_client: Optional[AsyncOpenAI] = None
+        self.inflight = SingleFlight()
+        self.context_assembler = ContextAssembler.from_settings()
         self.logger = get_logger(__name__)
 
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """Pooled async client, created on first use inside the running event loop"""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                timeout=settings.ai_request_timeout,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=settings.ai_max_connections,
+                        max_keepalive_connections=settings.ai_max_connections,
+                    ),
+                    timeout=settings.ai_request_timeout,
+                ),
+            )
+        return self._async_client
+
+    async def aclose(self) -> None:
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    @staticmethod
+    def _span(stream: bool):
+        return span(
+            "openai.chat.completions",
+            {"gen_ai.system": "openai", "gen_ai.request.model": settings.ai_model, "gen_ai.request.stream": stream},
+            kind="CLIENT",
+        )
+
+    @staticmethod
+    def _record_usage(openai_span, usage) -> None:
+        for kind, tokens in record_token_usage(usage).items():
+            openai_span.set_attribute(USAGE_ATTRIBUTES[kind], tokens)
+
+    def _build_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        context = self.context_assembler.assemble(query, context)
+        return CHAT_PROMPT.messages(query, context)
+
+    @staticmethod
+    def _completion_kwargs(messages: List[Dict[str, str]]) -> Dict:
+        kwargs = {
+            "model": settings.ai_model,
+            "messages": messages,
+            "max_tokens": settings.ai_max_tokens,
+            "temperature": settings.ai_temperature,
+        }
+        if settings.ai_prompt_cache_key_enabled:
+            # Requests sharing the static prompt prefix are routed to the same prompt cache
+            kwargs["extra_body"] = {"prompt_cache_key": f"suibot-{CHAT_PROMPT.fingerprint}"}
+        return kwargs
+
     def generate_response(self, query: str, context: str) -> str:
         """Generate AI response with context"""
         try:
-            system_prompt = """You are a specialized assistant that answers questions about blockchain technology, the Sui blockchain, the Move smart contract language, and Walrus (Walrus Labs / Walrus on Sui, including its architecture and token information).
-
-Scope: You can answer questions about:
-- General blockchain concepts (what is blockchain, types of blockchain, consensus mechanisms, proof of work, proof of stake, distributed ledgers, etc.)
-- Sui blockchain (architecture, objects, transactions, consensus, validators, epochs, etc.)
-- Move programming language (smart contracts, syntax, security, development, etc.)
-- Walrus (data availability, blobs, epochs, validators, token, integration with Sui, etc.)
-- Cryptocurrency and blockchain security concepts
-- Blockchain development and smart contract programming
-- Installation and setup guides for blockchain tools
-- Development tutorials and guides
-- API documentation and usage
-- Troubleshooting blockchain issues
-
-Rules:
-1. Use information from the provided context when available (Sui docs, Move book, Walrus docs/GitHub, and price data when present)
-2. For general blockchain questions (what is blockchain, types of blockchain, consensus mechanisms, proof of work, etc.), use your training data to provide comprehensive answers
-3. For Sui, Move, and Walrus specific questions, prioritize the provided context but supplement with your knowledge when needed
-4. For installation, setup, and development questions, provide detailed step-by-step instructions
-5. For current pricing and cost information (like Walrus storage costs per epoch), use your training data and mention that real-time pricing is available through Walrus Scan APIs
-6. If the question is not about blockchain, Sui, Move, or Walrus, say "I only help with blockchain, Sui, Move, and Walrus topics"
-7. Be concise but comprehensive
-8. Include code examples when relevant
-9. For typos and misspellings, provide the correct information (e.g., "blockhain" should be "blockchain")
-10. Always stay within the scope of blockchain, Sui, Move, and Walrus topics
-11. Provide practical, actionable answers for development and installation questions
-12. For current pricing data, direct users to official sources like Walrus Scan for real-time information"""
-
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Context (Sui/Move/Walrus): {context}\n\nQuestion: {query}"}
-            ]
-
-            response = self.client.chat.completions.create(
-                model=settings.ai_model,
-                messages=messages,
-                max_tokens=settings.ai_max_tokens,
-                temperature=settings.ai_temperature
-            )
+            messages = self._build_messages(query, context)
+
+            response = self.client.chat.completions.create(**self._completion_kwargs(messages))
 
             return response.choices[0].message.content
 
         except Exception as e:
             self.logger.error(f"AI service error: {e}")
             raise AIServiceError(f"Failed to generate response: {str(e)}")
+
+    async def agenerate_response(self, query: str, context: str) -> str:
+        """Generate AI response with context without blocking the event loop"""
+        if not settings.single_flight_enabled:
+            return await self._agenerate_response(query, context)
+        # Same question with the same context: concurrent callers share one completion
+        key = (ValidationService.normalize_query(query), hashlib.sha256(context.encode()).hexdigest())
+        return await self.inflight.do(key, lambda: self._agenerate_response(query, context))
+
+    async def _agenerate_response(self, query: str, context: str) -> str:
+        try:
+            messages = self._build_messages(query, context)
+
+            with self._span(stream=False) as openai_span, STAGE_SECONDS.time(stage="generation"):
+                response = await self.async_client.chat.completions.create(**self._completion_kwargs(messages))
+                self._record_usage(openai_span, response.usage)
+
+            return response.choices[0].message.content
+
+        except Exception as e:
+            self.logger.error(f"AI service error: {e}")
+            raise AIServiceError(f"Failed to generate response: {str(e)}")
+
+    async def astream_response(self, query: str, context: str) -> AsyncIterator[str]:
+        """Yield the AI response in text fragments as OpenAI streams them"""
+        try:
+            messages = self._build_messages(query, context)
+
+            with self._span(stream=True) as openai_span, STAGE_SECONDS.time(stage="generation_stream"):
+                stream = await self.async_client.chat.completions.create(
+                    **self._completion_kwargs(messages),
+                    stream=True,
+                    # The last chunk then carries token usage
+                    stream_options={"include_usage": True}
+                )
+
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, "usage", None) is not None:
+                        self._record_usage(openai_span, chunk.usage)
+
+        except Exception as e:
+            self.logger.error(f"AI service streaming error: {e}")
+            raise AIServiceError(f"Failed to generate response: {str(e)}")
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """L2-normalised OpenAI embedding of ``text`` as a float32 vector"""
+        try:
+            response = await self.async_client.embeddings.create(
+                model=settings.semantic_cache_embedding_model,
+                input=text
+            )
+            vector = np.asarray(response.data[0].embedding, dtype=np.float32)
+            return vector / np.linalg.norm(vector)
+
+        except Exception as e:
+            self.logger.error(f"AI embedding error: {e}")
+            raise AIServiceError(f"Failed to embed text: {str(e)}")
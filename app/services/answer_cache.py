@@ -0,0 +1,106 @@
+# ======================
+# app/services/answer_cache.py
+# ======================
+import hashlib
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.services.prompts import CHAT_PROMPT
+from app.services.validation_service import ValidationService
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+from app.utils.metrics import CACHE_REQUESTS
+
+
+class InMemoryCacheBackend:
+    """Per-process backend; entries are lost on restart and not shared between workers."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._cache = TTLCache(max_entries=max_entries, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+    async def clear(self) -> None:
+        self._cache.clear()
+
+
+class RedisCacheBackend:
+    """Backend for any client exposing the redis.asyncio get/set(ex=...) interface."""
+
+    def __init__(self, client: Any, prefix: str = "suibot:answer:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("ANSWER_CACHE_BACKEND=redis requires the 'redis' package") from e
+        return cls(redis.from_url(url, decode_responses=True))
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+
+class AnswerCache:
+    """Caches final chat answers keyed on the normalized query and generation settings.
+
+    Backend failures are logged and treated as misses so the cache can never fail a request.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.logger = get_logger(__name__)
+
+    @staticmethod
+    def make_key(query: str) -> str:
+        normalized = ValidationService.normalize_query(query)
+        raw = f"{normalized}|{settings.ai_model}|{settings.ai_temperature}|{CHAT_PROMPT.fingerprint}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, query: str) -> Optional[str]:
+        try:
+            answer = await self.backend.get(self.make_key(query))
+        except Exception as e:
+            self.logger.error(f"Answer cache read failed: {e}")
+            answer = None
+        CACHE_REQUESTS.inc(cache="answer", result="miss" if answer is None else "hit")
+        return answer
+
+    async def set(self, query: str, answer: str) -> None:
+        try:
+            await self.backend.set(self.make_key(query), answer, self.ttl)
+        except Exception as e:
+            self.logger.error(f"Answer cache write failed: {e}")
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def build_answer_cache() -> AnswerCache:
+    if settings.answer_cache_backend == "redis":
+        if not settings.redis_url:
+            raise RuntimeError("ANSWER_CACHE_BACKEND=redis requires REDIS_URL")
+        backend = RedisCacheBackend.from_url(settings.redis_url)
+    else:
+        backend = InMemoryCacheBackend(
+            max_entries=settings.answer_cache_max_entries,
+            ttl=settings.answer_cache_ttl,
+        )
+    return AnswerCache(backend, ttl=settings.answer_cache_ttl)
@@ -0,0 +1,82 @@
+# ======================
+# app/services/circuit_breaker.py
+# ======================
+import time
+from typing import Any, Dict, Optional
+
+from app.utils.logger import get_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream provider.
+
+    ``failure_threshold`` failures in a row (errors, 5xx/429 responses or calls
+    slower than ``slow_call_seconds``) open the circuit and calls are refused.
+    After ``recovery_seconds`` a single probe call is let through: success closes
+    the circuit, failure opens it for another recovery period.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, slow_call_seconds: float, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.recovery_seconds = recovery_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_failure: Optional[str] = None
+        self._probe_in_flight = False
+        self._counters = {"calls": 0, "failures": 0, "rejected": 0}
+        self.logger = get_logger(__name__)
+
+    def allow_request(self) -> bool:
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_seconds:
+            self.state = HALF_OPEN
+            self.logger.info(f"Circuit for {self.name} is half-open - probing")
+        if self.state == CLOSED or (self.state == HALF_OPEN and not self._probe_in_flight):
+            self._probe_in_flight = self.state == HALF_OPEN
+            self._counters["calls"] += 1
+            return True
+        self._counters["rejected"] += 1
+        return False
+
+    def record_success(self, duration: float) -> None:
+        if duration >= self.slow_call_seconds:
+            self.record_failure(f"Slow call ({duration:.1f}s)")
+            return
+        if self.state != CLOSED:
+            self.logger.info(f"Circuit for {self.name} closed")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, reason: str) -> None:
+        self._counters["failures"] += 1
+        self.consecutive_failures += 1
+        self.last_failure = reason
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.logger.warning(f"Circuit for {self.name} opened after: {reason}")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Forget an admitted call that ended without a verdict (e.g. it was cancelled)."""
+        self._probe_in_flight = False
+
+    def status(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.opened_at + self.recovery_seconds - time.monotonic()), 1)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_failure": self.last_failure,
+            "retry_in_seconds": retry_in,
+            **self._counters,
+        }
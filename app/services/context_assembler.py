@@ -0,0 +1,157 @@
+# ======================
+# app/services/context_assembler.py
+# ======================
+import math
+import re
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.local_index import BM25Index, Chunk, tokenize
+from app.utils.logger import get_logger
+from app.utils.tracing import set_attributes
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """The model's tiktoken encoding, or None when tiktoken (or its BPE file) is unavailable."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(settings.ai_model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        get_logger(__name__).warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def _piece_tokens(piece: str) -> int:
+    # BPE vocabularies keep common words whole and split rarer ones into ~4 character pieces
+    return max(1, math.ceil(len(piece) / 4)) if len(piece) > 6 else 1
+
+
+def count_tokens(text: str) -> int:
+    """Token count with the model's tokenizer if tiktoken is installed, else a close local estimate."""
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(_piece_tokens(piece) for piece in _PIECE_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    used = 0
+    for match in _PIECE_RE.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def _shingles(text: str, size: int = 5) -> Set[Tuple[str, ...]]:
+    words = tokenize(text)
+    if len(words) < size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class ContextAssembler:
+    """Fits retrieved context into a token budget before it is sent to OpenAI.
+
+    The context is split into passages (paragraphs; long paragraphs into runs of
+    sentences of at most ``passage_tokens``), passages that mostly repeat an
+    already chosen one are dropped, and the rest are taken in order of BM25
+    relevance to the query until ``max_tokens`` is reached. Chosen passages keep
+    their original order. If even the most relevant passage does not fit, it is
+    truncated.
+    """
+
+    def __init__(self, max_tokens: int, passage_tokens: int, dedupe_threshold: float):
+        self.max_tokens = max_tokens
+        self.passage_tokens = passage_tokens
+        self.dedupe_threshold = dedupe_threshold
+        self.logger = get_logger(__name__)
+
+    @classmethod
+    def from_settings(cls) -> "ContextAssembler":
+        return cls(
+            max_tokens=settings.context_max_tokens,
+            passage_tokens=settings.context_passage_tokens,
+            dedupe_threshold=settings.context_dedupe_threshold,
+        )
+
+    def split(self, context: str) -> List[str]:
+        passages = []
+        for paragraph in _PARAGRAPH_RE.split(context.strip()):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if count_tokens(paragraph) <= self.passage_tokens:
+                passages.append(paragraph)
+                continue
+            current, used = [], 0
+            for sentence in _SENTENCE_RE.split(paragraph):
+                tokens = count_tokens(sentence)
+                if current and used + tokens > self.passage_tokens:
+                    passages.append(" ".join(current))
+                    current, used = [], 0
+                current.append(sentence)
+                used += tokens
+            if current:
+                passages.append(" ".join(current))
+        return passages
+
+    def _rank(self, query: str, passages: List[str]) -> List[int]:
+        """Passage indexes, most relevant first; passages sharing no query term keep their order at the end."""
+        chunks = [Chunk("context", "", text) for text in passages]
+        positions = {id(chunk): i for i, chunk in enumerate(chunks)}
+        ranked = [positions[id(chunk)] for _, chunk in BM25Index(chunks).search(query, k=len(passages))]
+        scored = set(ranked)
+        return ranked + [i for i in range(len(passages)) if i not in scored]
+
+    def assemble(self, query: str, context: Optional[str]) -> Optional[str]:
+        if not context:
+            return context
+        passages = self.split(context)
+        if not passages:
+            return context
+
+        chosen: List[int] = []
+        seen: Set[Tuple[str, ...]] = set()
+        budget = self.max_tokens
+        for i in self._rank(query, passages):
+            shingles = _shingles(passages[i])
+            if shingles and len(shingles & seen) / len(shingles) >= self.dedupe_threshold:
+                continue
+            tokens = count_tokens(passages[i])
+            if tokens > budget:
+                if chosen:
+                    continue
+                passages[i] = truncate_to_tokens(passages[i], budget)
+                tokens = budget
+            chosen.append(i)
+            seen |= shingles
+            budget -= tokens
+            if budget <= 0:
+                break
+
+        assembled = "\n\n".join(passages[i] for i in sorted(chosen))
+        set_attributes({
+            "context.passages": len(passages),
+            "context.passages_used": len(chosen),
+            "context.tokens": self.max_tokens - budget,
+        })
+        if len(chosen) < len(passages):
+            self.logger.info(f"Context trimmed to {len(chosen)}/{len(passages)} passages "
+                             f"({self.max_tokens - budget} tokens)")
+        return assembled
@@ -0,0 +1,144 @@
+# ======================
+# app/services/embedding_index.py
+# ======================
+"""Lexical similarity fallback over the local knowledge chunks.
+
+This is not a semantic model: vectors are hashed words, bigrams and character
+trigrams, so it catches rephrasings that share word stems with a chunk (word
+order, inflections, extra words) but not synonyms. Chunk vectors are computed
+offline into a float32 ``.npy`` matrix that is memory-mapped at runtime; a query
+is one matrix-vector product. Build it with:
+
+    python -m app.services.embedding_index
+"""
+import hashlib
+import json
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.local_index import Chunk, chunk_corpus, tokenize
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HashingEmbedder:
+    """Deterministic bag-of-features embedder (words, word bigrams, character trigrams).
+
+    Features are hashed with CRC32 into a fixed number of signed dimensions, so the
+    same text gets the same vector in every process and no model download is needed.
+    Character trigrams let different forms of a word ("staking", "stakers", "stake")
+    overlap; per-dimension IDF weights, fitted on the knowledge base, keep ubiquitous
+    terms like "sui" from dominating. Similarity is lexical: questions sharing no
+    stems with a chunk score near zero against it.
+    """
+
+    version = "hashing-idf-v1"
+
+    def __init__(self, dim: int = 1024, idf: Optional[np.ndarray] = None):
+        self.dim = dim
+        self.idf = idf if idf is not None else np.ones(dim, dtype=np.float32)
+
+    def _features(self, text: str) -> List[Tuple[str, float]]:
+        tokens = tokenize(text)
+        features = [(token, 1.0) for token in tokens]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            padded = f"#{token}#"
+            features += [(padded[i:i + 3], 0.25) for i in range(len(padded) - 2)]
+        return features
+
+    def _hash(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                h = zlib.crc32(feature.encode())
+                matrix[row, h % self.dim] += weight if h & 0x80000000 else -weight
+        return matrix
+
+    def fit(self, texts: List[str]) -> "HashingEmbedder":
+        df = np.count_nonzero(self._hash(texts), axis=0)
+        self.idf = np.log1p(len(texts) / (1 + df)).astype(np.float32)
+        return self
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = self._hash(texts) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class EmbeddingIndex:
+    """Top-k cosine search over L2-normalised chunk embeddings."""
+
+    def __init__(self, matrix: np.ndarray, chunks: List[Chunk], embedder: HashingEmbedder):
+        self.matrix = matrix
+        self.chunks = chunks
+        self.embedder = embedder
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[float, Chunk]]:
+        vector = self.embedder.embed([query])[0]
+        if not vector.any():
+            return []
+        scores = self.matrix @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.chunks[i]) for i in top]
+
+
+def _fingerprint(chunks: List[Chunk], dim: int) -> str:
+    digest = hashlib.sha256(f"{HashingEmbedder.version}:{dim}".encode())
+    for chunk in chunks:
+        digest.update(chunk.text.encode())
+    return digest.hexdigest()[:16]
+
+
+def _embed_chunks(chunks: List[Chunk], dim: int) -> Tuple[np.ndarray, HashingEmbedder]:
+    texts = [chunk.text for chunk in chunks]
+    embedder = HashingEmbedder(dim).fit(texts)
+    return embedder.embed(texts), embedder
+
+
+def build_index(path: Path, dim: int) -> None:
+    """Embed every local chunk and write the matrix plus a sidecar with the fingerprint and IDF weights."""
+    chunks = chunk_corpus()
+    matrix, embedder = _embed_chunks(chunks, dim)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, matrix)
+    meta = {"fingerprint": _fingerprint(chunks, dim), "chunks": len(chunks), "idf": embedder.idf.tolist()}
+    path.with_suffix(".json").write_text(json.dumps(meta))
+
+
+def load_index(path: Path, dim: int) -> EmbeddingIndex:
+    """Memory-map the precomputed index, rebuilding it in memory if missing or stale."""
+    chunks = chunk_corpus()
+    meta_path = path.with_suffix(".json")
+    if path.exists() and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta.get("fingerprint") == _fingerprint(chunks, dim):
+            embedder = HashingEmbedder(dim, np.asarray(meta["idf"], dtype=np.float32))
+            return EmbeddingIndex(np.load(path, mmap_mode="r"), chunks, embedder)
+        logger.warning(f"Embedding index at {path} is stale - embedding chunks in memory")
+    else:
+        logger.warning(f"No embedding index at {path} - embedding chunks in memory")
+    matrix, embedder = _embed_chunks(chunks, dim)
+    return EmbeddingIndex(matrix, chunks, embedder)
+
+
+@lru_cache()
+def get_embedding_index() -> Optional[EmbeddingIndex]:
+    if not settings.semantic_search_enabled:
+        return None
+    return load_index(Path(settings.embedding_index_path), settings.embedding_dim)
+
+
+if __name__ == "__main__":
+    target = Path(settings.embedding_index_path)
+    build_index(target, settings.embedding_dim)
+    logger.info(f"Wrote {target}")
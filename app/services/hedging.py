@@ -0,0 +1,83 @@
+# ======================
+# app/services/hedging.py
+# ======================
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of call latencies for one provider, used to pick its hedge delay."""
+
+    def __init__(self, window: int, quantile: float, min_samples: int, min_delay: float):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._samples: deque = deque(maxlen=window)
+        self._counters = {"hedged": 0, "hedge_wins": 0}
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def hedge_delay(self) -> Optional[float]:
+        """The tracked quantile latency, or None until there are enough samples to trust it."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, math.ceil(self.quantile * len(ordered)) - 1)
+        return max(self.min_delay, ordered[index])
+
+    def status(self) -> Dict[str, Any]:
+        delay = self.hedge_delay()
+        return {
+            "samples": len(self._samples),
+            "hedge_delay_seconds": round(delay, 3) if delay is not None else None,
+            **self._counters,
+        }
+
+    async def call(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        """Run ``make_call``; if it is slower than the hedge delay, start a duplicate and take the first success.
+
+        Only the primary attempt's latency is recorded. When it loses to the hedge its
+        elapsed time at cancellation is recorded instead, which is already above the
+        hedge delay, so hedging does not drag the tracked quantile down.
+        """
+        delay = self.hedge_delay()
+        start = time.monotonic()
+        primary = asyncio.ensure_future(make_call())
+
+        def record_primary(task: asyncio.Future) -> None:
+            if not task.cancelled() and task.exception() is None:
+                self.record(time.monotonic() - start)
+
+        primary.add_done_callback(record_primary)
+        hedge: Optional[asyncio.Future] = None
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+
+            self._counters["hedged"] += 1
+            hedge = asyncio.ensure_future(make_call())
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._counters["hedge_wins"] += 1
+                            self.record(time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
@@ -0,0 +1,254 @@
+# ======================
+# app/services/intent_classifier.py
+# ======================
+import re
+from bisect import bisect_left
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+WALRUS_TERMS = [
+    r"walrus", r"walrus labs", r"walrus sui", r"walrus da", r"walrus coin",
+    r"wal token", r"wal price", r"wal ticker"
+]
+
+BLOCKCHAIN_TERMS = [
+    r"blockchain", r"crypto", r"cryptocurrency", r"defi", r"nft", r"dapp",
+    r"sui", r"move", r"walrus", r"smart contract", r"token", r"coin",
+    r"validator", r"consensus", r"staking", r"gas", r"transaction",
+    r"proof of work", r"proof of stake", r"pow", r"pos", r"mining", r"miners",
+    r"distributed ledger", r"ledger", r"hash", r"block", r"epoch",
+    r"decentralized", r"decentralization", r"peer to peer", r"p2p",
+    r"wallet", r"address", r"private key", r"public key", r"signature",
+    r"bitcoin", r"ethereum", r"solana", r"cardano", r"polkadot",
+    r"blockhain", r"blockhchain", r"cryptocurreny", r"cryptocurrencty",
+    r"walrus labs", r"walruslabs", r"walruss", r"walruss labs"
+]
+
+PRICE_TERMS = [r"price", r"worth", r"value", r"market\s*cap", r"how much"]
+
+# Wide net used by STEP 2 of search_sui_docs
+STATS_TERMS = [
+    r"validator", r"validators", r"network", r"nodes", r"stake", r"tps", r"stats",
+    r"how many", r"count", r"exist"
+]
+
+# Narrower set used to decide whether Walrus search results get network stats appended
+NETWORK_TERMS = [r"validator", r"validators", r"network", r"nodes", r"stake", r"tps", r"stats"]
+
+# Questions about what changed recently; the static knowledge base cannot answer them
+TIME_SENSITIVE_TERMS = [
+    r"latest", r"newest", r"recent", r"release", r"version", r"today", r"news", r"upcoming",
+    r"roadmap", r"announce", r"this week", r"this month", r"this year", r"right now"
+]
+
+# Other chains and their tooling; the knowledge base only covers Sui, Move and Walrus
+OTHER_ECOSYSTEM_TERMS = [
+    r"ethereum", r"solidity", r"hardhat", r"foundry", r"evm", r"metamask", r"bitcoin", r"solana",
+    r"aptos", r"polygon", r"cardano", r"polkadot", r"avalanche", r"arbitrum", r"optimism", r"cosmos"
+]
+
+SUI_STATS_TERMS = [
+    r"sui.*validator", r"sui.*validators", r"sui.*network", r"sui.*nodes", r"sui.*stake", r"sui.*tps"
+]
+
+WALRUS_INFO_PATTERNS = {
+    "what_is_walrus": [r"what is walrus", r"walrus blockchain", r"about walrus", r"walrus overview", r"define walrus", r"walrus definition", r"what is walruss", r"walruss", r"what.*walruss"],
+    "walrus_da": [r"walrus da", r"data availability", r"walrus data availability", r"da solution"],
+    "walrus_blobs": [r"walrus blob", r"blob storage", r"data blob", r"walrus data blob", r"blob", r"walrus.*blob"],
+    "walrus_architecture": [r"walrus architecture", r"how walrus works", r"walrus design", r"walrus structure"],
+    "walrus_token": [r"walrus token", r"wal token", r"wal coin", r"walrus economics", r"walrus tokenomics"],
+    "walrus_sui": [r"walrus sui", r"walrus on sui", r"walrus sui integration"],
+    "walrus_validators": [r"walrus validator", r"walrus validators", r"how many validator", r"walrus network", r"walrus nodes", r"validator.*walrus", r"how many.*walrus", r"validator", r"validators", r"how many.*validator", r"walrus.*validator", r"validator.*exist", r"validator.*count"],
+    "walrus_epochs": [r"walrus epoch", r"walrus epochs", r"walrus epoch.*", r"epoch.*walrus", r"walrus.*epoch", r"how many.*day.*epoch", r"epoch.*day", r"walrus.*day", r"how long.*walrus.*epoch", r"walrus.*epoch.*duration", r"walrus.*epoch.*length", r"walrus.*epoch.*time", r"walrus.*epoch.*period"],
+    "walrus_blob_ids": [r"walrus blob id", r"walrus blob ids", r"blob id", r"blob ids", r"walrus.*blob.*id", r"blob.*id.*walrus"],
+    "walrus_storage_costs": [r"walrus storage cost", r"walrus storage price", r"walrus cost", r"walrus price", r"how much.*walrus", r"walrus.*cost", r"walrus.*price", r"storage.*cost.*walrus", r"walrus.*storage.*cost", r"how much.*store.*walrus", r"walrus.*fee", r"walrus.*billing"],
+    "walrus_economics": [r"walrus economics", r"walrus tokenomics", r"walrus economy", r"walrus revenue", r"walrus income", r"walrus profit", r"walrus business", r"walrus financial", r"walrus economic", r"walrus.*economic", r"walrus.*financial"]
+}
+
+SUI_INFO_PATTERNS = {
+    "what_is_sui": [r"what is sui", r"sui blockchain", r"about sui", r"sui overview", r"define sui", r"sui definition"],
+    "sui_token": [r"sui token", r"token economics", r"tokenomics", r"sui coin"],
+    "sui_architecture": [r"architecture", r"how sui works", r"sui design", r"sui structure"],
+    "move_language": [r"move language", r"programming language", r"smart contract language", r"move programming"],
+    "sui_objects": [r"sui objects", r"object model", r"object-centric", r"sui object", r"sui.*object", r"object.*sui"],
+    "sui_transactions": [r"transactions", r"tx", r"how transactions work", r"sui transaction", r"sui.*transaction", r"transaction.*sui"],
+    "sui_consensus": [r"consensus", r"narwhal", r"bullshark", r"proof of stake", r"sui consensus", r"sui.*consensus", r"consensus.*sui"],
+    "sui_storage": [r"storage", r"data storage", r"state storage"],
+    "sui_smart_contracts": [r"smart contracts", r"contracts", r"dapps", r"applications"],
+    "sui_validators": [r"sui validator", r"sui validators", r"how many sui validator", r"sui network", r"sui nodes"],
+    "sui_epochs": [r"sui epoch", r"sui epochs", r"epoch.*sui", r"sui.*epoch", r"how long.*sui.*epoch", r"sui.*epoch.*duration", r"sui.*epoch.*length", r"sui.*epoch.*time", r"sui.*epoch.*period", r"epoch.*sui.*duration", r"epoch.*sui.*length", r"epoch.*sui.*time", r"epoch.*sui.*period"],
+    "move_smart_contracts": [r"move smart contract", r"move smart contracts", r"move contract", r"move contracts", r"smart contract", r"smart contracts", r"move.*contract", r"contract.*move"],
+    "what_is_blockchain": [r"what is blockchain", r"blockchain", r"about blockchain", r"blockchain overview", r"define blockchain", r"blockchain definition", r"what.*blockchain", r"what is blockhain", r"blockhain", r"what.*blockhain"],
+    "types_of_blockchain": [r"types of blockchain", r"blockchain types", r"kinds of blockchain", r"blockchain categories", r"different blockchain", r"blockchain classification", r"types of blockhain", r"blockhain types"],
+    "distributed_ledger": [r"distributed ledger", r"distributed database", r"ledger technology", r"distributed system", r"what.*distributed.*ledger"],
+    "proof_of_work": [r"proof of work", r"pow", r"mining", r"miners", r"what.*proof.*work", r"how.*mining.*work"],
+    "sui_blockchain_type": [r"what type.*sui", r"sui.*type", r"what.*blockchain.*sui", r"sui.*blockchain.*type", r"type.*sui.*blockchain"],
+    "blockchain_consensus": [r"consensus mechanism", r"consensus algorithm", r"blockchain consensus", r"how.*consensus.*work", r"consensus.*blockchain"],
+    "blockchain_security": [r"blockchain security", r"crypto security", r"blockchain.*secure", r"security.*blockchain", r"blockchain.*attack"]
+}
+
+# Local info entries in lookup priority order: Walrus entries first, then Sui/blockchain
+LOCAL_INFO_PATTERNS: List[Tuple[str, str, List[str]]] = (
+    [("walrus", key, patterns) for key, patterns in WALRUS_INFO_PATTERNS.items()]
+    + [("sui", key, patterns) for key, patterns in SUI_INFO_PATTERNS.items()]
+)
+
+
+@dataclass(frozen=True)
+class QueryIntents:
+    blockchain_related: bool
+    walrus: bool
+    price: bool
+    stats: bool
+    network: bool
+    sui_stats: bool
+    time_sensitive: bool
+    other_ecosystem: bool
+    # Matched (corpus, key) local info entries, highest priority first
+    local_info_keys: Tuple[Tuple[str, str], ...]
+
+
+_REGEX_META = set("\\.^$*+?{}[]|()")
+
+
+class _AhoCorasick:
+    """Aho-Corasick automaton reporting every (possibly overlapping) literal occurrence."""
+
+    def __init__(self, literals: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for literal in literals:
+            node = 0
+            for ch in literal:
+                if ch not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][ch] = len(self._goto) - 1
+                node = self._goto[node][ch]
+            self._out[node].append(literal)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Map each literal found in ``text`` to its start offsets, in ascending order."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Dict[str, List[int]] = {}
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for literal in out[node]:
+                found.setdefault(literal, []).append(i - len(literal) + 1)
+        return found
+
+
+class IntentClassifier:
+    """Classifies a query against every intent and local-info entry in one pass.
+
+    Patterns made of literals joined by ``.*`` (all but a handful) are split into
+    their literal pieces, which a single Aho-Corasick scan of the query locates;
+    a pattern matches when its pieces occur in order. The few remaining regexes
+    are folded into one compiled alternation per intent.
+    """
+
+    def __init__(self, intents: Dict[str, List[str]]):
+        self._names = list(intents)
+        self._rules: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        fallback: Dict[int, List[str]] = {}
+        literals = set()
+        for index, patterns in enumerate(intents.values()):
+            for pattern in patterns:
+                pieces = tuple(piece for piece in pattern.split(".*") if piece)
+                if not pieces or any(_REGEX_META & set(piece) for piece in pieces):
+                    fallback.setdefault(index, []).append(pattern)
+                    continue
+                literals.update(pieces)
+                self._rules.setdefault(pieces[0], []).append((index, pieces))
+        self._automaton = _AhoCorasick(sorted(literals))
+        self._fallback = [
+            (index, re.compile("|".join(patterns), re.IGNORECASE)) for index, patterns in fallback.items()
+        ]
+
+    @staticmethod
+    def _in_order(pieces: Tuple[str, ...], found: Dict[str, List[int]]) -> bool:
+        position = 0
+        for piece in pieces:
+            starts = found.get(piece)
+            if not starts:
+                return False
+            k = bisect_left(starts, position)
+            if k == len(starts):
+                return False
+            position = starts[k] + len(piece)
+        return True
+
+    def matches(self, query: str) -> List[str]:
+        """Names of every intent matched by ``query``, in declaration order."""
+        text = query.lower()
+        matched = set()
+        # ".*" never crosses a newline, so each line is scanned on its own
+        for line in text.split("\n"):
+            found = self._automaton.find_all(line)
+            for first_piece in found:
+                for index, pieces in self._rules.get(first_piece, ()):
+                    if index not in matched and self._in_order(pieces, found):
+                        matched.add(index)
+        for index, pattern in self._fallback:
+            if index not in matched and pattern.search(text):
+                matched.add(index)
+        return [name for index, name in enumerate(self._names) if index in matched]
+
+
+def _build_classifier() -> IntentClassifier:
+    intents = {
+        "blockchain_related": BLOCKCHAIN_TERMS,
+        "walrus": WALRUS_TERMS,
+        "price": PRICE_TERMS,
+        "stats": STATS_TERMS,
+        "network": NETWORK_TERMS,
+        "sui_stats": SUI_STATS_TERMS,
+        "time_sensitive": TIME_SENSITIVE_TERMS,
+        "other_ecosystem": OTHER_ECOSYSTEM_TERMS,
+    }
+    for corpus, key, patterns in LOCAL_INFO_PATTERNS:
+        intents[f"{corpus}:{key}"] = patterns
+    return IntentClassifier(intents)
+
+
+_CLASSIFIER = _build_classifier()
+
+
+def _classify(query: str) -> QueryIntents:
+    matched = _CLASSIFIER.matches(query)
+    flags = set(matched)
+    return QueryIntents(
+        blockchain_related="blockchain_related" in flags,
+        walrus="walrus" in flags,
+        price="price" in flags,
+        stats="stats" in flags,
+        network="network" in flags,
+        sui_stats="sui_stats" in flags,
+        time_sensitive="time_sensitive" in flags,
+        other_ecosystem="other_ecosystem" in flags,
+        local_info_keys=tuple(tuple(name.split(":", 1)) for name in matched if ":" in name),
+    )
+
+
+@lru_cache(maxsize=4096)
+def classify_query(query: str) -> QueryIntents:
+    """Cached classification; search_sui_docs asks about the same query several times per request."""
+    return _classify(query)
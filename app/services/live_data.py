@@ -0,0 +1,93 @@
+# ======================
+# app/services/live_data.py
+# ======================
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.utils.logger import get_logger
+
+
+@dataclass
+class Snapshot:
+    value: Optional[str] = None
+    updated_at: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the last successful refresh, or None if there never was one."""
+        if self.updated_at is None:
+            return None
+        return time.time() - self.updated_at
+
+
+class LiveDataRefresher:
+    """Periodically refreshes live values (price, network stats) into in-memory snapshots.
+
+    A failed refresh keeps the last good value and only records the error, so readers
+    always get the most recent successful result.
+    """
+
+    def __init__(self, fetchers: Dict[str, Callable[[], Awaitable[Optional[str]]]], interval: float):
+        self.fetchers = fetchers
+        self.interval = interval
+        self.snapshots: Dict[str, Snapshot] = {name: Snapshot() for name in fetchers}
+        self._task: Optional[asyncio.Task] = None
+        self.logger = get_logger(__name__)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _refresh(self, name: str) -> None:
+        snapshot = self.snapshots[name]
+        try:
+            value = await self.fetchers[name]()
+            error = None if value else "No data returned"
+        except Exception as e:
+            value, error = None, str(e)
+
+        if value:
+            snapshot.value = value
+            snapshot.updated_at = time.time()
+            snapshot.last_error = None
+        else:
+            snapshot.last_error = error
+            self.logger.warning(f"Refreshing {name} failed ({error}), keeping last good value")
+
+    async def refresh_once(self) -> None:
+        await asyncio.gather(*(self._refresh(name) for name in self.fetchers))
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+            self.logger.info(f"Live data refresher started (every {self.interval}s)")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get(self, name: str) -> Optional[str]:
+        return self.snapshots[name].value
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "available": snapshot.value is not None,
+                "age_seconds": round(snapshot.age, 1) if snapshot.age is not None else None,
+                "last_error": snapshot.last_error,
+            }
+            for name, snapshot in self.snapshots.items()
+        }
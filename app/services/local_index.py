@@ -0,0 +1,131 @@
+# ======================
+# app/services/local_index.py
+# ======================
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from app.data.sui_info import SUI_BLOCKCHAIN_INFO
+from app.data.walrus_info import WALRUS_INFO
+
+STOPWORDS = frozenset(
+    "a about all also an and any are as at be been but by can could do does explain for from has "
+    "have how i if in into is it its many me more most much my no not of on or our please should "
+    "so some such tell than that the their them then there these they this to us was we what "
+    "when where which who why will with would you your".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords; plural 's' is folded so 'validators' matches 'validator'."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass(frozen=True)
+class Chunk:
+    corpus: str
+    key: str
+    text: str
+
+
+def chunk_corpus(min_chars: int = 80) -> List[Chunk]:
+    """Split every local info entry into paragraphs; short ones (headings) are merged into the next.
+
+    Entries present in both corpora (e.g. ``sui_epochs``) are only indexed once.
+    """
+    chunks = []
+    seen = set()
+    for corpus, entries in (("walrus", WALRUS_INFO), ("sui", SUI_BLOCKCHAIN_INFO)):
+        for key, text in entries.items():
+            pending = ""
+            for paragraph in re.split(r"\n\s*\n", text.strip()):
+                paragraph = paragraph.strip()
+                if not paragraph:
+                    continue
+                pending = f"{pending}\n{paragraph}" if pending else paragraph
+                if len(pending) >= min_chars:
+                    chunks.append(Chunk(corpus, key, pending))
+                    pending = ""
+            if pending:
+                chunks.append(Chunk(corpus, key, pending))
+    return [chunk for chunk in chunks if not (chunk.text in seen or seen.add(chunk.text))]
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring."""
+
+    def __init__(self, chunks: List[Chunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._entries: Dict[str, List[int]] = {}
+        lengths = []
+        previous_key = None
+        for doc_id, chunk in enumerate(chunks):
+            self._entries.setdefault(chunk.key, []).append(doc_id)
+            tokens = tokenize(chunk.text)
+            if (chunk.corpus, chunk.key) != previous_key:
+                # The entry key ("walrus_blob_ids") acts as a title of the lead paragraph
+                tokens += 2 * tokenize(chunk.key.replace("_", " "))
+                previous_key = (chunk.corpus, chunk.key)
+            counts = Counter(tokens)
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((doc_id, tf))
+        avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        # Precompute the length normalisation so a query only does the tf part
+        self._norms = [k1 * (1 - b + b * length / avg_length) for length in lengths] if avg_length else []
+        n = len(chunks)
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def _scores(self, query: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for doc_id, tf in postings:
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + self._norms[doc_id])
+        return scores
+
+    def search(
+        self, query: str, k: int = 3, boost_keys: FrozenSet[str] = frozenset(), boost: float = 1.5
+    ) -> List[Tuple[float, Chunk]]:
+        """Top-k chunks by BM25; chunks of entries in ``boost_keys`` have their score multiplied by ``boost``."""
+        scores = self._scores(query)
+        if boost_keys:
+            for doc_id in scores:
+                if self.chunks[doc_id].key in boost_keys:
+                    scores[doc_id] *= boost
+        best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(score, self.chunks[doc_id]) for doc_id, score in best]
+
+    def search_entries(self, query: str, keys: Iterable[str]) -> List[Tuple[float, Chunk]]:
+        """Every chunk of the entries ``keys`` that shares a term with ``query``, best first."""
+        scores = self._scores(query)
+        hits = [
+            (scores[doc_id], doc_id)
+            for key in dict.fromkeys(keys) for doc_id in self._entries.get(key, []) if doc_id in scores
+        ]
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+        return [(score, self.chunks[doc_id]) for score, doc_id in hits]
+
+
+LOCAL_INDEX = BM25Index(chunk_corpus())
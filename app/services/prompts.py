@@ -0,0 +1,70 @@
+# ======================
+# app/services/prompts.py
+# ======================
+import hashlib
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class ChatPrompt:
+    """A versioned chat prompt, built once at import time.
+
+    The system message is a single precomputed dict reused by every request, and
+    all per-request text (context, question) goes in the final user message, so
+    each request starts with a byte-identical prefix that the provider's prompt
+    cache can match. ``fingerprint`` changes whenever the version or any static
+    text changes; it keys cached answers and the provider's cache routing.
+    """
+
+    version: str
+    system: str
+    user_template: str
+    fingerprint: str = field(init=False)
+    system_message: Dict[str, str] = field(init=False)
+
+    def __post_init__(self):
+        raw = "\x00".join((self.version, self.system, self.user_template))
+        object.__setattr__(self, "fingerprint", hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16])
+        object.__setattr__(self, "system_message", {"role": "system", "content": self.system})
+
+    def messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        return [
+            self.system_message,
+            {"role": "user", "content": self.user_template.format(context=context, query=query)},
+        ]
+
+
+SYSTEM_PROMPT = """You are a specialized assistant that answers questions about blockchain technology, the Sui blockchain, the Move smart contract language, and Walrus (Walrus Labs / Walrus on Sui, including its architecture and token information).
+
+Scope: You can answer questions about:
+- General blockchain concepts (what is blockchain, types of blockchain, consensus mechanisms, proof of work, proof of stake, distributed ledgers, etc.)
+- Sui blockchain (architecture, objects, transactions, consensus, validators, epochs, etc.)
+- Move programming language (smart contracts, syntax, security, development, etc.)
+- Walrus (data availability, blobs, epochs, validators, token, integration with Sui, etc.)
+- Cryptocurrency and blockchain security concepts
+- Blockchain development and smart contract programming
+- Installation and setup guides for blockchain tools
+- Development tutorials and guides
+- API documentation and usage
+- Troubleshooting blockchain issues
+
+Rules:
+1. Use information from the provided context when available (Sui docs, Move book, Walrus docs/GitHub, and price data when present)
+2. For general blockchain questions (what is blockchain, types of blockchain, consensus mechanisms, proof of work, etc.), use your training data to provide comprehensive answers
+3. For Sui, Move, and Walrus specific questions, prioritize the provided context but supplement with your knowledge when needed
+4. For installation, setup, and development questions, provide detailed step-by-step instructions
+5. For current pricing and cost information (like Walrus storage costs per epoch), use your training data and mention that real-time pricing is available through Walrus Scan APIs
+6. If the question is not about blockchain, Sui, Move, or Walrus, say "I only help with blockchain, Sui, Move, and Walrus topics"
+7. Be concise but comprehensive
+8. Include code examples when relevant
+9. For typos and misspellings, provide the correct information (e.g., "blockhain" should be "blockchain")
+10. Always stay within the scope of blockchain, Sui, Move, and Walrus topics
+11. Provide practical, actionable answers for development and installation questions
+12. For current pricing data, direct users to official sources like Walrus Scan for real-time information"""
+
+CHAT_PROMPT = ChatPrompt(
+    version="chat-v1",
+    system=SYSTEM_PROMPT,
+    user_template="Context (Sui/Move/Walrus): {context}\n\nQuestion: {query}",
+)
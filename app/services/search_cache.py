@@ -0,0 +1,119 @@
+# ======================
+# app/services/search_cache.py
+# ======================
+import asyncio
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from app.core.config import settings
+from app.services.validation_service import ValidationService
+from app.utils.cache import TTLCache
+from app.utils.logger import get_logger
+from app.utils.metrics import CACHE_REQUESTS
+from app.utils.tracing import set_attributes
+
+
+class SearchCache:
+    """Per-source TTL cache for external search results with stale-while-revalidate.
+
+    Each entry is fresh for its source's TTL, then may be served stale for
+    ``ttl * stale_factor`` more seconds while a single background refresh runs.
+    Empty (None) results are never cached so failed lookups are retried.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int, stale_factor: float):
+        self.ttls = ttls
+        self.stale_factor = stale_factor
+        self._cache = TTLCache(max_entries=max_entries, ttl=max(ttls.values()))
+        self._refreshing: Dict[Hashable, asyncio.Task] = {}
+        self._counters = {source: {"hits": 0, "stale_hits": 0, "misses": 0} for source in ttls}
+        self.logger = get_logger(__name__)
+
+    @classmethod
+    def from_settings(cls) -> "SearchCache":
+        return cls(
+            ttls={
+                "docs": settings.search_cache_docs_ttl,
+                "web": settings.search_cache_web_ttl,
+                "price": settings.search_cache_price_ttl,
+                "stats": settings.search_cache_stats_ttl,
+            },
+            max_entries=settings.search_cache_max_entries,
+            stale_factor=settings.search_cache_stale_factor,
+        )
+
+    def _store(self, source: str, key: Hashable, value: str) -> None:
+        ttl = self.ttls[source]
+        self._cache.set(key, (time.monotonic() + ttl, value), ttl=ttl * (1 + self.stale_factor))
+
+    async def get_or_fetch(
+        self, source: str, key: Hashable, fetch: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        counters = self._counters[source]
+        entry = self._cache.get(key)
+        if entry is not None:
+            fresh_until, value = entry
+            if fresh_until > time.monotonic():
+                result = "hit"
+                counters["hits"] += 1
+            else:
+                result = "stale"
+                counters["stale_hits"] += 1
+                self._schedule_refresh(source, key, fetch)
+            CACHE_REQUESTS.inc(cache=f"search_{source}", result=result)
+            set_attributes({"cache.hit": True, "cache.result": result})
+            return value
+
+        counters["misses"] += 1
+        CACHE_REQUESTS.inc(cache=f"search_{source}", result="miss")
+        set_attributes({"cache.hit": False, "cache.result": "miss"})
+        value = await fetch()
+        if value is not None:
+            self._store(source, key, value)
+        return value
+
+    def _schedule_refresh(self, source: str, key: Hashable, fetch: Callable[[], Awaitable[Optional[str]]]) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh():
+            try:
+                value = await fetch()
+                if value is not None:
+                    self._store(source, key, value)
+            except Exception as e:
+                self.logger.error(f"Background refresh for {source} failed: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._cache),
+            "max_entries": self._cache.max_entries,
+            "sources": {source: dict(counts) for source, counts in self._counters.items()},
+        }
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def cached_search(source: str):
+    """Route a SearchService fetcher through ``self.search_cache`` under the given source TTL.
+
+    Fetchers must return None on failure (never cached) and leave placeholder or
+    fallback text to their callers, or an outage is cached as a result.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args):
+            if self.search_cache is None:
+                return await method(self, *args)
+            key = (method.__name__,) + tuple(
+                ValidationService.normalize_query(arg) if isinstance(arg, str) else arg for arg in args
+            )
+            return await self.search_cache.get_or_fetch(source, key, lambda: method(self, *args))
+        return wrapper
+    return decorator
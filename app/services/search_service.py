@@ -1,53 +1,195 @@
 # ======================
 # app/services/search_service.py
 # ======================
-import requests
-import re
-from typing import Optional
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
 from app.core.config import settings
-from app.utils.exceptions import SearchError
+from app.core.http_client import get_http_client
+from app.services.search_cache import SearchCache, cached_search
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.hedging import LatencyTracker
+from app.services.live_data import LiveDataRefresher
+from app.services.intent_classifier import classify_query
+from app.services.local_index import LOCAL_INDEX
+from app.services.embedding_index import get_embedding_index
+from app.services.validation_service import ValidationService
+from app.utils.deadline import deadline_scope, expired, remaining
+from app.utils.exceptions import CircuitOpenError, SearchError
 from app.utils.logger import get_logger
-from app.data.sui_info import SUI_BLOCKCHAIN_INFO
-from app.data.walrus_info import WALRUS_INFO
+from app.utils.metrics import SEARCH_ANSWERED, STAGE_SECONDS, UPSTREAM_ERRORS, UPSTREAM_SECONDS
+from app.utils.singleflight import SingleFlight
+from app.utils.tracing import set_attributes, span
+
+
+# Upstream providers; each gets its own circuit breaker
+PROVIDERS = ("tavily", "duckduckgo", "coingecko", "walrusscan", "suiscan")
+
 
+def provider_base_urls() -> Dict[str, str]:
+    """Configured base URL of each provider (the public APIs unless overridden, e.g. by load-test stubs)."""
+    return {provider: getattr(settings, f"{provider}_base_url").rstrip("/") for provider in PROVIDERS}
+
+# Served for Walrus network questions when live stats have never been fetched successfully
+WALRUS_NETWORK_FALLBACK = (
+    "Walrus Network: The Walrus network consists of distributed validators that provide data availability "
+    "services. Validator count varies based on network growth and adoption. For real-time stats, visit walrusscan.com"
+)
 
 
 class SearchService:
     def __init__(self):
         self.logger = get_logger(__name__)
+        self.search_cache: Optional[SearchCache] = SearchCache.from_settings() if settings.search_cache_enabled else None
+        # The refresher calls the uncached fetchers: its snapshots already are the cache
+        self.live_data = LiveDataRefresher(
+            {
+                "walrus_price": lambda: SearchService._get_walrus_price.__wrapped__(self),
+                "walrus_network_stats": lambda: SearchService._get_walrus_network_stats.__wrapped__(self),
+                "sui_network_stats": lambda: SearchService._get_sui_network_stats.__wrapped__(self),
+            },
+            interval=settings.live_data_refresh_interval,
+        )
+        self.inflight = SingleFlight()
+        self.base_urls = provider_base_urls()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        if settings.circuit_breaker_enabled:
+            self.breakers = {
+                provider: CircuitBreaker(
+                    provider,
+                    failure_threshold=settings.circuit_breaker_failure_threshold,
+                    slow_call_seconds=settings.circuit_breaker_slow_call_seconds,
+                    recovery_seconds=settings.circuit_breaker_recovery_seconds,
+                )
+                for provider in PROVIDERS
+            }
+        self.latency: Dict[str, LatencyTracker] = {}
+        if settings.hedging_enabled:
+            self.latency = {
+                provider: LatencyTracker(
+                    window=settings.hedge_window,
+                    quantile=settings.hedge_quantile,
+                    min_samples=settings.hedge_min_samples,
+                    min_delay=settings.hedge_min_delay_seconds,
+                )
+                for provider in PROVIDERS
+            }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the host's pool and its provider's circuit breaker.
+
+        Raises CircuitOpenError without touching the network while the breaker is
+        open, and raises for HTTP error statuses; only 5xx/429, errors, slow calls and
+        calls cut off by the search deadline count as provider failures.
+        GETs slower than the provider's tracked p90 are hedged with a duplicate; POSTs
+        (paid Tavily searches) only with HEDGE_POST_REQUESTS. An attempt that gets an
+        error status fails, so a fast 5xx never wins over a slower success.
+        """
+        provider = next((name for name, base in self.base_urls.items() if url.startswith(f"{base}/")), None)
+        provider_label = provider or "other"
+        breaker = self.breakers.get(provider)
+        if breaker is not None and not breaker.allow_request():
+            UPSTREAM_ERRORS.inc(provider=provider_label, reason="circuit_open")
+            raise CircuitOpenError(f"{breaker.name} circuit is open - skipping")
+
+        async def attempt() -> httpx.Response:
+            client = get_http_client(url)
+            send = client.post if method == "POST" else client.get
+            with span(
+                f"{method} {provider_label}",
+                {"http.request.method": method, "server.address": httpx.URL(url).host, "peer.service": provider_label},
+                kind="CLIENT",
+            ) as http_span:
+                response = await send(url, **kwargs)
+                if http_span.is_recording():
+                    http_span.set_attribute("http.response.status_code", response.status_code)
+                    http_span.set_attribute("http.response.body.size", len(response.content))
+            response.raise_for_status()
+            return response
+
+        tracker = self.latency.get(provider) if method == "GET" or settings.hedge_post_requests else None
+        start = time.monotonic()
+        try:
+            response = await (tracker.call(attempt) if tracker is not None else attempt())
+        except asyncio.CancelledError:
+            # A call cut off by the search deadline, or cancelled after it was already slow,
+            # is a hung provider: it must count, or the breaker never opens while deadlines
+            # are active. Other cancellations (a faster tier won, the client left) say nothing.
+            elapsed = time.monotonic() - start
+            if expired() or (breaker is not None and elapsed >= breaker.slow_call_seconds):
+                UPSTREAM_ERRORS.inc(provider=provider_label, reason="deadline" if expired() else "cancelled_slow")
+                if breaker is not None:
+                    breaker.record_failure(f"Cut off after {elapsed:.1f}s")
+            elif breaker is not None:
+                breaker.release()
+            raise
+        except httpx.HTTPStatusError as e:
+            status = e.response.status_code
+            UPSTREAM_SECONDS.observe(time.monotonic() - start, provider=provider_label)
+            UPSTREAM_ERRORS.inc(provider=provider_label, reason=f"http_{status // 100}xx" if status != 429 else "http_429")
+            if breaker is not None:
+                if status >= 500 or status == 429:
+                    breaker.record_failure(f"HTTP {status}")
+                else:
+                    breaker.record_success(time.monotonic() - start)
+            raise
+        except Exception as e:
+            UPSTREAM_ERRORS.inc(
+                provider=provider_label, reason="timeout" if isinstance(e, httpx.TimeoutException) else "error"
+            )
+            if breaker is not None:
+                breaker.record_failure(str(e) or type(e).__name__)
+            raise
+
+        UPSTREAM_SECONDS.observe(time.monotonic() - start, provider=provider_label)
+        if breaker is not None:
+            breaker.record_success(time.monotonic() - start)
+        return response
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._request("GET", url, **kwargs)
+
+    async def _post(self, url: str, **kwargs) -> httpx.Response:
+        return await self._request("POST", url, **kwargs)
+
+    def circuit_status(self) -> Dict[str, Dict]:
+        return {name: breaker.status() for name, breaker in self.breakers.items()}
+
+    def hedging_status(self) -> Dict[str, Dict]:
+        return {name: tracker.status() for name, tracker in self.latency.items()}
 
     def _is_walrus_query(self, query: str) -> bool:
-        q = query.lower()
-        walrus_terms = [
-            r"walrus", r"walrus labs", r"walrus sui", r"walrus da", r"walrus coin",
-            r"wal token", r"wal price", r"wal ticker"
-        ]
-        return any(re.search(term, q, re.IGNORECASE) for term in walrus_terms)
+        return classify_query(query).walrus
 
     def _is_blockchain_related(self, query: str) -> bool:
         """Check if query is related to blockchain, Sui, Move, or Walrus topics."""
-        q = query.lower()
-        blockchain_terms = [
-            r"blockchain", r"crypto", r"cryptocurrency", r"defi", r"nft", r"dapp",
-            r"sui", r"move", r"walrus", r"smart contract", r"token", r"coin",
-            r"validator", r"consensus", r"staking", r"gas", r"transaction",
-            r"proof of work", r"proof of stake", r"pow", r"pos", r"mining", r"miners",
-            r"distributed ledger", r"ledger", r"hash", r"block", r"epoch",
-            r"decentralized", r"decentralization", r"peer to peer", r"p2p",
-            r"wallet", r"address", r"private key", r"public key", r"signature",
-            r"bitcoin", r"ethereum", r"solana", r"cardano", r"polkadot",
-            r"blockhain", r"blockhchain", r"cryptocurreny", r"cryptocurrencty",
-            r"walrus labs", r"walruslabs", r"walruss", r"walruss labs"
-        ]
-        return any(re.search(term, q, re.IGNORECASE) for term in blockchain_terms)
-
-    def _search_tavily_site_specific(self, query: str) -> Optional[str]:
+        return classify_query(query).blockchain_related
+
+    async def _live_value(self, name: str, fetch: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Read a live value from the background snapshot, fetching directly only when none exists yet."""
+        if self.live_data.running:
+            value = self.live_data.get(name)
+            if value is not None:
+                return value
+        return await fetch()
+
+    def is_realtime_query(self, query: str) -> bool:
+        """True when the answer depends on live price or network data and must not be cached."""
+        intents = classify_query(query)
+        return intents.price or intents.stats
+
+    @cached_search("docs")
+    async def _search_tavily_site_specific(self, query: str) -> Optional[str]:
         """Search using our configured authoritative sources first"""
         if not settings.tavily_api_key:
             return None
 
         try:
-            url = "https://api.tavily.com/search"
+            url = f"{self.base_urls['tavily']}/search"
             
             # Use our configured authoritative sources
             walrus_sites = (
@@ -67,7 +209,7 @@ class SearchService:
                 "max_results": 5
             }
 
-            response = requests.post(url, json=payload, timeout=10)
+            response = await self._post(url, json=payload, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -81,10 +223,11 @@ class SearchService:
             self.logger.error(f"Tavily site-specific search failed: {e}")
             return None
 
-    def _search_authoritative_sources(self, query: str) -> Optional[str]:
+    @cached_search("docs")
+    async def _search_authoritative_sources(self, query: str) -> Optional[str]:
         """Search the most authoritative sources first: Sui docs, Walrus docs, Scans, Labs"""
         try:
-            search_url = "https://api.duckduckgo.com/"
+            search_url = f"{self.base_urls['duckduckgo']}/"
             
             # Prioritize the most authoritative sources
             authoritative_sites = (
@@ -99,7 +242,7 @@ class SearchService:
                 'skip_disambig': '1'
             }
 
-            response = requests.get(search_url, params=params, timeout=5)
+            response = await self._get(search_url, params=params, timeout=5)
             data = response.json()
 
             content = ""
@@ -112,10 +255,11 @@ class SearchService:
             self.logger.error(f"Authoritative sources search failed: {e}")
             return None
 
-    def _search_duckduckgo_site_specific(self, query: str) -> Optional[str]:
+    @cached_search("docs")
+    async def _search_duckduckgo_site_specific(self, query: str) -> Optional[str]:
         """Search using our configured authoritative sources first"""
         try:
-            search_url = "https://api.duckduckgo.com/"
+            search_url = f"{self.base_urls['duckduckgo']}/"
             
             # Use our configured authoritative sources
             ddg_sites = (
@@ -132,7 +276,7 @@ class SearchService:
                 'skip_disambig': '1'
             }
 
-            response = requests.get(search_url, params=params, timeout=5)
+            response = await self._get(search_url, params=params, timeout=5)
             data = response.json()
 
             content = ""
@@ -145,12 +289,13 @@ class SearchService:
             self.logger.error(f"DuckDuckGo site-specific search failed: {e}")
             return None
 
-    def _search_tavily(self, query: str) -> Optional[str]:
+    @cached_search("web")
+    async def _search_tavily(self, query: str) -> Optional[str]:
         if not settings.tavily_api_key:
             return None
 
         try:
-            url = "https://api.tavily.com/search"
+            url = f"{self.base_urls['tavily']}/search"
             
             # For blockchain-related queries, use general internet search
             if self._is_blockchain_related(query):
@@ -176,7 +321,7 @@ class SearchService:
                 "max_results": 5
             }
 
-            response = requests.post(url, json=payload, timeout=10)
+            response = await self._post(url, json=payload, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -195,9 +340,10 @@ class SearchService:
             self.logger.error(f"Tavily search failed: {e}")
             return None
 
-    def _search_duckduckgo(self, query: str) -> Optional[str]:
+    @cached_search("web")
+    async def _search_duckduckgo(self, query: str) -> Optional[str]:
         try:
-            search_url = "https://api.duckduckgo.com/"
+            search_url = f"{self.base_urls['duckduckgo']}/"
             
             # For blockchain-related queries, use general search with blockchain keywords
             if self._is_blockchain_related(query):
@@ -225,7 +371,7 @@ class SearchService:
                     'skip_disambig': '1'
                 }
 
-            response = requests.get(search_url, params=params, timeout=5)
+            response = await self._get(search_url, params=params, timeout=5)
             data = response.json()
 
             content = ""
@@ -246,10 +392,11 @@ class SearchService:
             self.logger.error(f"DuckDuckGo search failed: {e}")
             return None
 
-    def _get_walrus_price(self) -> Optional[str]:
+    @cached_search("price")
+    async def _get_walrus_price(self) -> Optional[str]:
         try:
-            search_resp = requests.get(
-                "https://api.coingecko.com/api/v3/search",
+            search_resp = await self._get(
+                f"{self.base_urls['coingecko']}/search",
                 params={"query": "walrus"},
                 timeout=5,
             )
@@ -261,8 +408,8 @@ class SearchService:
             coin_id = coins[0].get("id")
             if not coin_id:
                 return None
-            price_resp = requests.get(
-                "https://api.coingecko.com/api/v3/simple/price",
+            price_resp = await self._get(
+                f"{self.base_urls['coingecko']}/simple/price",
                 params={"ids": coin_id, "vs_currencies": "usd"},
                 timeout=5,
             )
@@ -276,12 +423,13 @@ class SearchService:
             self.logger.error(f"Failed to fetch Walrus price: {e}")
             return None
 
-    def _get_walrus_network_stats(self) -> Optional[str]:
+    @cached_search("stats")
+    async def _get_walrus_network_stats(self) -> Optional[str]:
         """Fetch Walrus network statistics from Walrus Scan API."""
         try:
             # Try Walrus Scan API for network stats
-            stats_resp = requests.get(
-                "https://api.walrusscan.com/api/v1/network/stats",
+            stats_resp = await self._get(
+                f"{self.base_urls['walrusscan']}/network/stats",
                 timeout=5,
             )
             stats_resp.raise_for_status()
@@ -308,15 +456,24 @@ class SearchService:
         except Exception as e:
             self.logger.error(f"Failed to fetch Walrus network stats: {e}")
         
-        # Fallback: Return basic Walrus network info if API fails
-        return "Walrus Network: The Walrus network consists of distributed validators that provide data availability services. Validator count varies based on network growth and adoption. For real-time stats, visit walrusscan.com"
+        return None
 
-    def _get_sui_network_stats(self) -> Optional[str]:
+    async def _walrus_network_stats(self) -> str:
+        """Live Walrus stats, or general network info when no fetch has ever succeeded.
+
+        The fallback is applied here, after the refresher snapshot and search cache,
+        so an outage never replaces or gets cached as real stats.
+        """
+        stats = await self._live_value("walrus_network_stats", self._get_walrus_network_stats)
+        return stats or WALRUS_NETWORK_FALLBACK
+
+    @cached_search("stats")
+    async def _get_sui_network_stats(self) -> Optional[str]:
         """Fetch Sui network statistics from Sui Scan API."""
         try:
             # Try Sui Scan API for network stats
-            stats_resp = requests.get(
-                "https://api.suiscan.xyz/api/v1/network/stats",
+            stats_resp = await self._get(
+                f"{self.base_urls['suiscan']}/network/stats",
                 timeout=5,
             )
             stats_resp.raise_for_status()
@@ -345,161 +502,295 @@ class SearchService:
         
         return None
 
-    def _search_walrus(self, query: str) -> Optional[str]:
-        content = self._search_tavily(query)
+    async def _search_walrus(
+        self,
+        query: str,
+        search_tavily: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+        search_duckduckgo: Optional[Callable[[], Awaitable[Optional[str]]]] = None,
+    ) -> Optional[str]:
+        """Walrus-specific search: general web results plus live price and network stats where asked for.
+
+        ``search_tavily`` / ``search_duckduckgo`` replace the general searches, so
+        fan-out can hand in the calls it already runs as STEPS 8-9.
+        """
+        content = await (search_tavily or functools.partial(self._search_tavily, query))()
         if not content:
-            content = self._search_duckduckgo(query)
+            content = await (search_duckduckgo or functools.partial(self._search_duckduckgo, query))()
         
         # Add price info for price-related queries
-        if re.search(r"price|worth|value|market\s*cap|how much", query, re.IGNORECASE):
-            price_info = self._get_walrus_price()
+        intents = classify_query(query)
+        if intents.price:
+            price_info = await self._live_value("walrus_price", self._get_walrus_price)
             if price_info:
                 content = (content + "\n\n" if content else "") + price_info
         
         # Add network stats for validator/network queries
-        if re.search(r"validator|validators|network|nodes|stake|tps|stats", query, re.IGNORECASE):
-            network_stats = self._get_walrus_network_stats()
+        if intents.network:
+            network_stats = await self._walrus_network_stats()
             if network_stats:
                 content = (content + "\n\n" if content else "") + network_stats
         
         return content
 
     def _check_local_info(self, query: str) -> Optional[str]:
-        query = query.lower()
-
-        # Check Walrus patterns first for faster response
-        walrus_patterns = {
-            "what_is_walrus": [r"what is walrus", r"walrus blockchain", r"about walrus", r"walrus overview", r"define walrus", r"walrus definition", r"what is walruss", r"walruss", r"what.*walruss"],
-            "walrus_da": [r"walrus da", r"data availability", r"walrus data availability", r"da solution"],
-            "walrus_blobs": [r"walrus blob", r"blob storage", r"data blob", r"walrus data blob", r"blob", r"walrus.*blob"],
-            "walrus_architecture": [r"walrus architecture", r"how walrus works", r"walrus design", r"walrus structure"],
-            "walrus_token": [r"walrus token", r"wal token", r"wal coin", r"walrus economics", r"walrus tokenomics"],
-            "walrus_sui": [r"walrus sui", r"walrus on sui", r"walrus sui integration"],
-            "walrus_validators": [r"walrus validator", r"walrus validators", r"how many validator", r"walrus network", r"walrus nodes", r"validator.*walrus", r"how many.*walrus", r"validator", r"validators", r"how many.*validator", r"walrus.*validator", r"validator.*exist", r"validator.*count"],
-            "walrus_epochs": [r"walrus epoch", r"walrus epochs", r"walrus epoch.*", r"epoch.*walrus", r"walrus.*epoch", r"how many.*day.*epoch", r"epoch.*day", r"walrus.*day", r"how long.*walrus.*epoch", r"walrus.*epoch.*duration", r"walrus.*epoch.*length", r"walrus.*epoch.*time", r"walrus.*epoch.*period"],
-            "walrus_blob_ids": [r"walrus blob id", r"walrus blob ids", r"blob id", r"blob ids", r"walrus.*blob.*id", r"blob.*id.*walrus"],
-            "walrus_storage_costs": [r"walrus storage cost", r"walrus storage price", r"walrus cost", r"walrus price", r"how much.*walrus", r"walrus.*cost", r"walrus.*price", r"storage.*cost.*walrus", r"walrus.*storage.*cost", r"how much.*store.*walrus", r"walrus.*fee", r"walrus.*billing"],
-            "walrus_economics": [r"walrus economics", r"walrus tokenomics", r"walrus economy", r"walrus revenue", r"walrus income", r"walrus profit", r"walrus business", r"walrus financial", r"walrus economic", r"walrus.*economic", r"walrus.*financial"]
-        }
-
-        for info_key, pattern_list in walrus_patterns.items():
-            for pattern in pattern_list:
-                if re.search(pattern, query, re.IGNORECASE):
-                    self.logger.info(f"Found local Walrus information for: {query}")
-                    return WALRUS_INFO[info_key]
-
-        patterns = {
-            "what_is_sui": [r"what is sui", r"sui blockchain", r"about sui", r"sui overview", r"define sui", r"sui definition"],
-            "sui_token": [r"sui token", r"token economics", r"tokenomics", r"sui coin"],
-            "sui_architecture": [r"architecture", r"how sui works", r"sui design", r"sui structure"],
-            "move_language": [r"move language", r"programming language", r"smart contract language", r"move programming"],
-            "sui_objects": [r"sui objects", r"object model", r"object-centric", r"sui object", r"sui.*object", r"object.*sui"],
-            "sui_transactions": [r"transactions", r"tx", r"how transactions work", r"sui transaction", r"sui.*transaction", r"transaction.*sui"],
-            "sui_consensus": [r"consensus", r"narwhal", r"bullshark", r"proof of stake", r"sui consensus", r"sui.*consensus", r"consensus.*sui"],
-            "sui_storage": [r"storage", r"data storage", r"state storage"],
-            "sui_smart_contracts": [r"smart contracts", r"contracts", r"dapps", r"applications"],
-            "sui_validators": [r"sui validator", r"sui validators", r"how many sui validator", r"sui network", r"sui nodes"],
-            "sui_epochs": [r"sui epoch", r"sui epochs", r"epoch.*sui", r"sui.*epoch", r"how long.*sui.*epoch", r"sui.*epoch.*duration", r"sui.*epoch.*length", r"sui.*epoch.*time", r"sui.*epoch.*period", r"epoch.*sui.*duration", r"epoch.*sui.*length", r"epoch.*sui.*time", r"epoch.*sui.*period"],
-            "move_smart_contracts": [r"move smart contract", r"move smart contracts", r"move contract", r"move contracts", r"smart contract", r"smart contracts", r"move.*contract", r"contract.*move"],
-            "what_is_blockchain": [r"what is blockchain", r"blockchain", r"about blockchain", r"blockchain overview", r"define blockchain", r"blockchain definition", r"what.*blockchain", r"what is blockhain", r"blockhain", r"what.*blockhain"],
-            "types_of_blockchain": [r"types of blockchain", r"blockchain types", r"kinds of blockchain", r"blockchain categories", r"different blockchain", r"blockchain classification", r"types of blockhain", r"blockhain types"],
-            "distributed_ledger": [r"distributed ledger", r"distributed database", r"ledger technology", r"distributed system", r"what.*distributed.*ledger"],
-            "proof_of_work": [r"proof of work", r"pow", r"mining", r"miners", r"what.*proof.*work", r"how.*mining.*work"],
-            "sui_blockchain_type": [r"what type.*sui", r"sui.*type", r"what.*blockchain.*sui", r"sui.*blockchain.*type", r"type.*sui.*blockchain"],
-            "blockchain_consensus": [r"consensus mechanism", r"consensus algorithm", r"blockchain consensus", r"how.*consensus.*work", r"consensus.*blockchain"],
-            "blockchain_security": [r"blockchain security", r"crypto security", r"blockchain.*secure", r"security.*blockchain", r"blockchain.*attack"]
-        }
-
-        for info_key, pattern_list in patterns.items():
-            for pattern in pattern_list:
-                if re.search(pattern, query, re.IGNORECASE):
-                    self.logger.info(f"Found local information for: {query}")
-                    return SUI_BLOCKCHAIN_INFO[info_key]
-        
+        # Only a topic pattern match makes a question local; BM25 then picks that entry's relevant paragraphs
+        matched = classify_query(query).local_info_keys
+        results = LOCAL_INDEX.search_entries(query, [key for _, key in matched])
+        if not results:
+            return None
+        self.logger.info(f"Found {len(results)} local chunks for: {query.lower()} "
+                         f"(top: {results[0][1].key}, score {results[0][0]:.2f})")
+        return "\n\n".join(chunk.text for _, chunk in results)
+
+    def _check_semantic_info(self, query: str) -> Optional[str]:
+        index = get_embedding_index()
+        if index is None:
+            return None
+        # Word-overlap similarity finds *some* local chunk for almost anything; questions about
+        # recent changes or other chains belong to the web search, whatever the score
+        intents = classify_query(query)
+        if intents.time_sensitive or intents.other_ecosystem:
+            return None
+        results = [
+            (score, chunk) for score, chunk in index.search(query, k=settings.semantic_search_top_k)
+            if score >= settings.semantic_search_min_score
+        ]
+        if not results:
+            return None
+        self.logger.info(f"Found {len(results)} semantically similar local chunks for: {query.lower()} "
+                         f"(top: {results[0][1].key}, similarity {results[0][0]:.2f})")
+        return "\n\n".join(chunk.text for _, chunk in results)
+
+    def _external_tiers(self, query: str) -> List[Tuple[str, str, Callable[[], Awaitable[Optional[str]]]]]:
+        """External search tiers (STEPS 4-9) as (step, label, fetch), highest priority first."""
+        search_tavily = functools.partial(self._search_tavily, query)
+        search_duckduckgo = functools.partial(self._search_duckduckgo, query)
+        if settings.search_mode == "fanout":
+            # The Walrus tier and STEPS 8-9 run at once; give them one call per provider
+            search_tavily, search_duckduckgo = self._shared_calls(search_tavily, search_duckduckgo)
+
+        tiers = []
+        # STEP 4: Walrus-specific external search (if Walrus query)
+        if self._is_walrus_query(query):
+            tiers.append(("walrus", "Walrus-specific search",
+                          lambda: self._search_walrus(query, search_tavily, search_duckduckgo)))
+        tiers.extend([
+            # STEP 5: Authoritative sources (Sui docs, Walrus docs, Scans, Labs)
+            ("authoritative", "authoritative sources", lambda: self._search_authoritative_sources(query)),
+            # STEP 6: Tavily site-specific search (exhaust our configured sources)
+            ("tavily_site", "Tavily site-specific search", lambda: self._search_tavily_site_specific(query)),
+            # STEP 7: DuckDuckGo site-specific search (exhaust our configured sources)
+            ("ddg_site", "DuckDuckGo site-specific search", lambda: self._search_duckduckgo_site_specific(query)),
+            # STEP 8: Tavily general internet search (broader but still blockchain-focused)
+            ("tavily", "Tavily general search", search_tavily),
+            # STEP 9: DuckDuckGo general internet search (last resort before OpenAI)
+            ("ddg", "DuckDuckGo general search", search_duckduckgo),
+        ])
+        return [(step, label, functools.partial(self._timed, step, fetch)) for step, label, fetch in tiers]
+
+    @staticmethod
+    def _shared_calls(
+        *fetches: Callable[[], Awaitable[Optional[str]]]
+    ) -> List[Callable[[], Awaitable[Optional[str]]]]:
+        """Wrap ``fetches`` so that every caller within one search shares a single call to each.
+
+        Concurrent callers join the running call and later callers get its result.
+        The call is cancelled only once every caller waiting on it has been
+        cancelled, so a losing fan-out tier cannot cut off one that still needs it.
+        """
+        inflight, results = SingleFlight(), {}
+
+        def shared(index: int, fetch: Callable[[], Awaitable[Optional[str]]]):
+            async def run() -> Optional[str]:
+                # Stored by the call itself, before SingleFlight forgets it
+                results[index] = await fetch()
+                return results[index]
+
+            async def call() -> Optional[str]:
+                if index in results:
+                    return results[index]
+                return await inflight.do(index, run)
+            return call
+
+        return [shared(index, fetch) for index, fetch in enumerate(fetches)]
+
+    async def _timed(self, step: str, fetch: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """Await one search step within the remaining search budget, in its own span, and record its latency.
+
+        Steps are skipped once the deadline has passed and cut off (returning None)
+        when it passes mid-step. Cancelled fan-out tiers are not recorded.
+        """
+        budget = remaining()
+        if budget == 0:
+            self.logger.info(f"Search deadline exhausted - skipping {step}")
+            return None
+        start = time.perf_counter()
+        with span(f"search.{step}", {"search.step": step, "search.budget_seconds": budget}) as step_span:
+            try:
+                result = await asyncio.wait_for(fetch(), budget)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Search step {step} cut off by the search deadline")
+                step_span.set_attribute("search.deadline_exceeded", True)
+                result = None
+            step_span.set_attribute("search.found", bool(result))
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=f"search_{step}")
+        return result
+
+    def _answered(self, step: str, content: Optional[str]) -> Optional[str]:
+        SEARCH_ANSWERED.inc(step=step)
+        set_attributes({"search.answered_by": step})
+        return content
+
+    async def _walk_tiers(self, tiers) -> Optional[Tuple[str, str, str]]:
+        """Try each tier in turn and stop at the first non-empty result."""
+        for step, label, fetch in tiers:
+            content = await fetch()
+            if content:
+                return step, label, content
         return None
 
-    def search_sui_docs(self, query: str) -> str:
+    async def _race_tiers(self, tiers) -> Optional[Tuple[str, str, str]]:
+        """Start every tier at once but keep priority order.
+
+        A tier's result is used only after every higher-priority tier has finished
+        empty; the remaining tiers are cancelled as soon as a winner is known.
+        """
+        tasks = [asyncio.create_task(fetch()) for _, _, fetch in tiers]
+        try:
+            for (step, label, _), task in zip(tiers, tasks):
+                try:
+                    content = await task
+                except Exception as e:
+                    self.logger.error(f"{label} failed: {e}")
+                    continue
+                if content:
+                    return step, label, content
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def search_sui_docs(self, query: str, deadline: Optional[float] = None) -> str:
+        """Run the search steps for ``query`` within ``deadline`` seconds (default SEARCH_DEADLINE_SECONDS).
+
+        Every step only gets the budget that is left; once it is spent the
+        remaining steps are skipped and None is returned so the AI answers alone.
+        """
+        return await self._run_phase("search", query, deadline, self._search_sui_docs)
+
+    async def search_local(self, query: str, deadline: Optional[float] = None) -> Optional[str]:
+        """Only the steps that need no web search (STEPS 1-3b: live snapshots, local knowledge).
+
+        Returns None when the external tiers are needed; raises SearchError for
+        off-topic queries like search_sui_docs.
+        """
+        return await self._run_phase("search_local_phase", query, deadline, self._search_local)
+
+    async def search_external(self, query: str, deadline: Optional[float] = None) -> Optional[str]:
+        """The remaining steps (STEPS 4-11) for a query search_local could not answer."""
+        return await self._run_phase("search_external_phase", query, deadline, self._search_external)
+
+    async def _run_phase(
+        self, phase: str, query: str, deadline: Optional[float], search: Callable[[str], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        seconds = deadline if deadline is not None else settings.search_deadline_seconds
+        attributes = {"search.mode": settings.search_mode, "search.deadline_seconds": seconds}
+        with span(phase.replace("_", ".", 1), attributes), STAGE_SECONDS.time(stage=phase), deadline_scope(seconds):
+            if not settings.single_flight_enabled:
+                return await search(query)
+            # Identical in-flight queries wait for the same search instead of repeating it. The
+            # search runs under its first caller's deadline, so only callers with the same budget share it
+            key = (phase, ValidationService.normalize_query(query), seconds)
+            return await self.inflight.do(key, lambda: search(query))
+
+    async def _search_sui_docs(self, query: str) -> Optional[str]:
         self.logger.info(f"Searching for: {query}")
+        content = await self._search_local(query)
+        if content:
+            return content
+        return await self._search_external(query)
+
+    async def _search_local(self, query: str) -> Optional[str]:
+        intents = classify_query(query)
 
         # Check if query is blockchain-related, if not, reject it
-        if not self._is_blockchain_related(query):
+        if not intents.blockchain_related:
             raise SearchError("I only help with Sui blockchain, Move language, and Walrus topics. Please ask about blockchain, crypto, Sui, Move, or Walrus.")
 
         # STEP 1: Try to get real-time data first (price, network stats) for specific queries
-        if re.search(r"price|worth|value|market\s*cap|how much", query, re.IGNORECASE):
-            if self._is_walrus_query(query):
-                price_info = self._get_walrus_price()
+        if intents.price:
+            if intents.walrus:
+                price_info = await self._timed(
+                    "price", lambda: self._live_value("walrus_price", self._get_walrus_price)
+                )
                 if price_info:
                     self.logger.info("Found Walrus price info - returning immediately")
-                    return price_info
+                    return self._answered("price", price_info)
 
         # STEP 2: Try to get real-time network stats for validator/network queries
-        if re.search(r"validator|validators|network|nodes|stake|tps|stats|how many|count|exist", query, re.IGNORECASE):
+        if intents.stats:
             # Try Walrus network stats first
-            if self._is_walrus_query(query):
-                network_stats = self._get_walrus_network_stats()
+            if intents.walrus:
+                network_stats = await self._timed(
+                    "stats", self._walrus_network_stats
+                )
                 if network_stats:
                     self.logger.info("Found Walrus network stats - returning immediately")
-                    return network_stats
+                    return self._answered("stats", network_stats)
             
             # Try Sui network stats
-            if re.search(r"sui.*validator|sui.*validators|sui.*network|sui.*nodes|sui.*stake|sui.*tps", query, re.IGNORECASE):
-                sui_stats = self._get_sui_network_stats()
+            if intents.sui_stats:
+                sui_stats = await self._timed(
+                    "stats", lambda: self._live_value("sui_network_stats", self._get_sui_network_stats)
+                )
                 if sui_stats:
                     self.logger.info("Found Sui network stats - returning immediately")
-                    return sui_stats
+                    return self._answered("stats", sui_stats)
 
         # STEP 3: Check local info for general queries (after real-time data)
-        content = self._check_local_info(query)
+        with span("search.local", {"search.step": "local"}), STAGE_SECONDS.time(stage="search_local"):
+            content = self._check_local_info(query)
         if content:
             self.logger.info("Found local information - returning immediately")
-            return content
+            return self._answered("local", content)
 
-        # STEP 4: Try Walrus-specific external search (if Walrus query)
-        if self._is_walrus_query(query):
-            walrus_content = self._search_walrus(query)
-            if walrus_content:
-                self.logger.info("Found Walrus-specific content - returning")
-                return walrus_content
-
-        # STEP 5: Try authoritative sources first (Sui docs, Walrus docs, Scans, Labs)
-        content = self._search_authoritative_sources(query)
-        if content:
-            self.logger.info("Found content via authoritative sources - returning")
-            return content
-
-        # STEP 6: Try Tavily with site-specific search (exhaust our configured sources)
-        content = self._search_tavily_site_specific(query)
+        # STEP 3b: Semantic match against local knowledge (paraphrases the keyword index misses)
+        with span("search.semantic", {"search.step": "semantic"}), STAGE_SECONDS.time(stage="search_semantic"):
+            content = self._check_semantic_info(query)
         if content:
-            self.logger.info("Found content via Tavily site-specific search - returning")
-            return content
+            self.logger.info("Found semantically similar local information - returning immediately")
+            return self._answered("semantic", content)
+        return None
 
-        # STEP 7: Try DuckDuckGo with site-specific search (exhaust our configured sources)
-        content = self._search_duckduckgo_site_specific(query)
-        if content:
-            self.logger.info("Found content via DuckDuckGo site-specific search - returning")
-            return content
+    async def _search_external(self, query: str) -> Optional[str]:
+        intents = classify_query(query)
 
-        # STEP 8: Try Tavily with general internet search (broader but still blockchain-focused)
-        content = self._search_tavily(query)
-        if content:
-            self.logger.info("Found content via Tavily general search - returning")
-            return content
+        # STEPS 4-9: External search tiers, in priority order
+        tiers = self._external_tiers(query)
+        if settings.search_mode == "fanout":
+            result = await self._race_tiers(tiers)
+        else:
+            result = await self._walk_tiers(tiers)
+        if result:
+            step, label, content = result
+            self.logger.info(f"Found content via {label} - returning")
+            return self._answered(step, content)
 
-        # STEP 9: Try DuckDuckGo with general internet search (last resort before OpenAI)
-        content = self._search_duckduckgo(query)
-        if content:
-            self.logger.info("Found content via DuckDuckGo general search - returning")
-            return content
+        if expired():
+            self.logger.info("Search deadline exhausted - allowing AI service to handle with its knowledge")
+            return self._answered("deadline", None)
 
         # STEP 10: If still no content, try to get any available network stats as fallback
-        if self._is_walrus_query(query):
-            fallback_stats = self._get_walrus_network_stats()
+        if intents.walrus:
+            fallback_stats = await self._timed(
+                "fallback_stats", self._walrus_network_stats
+            )
             if fallback_stats:
                 self.logger.info("Using Walrus network stats as fallback")
-                return fallback_stats
+                return self._answered("fallback_stats", fallback_stats)
 
         # STEP 11: Final fallback - let AI service handle with its knowledge
         self.logger.info("All search methods exhausted - allowing AI service to handle with its knowledge")
-        return None
+        return self._answered("none", None)
 
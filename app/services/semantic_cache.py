@@ -0,0 +1,212 @@
+# ======================
+# app/services/semantic_cache.py
+# ======================
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.intent_classifier import classify_query
+from app.services.validation_service import ValidationService
+from app.utils.logger import get_logger
+from app.utils.metrics import CACHE_REQUESTS
+
+Embed = Callable[[str], Awaitable[np.ndarray]]
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+NEGATIONS = frozenset({"not", "no", "never", "without", "cannot", "nor", "none"})
+# Words that make two otherwise similar questions different questions: other chains,
+# networks and opposed actions. Embeddings score "stake SUI" and "unstake SUI" (or
+# "Sui vs Aptos" and "Sui vs Solana") as near-duplicates, so these are compared literally.
+CONTRAST_TERMS = frozenset({
+    "sui", "walrus", "aptos", "solana", "ethereum", "eth", "bitcoin", "btc", "polygon", "avalanche",
+    "cosmos", "arbitrum", "optimism", "cardano", "tron", "ton", "bnb", "evm",
+    "mainnet", "testnet", "devnet", "localnet",
+    "stake", "unstake", "staking", "unstaking", "create", "delete", "deploy", "publish", "upgrade",
+    "mint", "burn", "buy", "sell", "send", "receive", "deposit", "withdraw", "lock", "unlock",
+    "add", "remove", "enable", "disable", "wrap", "unwrap", "split", "merge", "borrow", "lend",
+    "min", "max", "minimum", "maximum", "increase", "decrease", "before", "after",
+})
+_ANTONYM_PREFIXES = ("un", "de", "dis", "non", "in", "im", "re")
+
+
+def _words(query: str) -> FrozenSet[str]:
+    return frozenset(_WORD_RE.findall(query.lower()))
+
+
+def _negated(words: FrozenSet[str]) -> bool:
+    return bool(words & NEGATIONS) or any(word.endswith("n't") for word in words)
+
+
+def _conflict(a: str, b: str) -> Optional[str]:
+    """Why two embedding-similar questions still ask different things, or None if they may share an answer.
+
+    Errs towards a miss: a missed paraphrase costs one OpenAI call, a wrong hit serves a wrong answer.
+    """
+    words_a, words_b = _words(a), _words(b)
+    if _negated(words_a) != _negated(words_b):
+        return "negation"
+    only_a, only_b = words_a - words_b, words_b - words_a
+    if (only_a | only_b) & CONTRAST_TERMS:
+        return "contrasting term"
+    if {w for w in only_a | only_b if w.isdigit()}:
+        return "different number"
+    for word in only_a:
+        for other in only_b:
+            if any(word == prefix + other or other == prefix + word for prefix in _ANTONYM_PREFIXES):
+                return "antonym"
+    return None
+
+
+def _topic(query: str) -> Tuple:
+    """Intent signature two questions must share before one's answer can serve the other."""
+    intents = classify_query(query)
+    return intents.walrus, intents.price, intents.stats, intents.sui_stats, frozenset(intents.local_info_keys)
+
+
+class SemanticAnswerCache:
+    """Serves answers for near-duplicate questions by query embedding similarity.
+
+    Embeddings live in one preallocated float32 matrix (one row per entry), so a
+    lookup is a single matrix-vector product. The best match must reach
+    ``threshold`` cosine similarity, have the same intent signature (Walrus vs
+    Sui, price/stats, matched knowledge topic) *and* not differ by a negation,
+    a number or a contrasting term (another chain or network, an opposed
+    action); matches that pass the threshold but fail either check are counted
+    as false hits and served as misses. Caching a question again overwrites its
+    row; when full, an expired entry is replaced first, otherwise the least
+    recently used one.
+
+    Embedding failures are logged and treated as misses.
+    """
+
+    def __init__(self, embed: Embed, threshold: float, max_entries: int, ttl: float):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None
+        self._queries: List[str] = []
+        self._answers: List[str] = []
+        self._topics: List[Tuple] = []
+        # Normalized query -> row, so caching the same question again reuses its row
+        self._rows: Dict[str, int] = {}
+        self._expires = np.zeros(max_entries, dtype=np.float64)
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._counters = {"lookups": 0, "hits": 0, "false_hits": 0}
+        self.logger = get_logger(__name__)
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    async def _embed(self, query: str) -> Optional[np.ndarray]:
+        try:
+            return await self.embed(query)
+        except Exception as e:
+            self.logger.error(f"Semantic cache embedding failed: {e}")
+            return None
+
+    async def get(self, query: str) -> Optional[str]:
+        self._counters["lookups"] += 1
+        answer = await self._lookup(query)
+        CACHE_REQUESTS.inc(cache="semantic", result="miss" if answer is None else "hit")
+        return answer
+
+    async def _lookup(self, query: str) -> Optional[str]:
+        if not self._queries:
+            return None
+        vector = await self._embed(query)
+        if vector is None:
+            return None
+
+        size = len(self._queries)
+        similarities = self._vectors[:size] @ vector
+        # Expired rows can never match
+        similarities[self._expires[:size] <= time.monotonic()] = -1.0
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            return None
+        reason = "different topic" if self._topics[best] != _topic(query) else _conflict(self._queries[best], query)
+        if reason is not None:
+            self._counters["false_hits"] += 1
+            self.logger.info(f"Semantic cache rejected '{self._queries[best]}' for '{query}' "
+                             f"(similarity {similarity:.2f}, {reason})")
+            return None
+
+        self._counters["hits"] += 1
+        self._last_used[best] = time.monotonic()
+        self.logger.info(f"Semantic cache hit: '{query}' ~ '{self._queries[best]}' (similarity {similarity:.2f})")
+        return self._answers[best]
+
+    async def set(self, query: str, answer: str) -> None:
+        vector = await self._embed(query)
+        if vector is None:
+            return
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+        key = ValidationService.normalize_query(query)
+        slot = self._rows.get(key)
+        if slot is None:
+            slot = self._free_slot()
+            self._rows[key] = slot
+        if slot == len(self._queries):
+            self._queries.append(query)
+            self._answers.append(answer)
+            self._topics.append(_topic(query))
+        else:
+            self._queries[slot] = query
+            self._answers[slot] = answer
+            self._topics[slot] = _topic(query)
+
+        now = time.monotonic()
+        self._vectors[slot] = vector
+        self._expires[slot] = now + self.ttl
+        self._last_used[slot] = now
+
+    def _free_slot(self) -> int:
+        """A new row while there is room, else an expired row, else the least recently used one."""
+        size = len(self._queries)
+        if size < self.max_entries:
+            return size
+        expired = np.flatnonzero(self._expires <= time.monotonic())
+        slot = int(expired[0]) if expired.size else int(np.argmin(self._last_used))
+        del self._rows[ValidationService.normalize_query(self._queries[slot])]
+        return slot
+
+    def stats(self) -> Dict[str, Any]:
+        lookups, hits, false_hits = (self._counters[k] for k in ("lookups", "hits", "false_hits"))
+        return {
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            **self._counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            # Share of above-threshold matches that the topic or conflict checks turned away
+            "false_hit_rate": round(false_hits / (hits + false_hits), 4) if hits + false_hits else 0.0,
+        }
+
+    def clear(self) -> None:
+        self._queries.clear()
+        self._answers.clear()
+        self._topics.clear()
+        self._rows.clear()
+        self._expires[:] = 0
+        self._last_used[:] = 0
+
+
+def build_semantic_cache(ai_service) -> Optional[SemanticAnswerCache]:
+    if not settings.semantic_cache_enabled:
+        return None
+    # Always OpenAI embeddings: the local hashing embedder scores "Is Sui a PoS" and
+    # "Is Sui not a PoS" as identical and misses real paraphrases
+    return SemanticAnswerCache(
+        ai_service.aembed,
+        threshold=settings.semantic_cache_threshold,
+        max_entries=settings.semantic_cache_max_entries,
+        ttl=settings.answer_cache_ttl,
+    )
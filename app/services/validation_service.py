@@ -1,6 +1,8 @@
 # ======================
 # app/services/validation_service.py
 # ======================
+import re
+
 from app.utils.exceptions import ValidationError
 from app.core.config import settings
 
@@ -20,3 +22,8 @@ class ValidationService:
 
         return query
 
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Canonical form used to key caches: lowercase, single spaces, no trailing punctuation"""
+        query = re.sub(r"\s+", " ", query.strip().lower())
+        return query.rstrip("?!. ")
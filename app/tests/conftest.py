@@ -0,0 +1,20 @@
+# ======================
+# tests/conftest.py
+# ======================
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "tests-openai-key")
+os.environ.setdefault("TAVILY_API_KEY", "tests-tavily-key")
+
+import pytest
+
+from app.core.dependencies import get_semantic_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_semantic_cache():
+    """Similar questions in different tests must not be answered from each other's cache"""
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.clear()
+    yield
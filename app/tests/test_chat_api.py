@@ -9,7 +9,7 @@ os.environ.setdefault("OPENAI_API_KEY", "tests-openai-key")
 os.environ.setdefault("TAVILY_API_KEY", "tests-tavily-key")
 
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from main import app
 
 
@@ -33,8 +33,30 @@ class TestChatAPI:
         assert "usage" in data
         assert data["usage"]["max_query_length"] == 1000
 
+    def test_cache_stats_endpoint(self):
+        response = client.get("/api/v1/cache/stats")
+        assert response.status_code == 200
+        sources = response.json()["search"]["sources"]
+        assert set(sources) == {"docs", "web", "price", "stats"}
+        assert {"hits", "stale_hits", "misses"} <= set(sources["price"])
+
+    def test_circuits_endpoint(self):
+        response = client.get("/api/v1/circuits")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["enabled"] is True
+        assert set(data["providers"]) == {"tavily", "duckduckgo", "coingecko", "walrusscan", "suiscan"}
+        assert data["providers"]["tavily"]["state"] in ("closed", "open", "half_open")
+
+    def test_live_data_endpoint(self):
+        response = client.get("/api/v1/live-data")
+        assert response.status_code == 200
+        snapshots = response.json()["snapshots"]
+        assert set(snapshots) == {"walrus_price", "walrus_network_stats", "sui_network_stats"}
+        assert "age_seconds" in snapshots["walrus_price"]
+
     @patch('app.services.search_service.SearchService.search_sui_docs')
-    @patch('app.services.ai_service.AIService.generate_response')
+    @patch('app.services.ai_service.AIService.agenerate_response')
     def test_chat_endpoint_success(self, mock_ai, mock_search):
         mock_search.return_value = "Sui is a Layer 1 blockchain platform designed for high throughput and low latency."
         mock_ai.return_value = "Sui is a Layer 1 blockchain platform that uses the Move programming language for smart contracts."
@@ -53,7 +75,7 @@ class TestChatAPI:
         assert "processing_time" in data
 
     @patch('app.services.search_service.SearchService.search_sui_docs')
-    @patch('app.services.ai_service.AIService.generate_response')
+    @patch('app.services.ai_service.AIService.agenerate_response')
     def test_chat_endpoint_move_question(self, mock_ai, mock_search):
         mock_search.return_value = "Move is a programming language for writing smart contracts on Sui blockchain."
         mock_ai.return_value = "Move is a resource-oriented programming language designed for blockchain applications."
@@ -91,7 +113,7 @@ class TestChatAPI:
         exact_query = "a" * 1000
 
         with patch('app.services.search_service.SearchService.search_sui_docs') as mock_search, \
-                patch('app.services.ai_service.AIService.generate_response') as mock_ai:
+                patch('app.services.ai_service.AIService.agenerate_response') as mock_ai:
             mock_search.return_value = "Some Sui documentation content"
             mock_ai.return_value = "Response about the query"
 
@@ -128,7 +150,7 @@ class TestChatAPI:
         assert response.status_code == 422
 
     @patch('app.services.search_service.SearchService.search_sui_docs')
-    @patch('app.services.ai_service.AIService.generate_response')
+    @patch('app.services.ai_service.AIService.agenerate_response')
     def test_chat_endpoint_walrus_query(self, mock_ai, mock_search):
         mock_search.return_value = (
             "Walrus is a data availability solution on Sui. Current Walrus price (CoinGecko): $1.00"
@@ -147,7 +169,7 @@ class TestChatAPI:
         assert "Walrus" in data["response"]
 
     @patch('app.services.search_service.SearchService.search_sui_docs')
-    @patch('app.services.ai_service.AIService.generate_response')
+    @patch('app.services.ai_service.AIService.agenerate_response')
     def test_chat_endpoint_general_blockchain_query(self, mock_ai, mock_search):
         mock_search.return_value = "Blockchain is a distributed ledger technology that enables secure transactions."
         mock_ai.return_value = "Blockchain is a distributed ledger technology that enables secure, transparent, and immutable transactions across a network of computers."
@@ -175,3 +197,428 @@ class TestChatAPI:
         assert data["success"] is False  # Non-blockchain queries return success=False
         assert "I couldn't find information about your question" in data["response"]
         assert data["context_found"] is False
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_repeated_query_served_from_cache(self, mock_ai, mock_search):
+        mock_search.return_value = "Sui uses an object-centric data model."
+        mock_ai.return_value = "Sui objects are the basic unit of storage."
+
+        first = client.post("/api/v1/chat", json={"query": "Explain Sui object ownership"})
+        second = client.post("/api/v1/chat", json={"query": "  explain sui OBJECT ownership?"})
+
+        assert first.status_code == 200
+        assert first.json()["cached"] is False
+        assert second.status_code == 200
+        assert second.json()["cached"] is True
+        assert second.json()["response"] == "Sui objects are the basic unit of storage."
+        mock_ai.assert_called_once()
+        mock_search.assert_called_once()
+
+    @pytest.mark.parametrize("context", [None, "walrus fallback"])
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_answer_without_search_context_is_not_cached(self, mock_ai, mock_search, context):
+        from app.services.search_service import WALRUS_NETWORK_FALLBACK
+        mock_search.return_value = WALRUS_NETWORK_FALLBACK if context else None
+        mock_ai.return_value = "Answer from model knowledge"
+
+        query = f"How do Sui uncached {'walrus ' if context else ''}outage answers work?"
+        first = client.post("/api/v1/chat", json={"query": query})
+        second = client.post("/api/v1/chat", json={"query": query})
+
+        assert first.json()["cached"] is False
+        assert second.json()["cached"] is False
+        assert mock_ai.call_count == 2
+
+    @patch('app.services.search_service.SearchService.search_external')
+    @patch('app.services.search_service.SearchService.search_local')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_speculative_answer_is_not_cached(self, mock_ai, mock_local, mock_external):
+        from app.core.config import settings
+        mock_local.return_value = None
+        mock_external.return_value = None
+        mock_ai.return_value = "Answer from model knowledge"
+
+        with patch.object(settings, 'speculative_generation_enabled', True):
+            for _ in range(2):
+                response = client.post("/api/v1/chat", json={"query": "How do Sui uncached speculative answers work?"})
+                assert response.json()["cached"] is False
+        assert mock_ai.call_count == 2
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_price_query_bypasses_cache(self, mock_ai, mock_search):
+        mock_search.return_value = "Current Walrus price (CoinGecko): $1.00"
+        mock_ai.return_value = "Walrus trades at $1.00."
+
+        client.post("/api/v1/chat", json={"query": "What is the Walrus token price today?"})
+        response = client.post("/api/v1/chat", json={"query": "What is the Walrus token price today?"})
+
+        assert response.json()["cached"] is False
+        assert mock_ai.call_count == 2
+
+    @staticmethod
+    def _sse_events(body):
+        import json
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.split("\n"))
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.astream_response')
+    def test_chat_stream_sends_tokens_then_metadata(self, mock_stream, mock_search):
+        async def fake_stream(query, context):
+            for text in ["Move ", "modules ", "hold\nfunctions."]:
+                yield text
+        mock_search.return_value = "Move modules contain functions and structs."
+        mock_stream.side_effect = fake_stream
+
+        response = client.post("/api/v1/chat/stream", json={"query": "What goes in a Move module stream?"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self._sse_events(response.text)
+        assert [e for e, _ in events] == ["token", "token", "token", "done"]
+        assert "".join(data["text"] for e, data in events[:-1]) == "Move modules hold\nfunctions."
+        done = events[-1][1]
+        assert done["success"] is True
+        assert done["response"] == "Move modules hold\nfunctions."
+        assert done["context_found"] is True
+        assert done["processing_time"] is not None
+
+    def test_chat_stream_validation_error_is_http_error(self):
+        response = client.post("/api/v1/chat/stream", json={"query": "   "})
+        assert response.status_code == 422
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.astream_response')
+    def test_chat_stream_ai_failure_ends_with_error_event(self, mock_stream, mock_search):
+        from app.utils.exceptions import AIServiceError
+
+        async def failing_stream(query, context):
+            yield "Partial "
+            raise AIServiceError("Failed to generate response: boom")
+        mock_search.return_value = None
+        mock_stream.side_effect = failing_stream
+
+        response = client.post("/api/v1/chat/stream", json={"query": "How do Sui stream failures look?"})
+
+        events = self._sse_events(response.text)
+        assert events[0] == ("token", {"text": "Partial "})
+        assert events[-1][0] == "error"
+        assert events[-1][1]["error"] == "AI Service Error"
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_batch_dedupes_and_keeps_order(self, mock_ai, mock_search):
+        mock_search.return_value = "Batch context"
+        mock_ai.side_effect = lambda query, context: f"Answer to {query}"
+
+        queries = ["What is a Sui batch object?", "How do Move batch modules work?", "  what is a SUI batch object "]
+        response = client.post("/api/v1/chat/batch", json={"queries": queries})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert data["unique_queries"] == 2
+        assert [r["query"] for r in data["results"]] == [q.strip() for q in queries]
+        assert data["results"][0]["response"] == "Answer to What is a Sui batch object?"
+        assert data["results"][2]["response"] == data["results"][0]["response"]
+        assert data["results"][1]["response"] == "Answer to How do Move batch modules work?"
+        assert all(r["success"] for r in data["results"])
+        assert mock_search.call_count == 2
+        assert mock_ai.call_count == 2
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_batch_per_item_errors(self, mock_ai, mock_search):
+        from app.utils.exceptions import AIServiceError, SearchError
+
+        def search(query, deadline=None):
+            if "weather" in query:
+                raise SearchError("I only help with Sui blockchain")
+            return "context"
+
+        def generate(query, context):
+            if "fails" in query:
+                raise AIServiceError("Failed to generate response: boom")
+            return "Batch answer"
+
+        mock_search.side_effect = search
+        mock_ai.side_effect = generate
+
+        response = client.post("/api/v1/chat/batch", json={"queries": [
+            "How do Sui batch validators vote?", "   ", "What is the weather?", "Sui batch generation fails?", "x" * 1001
+        ]})
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["success"] for r in results] == [True, False, False, False, False]
+        assert results[0]["response"] == "Batch answer"
+        assert results[1]["error"] == "Query cannot be empty"
+        assert results[2]["context_found"] is False
+        assert "I couldn't find information" in results[2]["response"]
+        assert results[3]["error"] == "Failed to generate response"
+        assert "Query too long" in results[4]["error"]
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_batch_limits_generation_concurrency(self, mock_ai, mock_search):
+        import asyncio
+        running = {"now": 0, "max": 0}
+
+        async def generate(query, context):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+            return "ok"
+
+        mock_search.return_value = "context"
+        mock_ai.side_effect = generate
+
+        with patch('app.api.routes.chat.settings') as mock_settings:
+            mock_settings.answer_cache_enabled = False
+            mock_settings.batch_search_concurrency = 10
+            mock_settings.batch_generation_concurrency = 2
+            response = client.post("/api/v1/chat/batch", json={
+                "queries": [f"Sui concurrency question {i}" for i in range(8)]
+            })
+
+        assert response.status_code == 200
+        assert running["max"] == 2
+
+    def test_chat_batch_rejects_empty_list(self):
+        response = client.post("/api/v1/chat/batch", json={"queries": []})
+        assert response.status_code == 422
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_paraphrase_served_from_semantic_cache(self, mock_ai, mock_search):
+        from app.core.dependencies import get_semantic_cache
+        from app.services.embedding_index import HashingEmbedder
+        from app.services.semantic_cache import SemanticAnswerCache
+        mock_search.return_value = "Shared objects context"
+        mock_ai.return_value = "Shared objects go through consensus."
+        embedder = HashingEmbedder(256)
+
+        async def embed(query):
+            return embedder.embed([query])[0]
+        cache = SemanticAnswerCache(embed, threshold=0.7, max_entries=10, ttl=60)
+        app.dependency_overrides[get_semantic_cache] = lambda: cache
+        try:
+            first = client.post("/api/v1/chat", json={"query": "Explain how Sui shared objects work"})
+            second = client.post("/api/v1/chat", json={"query": "how do shared objects work in sui"})
+            stats = client.get("/api/v1/cache/stats").json()["semantic"]
+        finally:
+            app.dependency_overrides.pop(get_semantic_cache)
+
+        assert first.json()["cached"] is False
+        assert second.json()["cached"] is True
+        assert second.json()["response"] == "Shared objects go through consensus."
+        mock_ai.assert_called_once()
+        assert stats["hits"] == 1
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_metrics_endpoint_reports_pipeline_stages(self, mock_ai, mock_search):
+        mock_search.return_value = "Checkpoint context"
+        mock_ai.return_value = "Checkpoints order transactions."
+
+        client.post("/api/v1/chat", json={"query": "What are Sui checkpoints for metrics?"})
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        text = response.text
+        assert 'suibot_stage_duration_seconds_count{stage="validation"}' in text
+        assert 'suibot_cache_requests_total{cache="answer",result="miss"}' in text
+        assert 'suibot_http_requests_total{route="/api/v1/chat",status="200"}' in text
+        assert 'suibot_requests_in_flight{route="/metrics"} 1' in text
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_request_id_is_echoed_and_traced(self, mock_ai, mock_search):
+        from app.utils import tracing
+        spans = []
+        mock_search.return_value = "Gas context"
+        mock_ai.return_value = "Gas is paid in SUI."
+
+        tracing.set_exporter(Mock(export=lambda span: spans.append(span.to_dict())))
+        try:
+            response = client.post(
+                "/api/v1/chat", json={"query": "How is Sui gas computed for tracing?"}, headers={"X-Request-ID": "abc123"}
+            )
+        finally:
+            tracing.set_exporter(None)
+
+        assert response.headers["X-Request-ID"] == "abc123"
+        root = spans[-1]
+        assert root["name"] == "POST /api/v1/chat"
+        assert root["attributes"]["request.id"] == "abc123"
+        assert root["attributes"]["http.response.status_code"] == 200
+        assert root["attributes"]["cache.hit"] is False
+
+    def test_request_id_is_generated_when_missing(self):
+        response = client.get("/api/v1/health")
+        assert len(response.headers["X-Request-ID"]) == 16
+
+    @pytest.mark.parametrize("request_id", ["x" * 129, "a b", "<script>", 'id" injected="1'])
+    def test_unsafe_request_id_is_replaced(self, request_id):
+        response = client.get("/api/v1/health", headers={"X-Request-ID": request_id})
+        assert response.headers["X-Request-ID"] != request_id
+        assert len(response.headers["X-Request-ID"]) == 16
+
+    @patch('app.services.search_service.SearchService.search_sui_docs')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_chat_passes_search_deadline(self, mock_ai, mock_search):
+        mock_search.return_value = "Deadline context"
+        mock_ai.return_value = "Answer"
+
+        response = client.post("/api/v1/chat", json={"query": "How do Sui deadlines work?", "search_deadline": 2.5})
+
+        assert response.status_code == 200
+        mock_search.assert_called_once_with("How do Sui deadlines work?", deadline=2.5)
+
+    def test_chat_rejects_out_of_range_search_deadline(self):
+        for deadline in (0, 1000):
+            response = client.post("/api/v1/chat", json={"query": "What is Sui?", "search_deadline": deadline})
+            assert response.status_code == 422
+
+    @patch('app.services.search_service.SearchService.search_external')
+    @patch('app.services.search_service.SearchService.search_local')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_speculative_answer_used_when_search_is_slow(self, mock_ai, mock_local, mock_external):
+        import asyncio
+        from app.core.config import settings
+        search_cancelled = []
+
+        async def slow_search(query, deadline=None):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                search_cancelled.append(query)
+                raise
+
+        mock_local.return_value = None
+        mock_external.side_effect = slow_search
+        mock_ai.return_value = "Answer from model knowledge"
+
+        with patch.object(settings, 'speculative_generation_enabled', True), \
+             patch.object(settings, 'speculative_grace_seconds', 0.05):
+            response = client.post("/api/v1/chat", json={"query": "How do Sui speculative zkLogin proofs work?"})
+
+        assert response.json()["response"] == "Answer from model knowledge"
+        mock_ai.assert_called_once()
+        assert "No specific search results found" in mock_ai.call_args[0][1]
+        assert search_cancelled == ["How do Sui speculative zkLogin proofs work?"]
+
+    @patch('app.services.search_service.SearchService.search_external')
+    @patch('app.services.search_service.SearchService.search_local')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_speculative_answer_replaced_when_search_finds_context(self, mock_ai, mock_local, mock_external):
+        import asyncio
+        from app.core.config import settings
+        speculative_cancelled = []
+
+        async def generate(query, context):
+            if context.startswith("No specific search results"):
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    speculative_cancelled.append(True)
+                    raise
+            return f"Answer using {context}"
+
+        mock_local.return_value = None
+        mock_external.return_value = "zkLogin docs"
+        mock_ai.side_effect = generate
+
+        with patch.object(settings, 'speculative_generation_enabled', True), \
+             patch.object(settings, 'speculative_grace_seconds', 1.0):
+            response = client.post("/api/v1/chat", json={"query": "How do Sui contextual zkLogin proofs work?"})
+
+        assert response.json()["response"] == "Answer using zkLogin docs"
+        assert speculative_cancelled == [True]
+
+    @patch('app.services.search_service.SearchService.search_external')
+    @patch('app.services.search_service.SearchService.search_local')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_speculative_search_keeps_request_deadline(self, mock_ai, mock_local, mock_external):
+        import asyncio
+        from app.core.config import settings
+        from app.utils.deadline import remaining
+        budgets = []
+
+        async def slow_local(query, deadline=None):
+            budgets.append(remaining())
+            await asyncio.sleep(0.1)
+            return None
+
+        async def external(query, deadline=None):
+            budgets.append(remaining())
+            return "zkLogin docs"
+
+        mock_local.side_effect = slow_local
+        mock_external.side_effect = external
+        mock_ai.return_value = "Answer"
+
+        with patch.object(settings, 'speculative_generation_enabled', True):
+            response = client.post("/api/v1/chat", json={"query": "How do Sui budgeted zkLogin proofs work?",
+                                                         "search_deadline": 0.5})
+
+        assert response.status_code == 200
+        mock_local.assert_called_once_with("How do Sui budgeted zkLogin proofs work?", deadline=0.5)
+        mock_external.assert_called_once_with("How do Sui budgeted zkLogin proofs work?", deadline=0.5)
+        # Local and external search share the request's budget
+        assert budgets[0] <= 0.5
+        assert budgets[1] <= budgets[0] - 0.09
+
+    def test_cancelled_speculative_failure_is_retrieved(self):
+        import asyncio
+        import gc
+        from unittest.mock import AsyncMock
+        from app.api.routes.chat import _speculative_answer
+        from app.utils.exceptions import AIServiceError
+
+        async def generate(query, context):
+            if context.startswith("No specific search results"):
+                try:
+                    await asyncio.sleep(5)
+                except asyncio.CancelledError:
+                    # e.g. the HTTP client turning the cancellation into its own error
+                    raise AIServiceError("speculative call aborted")
+            return f"Answer using {context}"
+
+        search_service = Mock(search_local=AsyncMock(return_value=None),
+                              search_external=AsyncMock(return_value="zkLogin docs"))
+        ai_service = Mock(agenerate_response=AsyncMock(side_effect=generate))
+        unhandled = []
+
+        async def run():
+            asyncio.get_running_loop().set_exception_handler(lambda loop, context: unhandled.append(context))
+            answer, _ = await _speculative_answer("How do Sui zkLogin proofs work?", search_service, ai_service, None)
+            await asyncio.sleep(0.01)
+            gc.collect()
+            return answer
+
+        assert asyncio.run(run()) == "Answer using zkLogin docs"
+        assert unhandled == []
+
+    @patch('app.services.search_service.SearchService.search_external')
+    @patch('app.services.search_service.SearchService.search_local')
+    @patch('app.services.ai_service.AIService.agenerate_response')
+    def test_local_context_skips_speculation(self, mock_ai, mock_local, mock_external):
+        from app.core.config import settings
+        mock_local.return_value = "Local Sui context"
+        mock_ai.return_value = "Local answer"
+
+        with patch.object(settings, 'speculative_generation_enabled', True):
+            response = client.post("/api/v1/chat", json={"query": "What are Sui speculative local objects?"})
+
+        assert response.json()["response"] == "Local answer"
+        mock_ai.assert_called_once_with("What are Sui speculative local objects?", "Local Sui context")
+        mock_external.assert_not_called()
@@ -23,7 +23,7 @@ class TestIntegration:
         """Test complete workflow: input validation → search → AI → response"""
 
         with patch('app.services.search_service.SearchService.search_sui_docs') as mock_search, \
-                patch('app.services.ai_service.AIService.generate_response') as mock_ai:
+                patch('app.services.ai_service.AIService.agenerate_response') as mock_ai:
 
             mock_search.return_value = (
                 "Sui is a next-generation smart contract platform with high throughput, "
@@ -53,13 +53,13 @@ class TestIntegration:
             assert isinstance(data["processing_time"], float)
 
 
-            mock_search.assert_called_once_with("What is Sui blockchain and how does it work?")
+            mock_search.assert_called_once_with("What is Sui blockchain and how does it work?", deadline=None)
             mock_ai.assert_called_once()
 
     def test_move_programming_question_workflow(self):
 
         with patch('app.services.search_service.SearchService.search_sui_docs') as mock_search, \
-                patch('app.services.ai_service.AIService.generate_response') as mock_ai:
+                patch('app.services.ai_service.AIService.agenerate_response') as mock_ai:
             mock_search.return_value = (
                 "Move is a resource-oriented programming language for writing smart contracts. "
                 "It provides safety and expressiveness for high-value digital assets."
@@ -87,7 +87,7 @@ class TestIntegration:
         query_max = ("What is Sui blockchain? " * 50)[:max_len]  # build a long-ish string, then trim
 
         with patch('app.services.search_service.SearchService.search_sui_docs') as mock_search, \
-                patch('app.services.ai_service.AIService.generate_response') as mock_ai:
+                patch('app.services.ai_service.AIService.agenerate_response') as mock_ai:
             mock_search.return_value = "Sui documentation content"
             mock_ai.return_value = "Response about Sui"
 
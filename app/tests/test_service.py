@@ -1,9 +1,12 @@
 # ======================
 # app/tests/test_service.py
 # ======================
+import asyncio
 import os
+import httpx
+import numpy as np
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from app.utils.exceptions import ValidationError, SearchError, AIServiceError
 
 
@@ -52,8 +55,8 @@ class TestSearchService:
 
 
 
-    @patch('requests.post')
-    def test_tavily_search_finds_sui_docs(self, mock_post):
+    @patch('app.services.search_service.get_http_client')
+    def test_tavily_search_finds_sui_docs(self, mock_get_client):
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = {
@@ -62,9 +65,9 @@ class TestSearchService:
                 {"content": "Move programming language documentation"}
             ]
         }
-        mock_post.return_value = mock_response
+        mock_post = mock_get_client.return_value.post = AsyncMock(return_value=mock_response)
 
-        result = self.service._search_tavily("Sui blockchain")
+        result = asyncio.run(self.service._search_tavily("Sui blockchain"))
 
         assert "Sui is a Layer 1 blockchain" in result
         assert "Move programming language" in result
@@ -72,22 +75,22 @@ class TestSearchService:
         # "Sui blockchain" is detected as blockchain-related, so it uses general blockchain search
         assert "blockchain cryptocurrency crypto sui move walrus" in call_args['query']
 
-    @patch('requests.post')
-    def test_tavily_search_prioritizes_walrus(self, mock_post):
+    @patch('app.services.search_service.get_http_client')
+    def test_tavily_search_prioritizes_walrus(self, mock_get_client):
         mock_response = Mock()
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = {"results": [{"content": "Walrus DA on Sui"}]}
-        mock_post.return_value = mock_response
+        mock_post = mock_get_client.return_value.post = AsyncMock(return_value=mock_response)
 
-        result = self.service._search_tavily("What is Walrus on Sui?")
+        result = asyncio.run(self.service._search_tavily("What is Walrus on Sui?"))
 
         assert "Walrus DA on Sui" in result
         call_args = mock_post.call_args[1]['json']
         # "What is Walrus on Sui?" is detected as blockchain-related, so it uses general blockchain search
         assert "blockchain cryptocurrency crypto sui move walrus" in call_args['query']
 
-    @patch('requests.get')
-    def test_duckduckgo_search_fallback(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_duckduckgo_search_fallback(self, mock_get_client):
 
         mock_response = Mock()
         mock_response.json.return_value = {
@@ -97,9 +100,9 @@ class TestSearchService:
                 {"Text": "Sui transactions"}
             ]
         }
-        mock_get.return_value = mock_response
+        mock_get = mock_get_client.return_value.get = AsyncMock(return_value=mock_response)
 
-        result = self.service._search_duckduckgo("Move smart contracts")
+        result = asyncio.run(self.service._search_duckduckgo("Move smart contracts"))
 
         assert "Sui blockchain platform" in result
         assert "Move smart contracts" in result
@@ -107,16 +110,16 @@ class TestSearchService:
         # "Move smart contracts" is detected as blockchain-related, so it uses general blockchain search
         assert "blockchain sui move walrus cryptocurrency crypto" in call_args['q']
 
-    @patch('requests.get')
-    def test_duckduckgo_prioritizes_walrus(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_duckduckgo_prioritizes_walrus(self, mock_get_client):
         mock_response = Mock()
         mock_response.json.return_value = {
             "AbstractText": "Walrus is a data availability solution on Sui",
             "RelatedTopics": [{"Text": "Walrus GitHub repo"}]
         }
-        mock_get.return_value = mock_response
+        mock_get = mock_get_client.return_value.get = AsyncMock(return_value=mock_response)
 
-        result = self.service._search_duckduckgo("Walrus price on Sui")
+        result = asyncio.run(self.service._search_duckduckgo("Walrus price on Sui"))
         assert "Walrus is a data availability" in result
         call_args = mock_get.call_args[1]['params']
         # "Walrus price on Sui" is detected as blockchain-related, so it uses general blockchain search
@@ -127,6 +130,7 @@ class TestSearchService:
     def test_search_fallback_strategy(self, mock_ddg, mock_tavily):
         # Mock all the intermediate search steps to return None
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_network_stats', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_price', return_value=None), \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None), \
@@ -137,7 +141,7 @@ class TestSearchService:
             mock_tavily.return_value = None
             mock_ddg.return_value = "Sui documentation from DuckDuckGo"
 
-            result = self.service.search_sui_docs("Sui question")
+            result = asyncio.run(self.service.search_sui_docs("Sui question"))
 
             assert result == "Sui documentation from DuckDuckGo"
             mock_tavily.assert_called_once()
@@ -151,26 +155,27 @@ class TestSearchService:
         mock_ddg.return_value = None
 
         with pytest.raises(SearchError) as exc:
-            self.service.search_sui_docs("unknown topic")
+            asyncio.run(self.service.search_sui_docs("unknown topic"))
 
         # "unknown topic" is detected as non-blockchain, so it gets rejected with blockchain restriction message
         assert "I only help with Sui blockchain" in str(exc.value.message)
 
+    @patch('app.services.search_service.SearchService._check_semantic_info', return_value=None)
     @patch('app.services.search_service.SearchService._check_local_info', return_value=None)
     @patch('app.services.search_service.SearchService._search_walrus', return_value=None)
     @patch('app.services.search_service.SearchService._search_tavily_site_specific', return_value=None)
     @patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value=None)
     @patch('app.services.search_service.SearchService._search_tavily')
     @patch('app.services.search_service.SearchService._search_duckduckgo')
-    def test_search_walrus_first_strategy(self, mock_ddg, mock_tavily, mock_ddg_site, mock_tavily_site, mock_walrus, mock_local):
+    def test_search_walrus_first_strategy(self, mock_ddg, mock_tavily, mock_ddg_site, mock_tavily_site, mock_walrus, mock_local, mock_semantic):
         # Test with a query that doesn't match local patterns to trigger external search
         mock_tavily.return_value = "Walrus documentation"
         mock_ddg.return_value = None
-        result = self.service.search_sui_docs("How to integrate Walrus with custom applications")
+        result = asyncio.run(self.service.search_sui_docs("How to integrate Walrus with custom applications"))
         assert result.startswith("Walrus documentation")
 
-    @patch('requests.get')
-    def test_get_walrus_price(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_get_walrus_price(self, mock_get_client):
         # Mock CoinGecko endpoints
         search_resp = Mock()
         search_resp.raise_for_status.return_value = None
@@ -186,13 +191,13 @@ class TestSearchService:
                 return price_resp
             raise AssertionError("Unexpected URL")
 
-        mock_get.side_effect = side_effect
+        mock_get_client.return_value.get = AsyncMock(side_effect=side_effect)
 
-        info = self.service._get_walrus_price()
+        info = asyncio.run(self.service._get_walrus_price())
         assert "$1.23" in info
 
-    @patch('requests.get')
-    def test_walrus_price_included_when_asking_price(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_walrus_price_included_when_asking_price(self, mock_get_client):
         search_resp = Mock()
         search_resp.raise_for_status.return_value = None
         search_resp.json.return_value = {"coins": [{"id": "walrus", "name": "Walrus"}]}
@@ -207,9 +212,9 @@ class TestSearchService:
                 return price_resp
             raise AssertionError("Unexpected URL")
 
-        mock_get.side_effect = side_effect
+        mock_get_client.return_value.get = AsyncMock(side_effect=side_effect)
 
-        result = self.service.search_sui_docs("What is the Walrus coin price?")
+        result = asyncio.run(self.service.search_sui_docs("What is the Walrus coin price?"))
         assert "$0.99" in result
 
     def test_local_walrus_info_prioritized(self):
@@ -217,7 +222,7 @@ class TestSearchService:
         service = SearchService()
 
         # Test Walrus blob query should return local info first
-        result = service.search_sui_docs("What is a walrus blob?")
+        result = asyncio.run(service.search_sui_docs("What is a walrus blob?"))
         assert "blob" in result.lower()
         assert "walrus" in result.lower()
 
@@ -227,20 +232,21 @@ class TestSearchService:
 
         # Test that Walrus queries use expanded sources
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None), \
              patch('app.services.search_service.SearchService._search_tavily_site_specific', return_value=None), \
              patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value=None), \
              patch('app.services.search_service.SearchService._search_tavily') as mock_tavily:
             mock_tavily.return_value = "Walrus documentation"
-            service.search_sui_docs("Walrus API documentation and SDK references")
+            asyncio.run(service.search_sui_docs("Walrus API documentation and SDK references"))
             
             # Check that _search_tavily was called
             assert mock_tavily.called
             call_args = mock_tavily.call_args[0][0]  # First positional argument (query)
             assert "walrus" in call_args.lower()
 
-    @patch('requests.get')
-    def test_walrus_network_stats(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_walrus_network_stats(self, mock_get_client):
         from app.services.search_service import SearchService
         service = SearchService()
 
@@ -250,15 +256,16 @@ class TestSearchService:
             "validators": {"total": 25},
             "network": {"total_stake": 1000000, "active_nodes": 30}
         }
-        mock_get.return_value = mock_response
+        mock_get = mock_get_client.return_value.get = AsyncMock(return_value=mock_response)
 
-        stats = service._get_walrus_network_stats()
+        stats = asyncio.run(service._get_walrus_network_stats())
         assert "Active Validators: 25" in stats
         assert "Total Stake: 1,000,000 WAL" in stats
         assert "Active Nodes: 30" in stats
+        assert mock_get.call_args.args[0] == f"{service.base_urls['walrusscan']}/network/stats"
 
-    @patch('requests.get')
-    def test_sui_network_stats(self, mock_get):
+    @patch('app.services.search_service.get_http_client')
+    def test_sui_network_stats(self, mock_get_client):
         from app.services.search_service import SearchService
         service = SearchService()
 
@@ -268,18 +275,19 @@ class TestSearchService:
             "validators": {"total": 100},
             "network": {"total_stake": 5000000, "tps": 1000}
         }
-        mock_get.return_value = mock_response
+        mock_get = mock_get_client.return_value.get = AsyncMock(return_value=mock_response)
 
-        stats = service._get_sui_network_stats()
+        stats = asyncio.run(service._get_sui_network_stats())
         assert "Active Validators: 100" in stats
         assert "Total Stake: 5,000,000 SUI" in stats
         assert "Current TPS: 1000" in stats
+        assert mock_get.call_args.args[0] == f"{service.base_urls['suiscan']}/network/stats"
 
     def test_walrus_validator_local_info(self):
         from app.services.search_service import SearchService
         service = SearchService()
 
-        result = service.search_sui_docs("How many validators on Walrus?")
+        result = asyncio.run(service.search_sui_docs("How many validators on Walrus?"))
         assert "validator" in result.lower()
         assert "walrus" in result.lower()
 
@@ -307,6 +315,7 @@ class TestSearchService:
 
         # Test that blockchain queries use general internet search
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None) as mock_local, \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_network_stats', return_value=None) as mock_walrus_stats, \
              patch('app.services.search_service.SearchService._get_walrus_price', return_value=None) as mock_price, \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None) as mock_walrus_search, \
@@ -315,7 +324,7 @@ class TestSearchService:
              patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value=None) as mock_ddg_site, \
              patch('app.services.search_service.SearchService._search_tavily') as mock_tavily:
             mock_tavily.return_value = "Blockchain technology information"
-            service.search_sui_docs("What is blockchain technology?")
+            asyncio.run(service.search_sui_docs("What is blockchain technology?"))
             
             # Check that _search_tavily was called with general search
             assert mock_tavily.called
@@ -328,7 +337,7 @@ class TestSearchService:
 
         # Test that non-blockchain queries are rejected
         with pytest.raises(Exception) as exc_info:
-            service.search_sui_docs("What is the weather today?")
+            asyncio.run(service.search_sui_docs("What is the weather today?"))
         
         assert "I only help with Sui blockchain" in str(exc_info.value)
 
@@ -338,6 +347,7 @@ class TestSearchService:
 
         # Test that the search strategy exhausts all local sources first
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None) as mock_local, \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_network_stats', return_value=None) as mock_walrus_stats, \
              patch('app.services.search_service.SearchService._get_walrus_price', return_value=None) as mock_price, \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None) as mock_walrus_search, \
@@ -347,7 +357,7 @@ class TestSearchService:
              patch('app.services.search_service.SearchService._search_tavily', return_value=None) as mock_tavily, \
              patch('app.services.search_service.SearchService._search_duckduckgo', return_value="DuckDuckGo result") as mock_ddg:
 
-            result = service.search_sui_docs("What is blockchain technology?")
+            result = asyncio.run(service.search_sui_docs("What is blockchain technology?"))
             
             # Verify all search methods were called in order
             assert mock_local.called
@@ -364,7 +374,7 @@ class TestSearchService:
              patch('app.services.search_service.SearchService._search_tavily') as mock_tavily, \
              patch('app.services.search_service.SearchService._search_duckduckgo') as mock_ddg:
 
-            result = service.search_sui_docs("What is Walrus?")
+            result = asyncio.run(service.search_sui_docs("What is Walrus?"))
             
             # Verify local info was returned and external APIs were not called
             assert result == "Local info result"
@@ -377,6 +387,7 @@ class TestSearchService:
 
         # Test that site-specific search is tried before general search
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None) as mock_local, \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_network_stats', return_value=None) as mock_walrus_stats, \
              patch('app.services.search_service.SearchService._get_walrus_price', return_value=None) as mock_price, \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None) as mock_walrus_search, \
@@ -385,7 +396,7 @@ class TestSearchService:
              patch('app.services.search_service.SearchService._search_tavily') as mock_tavily_general, \
              patch('app.services.search_service.SearchService._search_duckduckgo') as mock_ddg_general:
 
-            result = service.search_sui_docs("What is blockchain technology?")
+            result = asyncio.run(service.search_sui_docs("What is blockchain technology?"))
             
             # Verify site-specific search was called and general search was not
             assert mock_tavily_site.called
@@ -399,6 +410,7 @@ class TestSearchService:
 
         # Test that AI service fallback is used when all search methods fail
         with patch('app.services.search_service.SearchService._check_local_info', return_value=None) as mock_local, \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
              patch('app.services.search_service.SearchService._get_walrus_network_stats', return_value=None) as mock_walrus_stats, \
              patch('app.services.search_service.SearchService._get_walrus_price', return_value=None) as mock_price, \
              patch('app.services.search_service.SearchService._search_walrus', return_value=None) as mock_walrus_search, \
@@ -408,7 +420,7 @@ class TestSearchService:
              patch('app.services.search_service.SearchService._search_tavily', return_value=None) as mock_tavily_general, \
              patch('app.services.search_service.SearchService._search_duckduckgo', return_value=None) as mock_ddg_general:
 
-            result = service.search_sui_docs("What is blockchain technology?")
+            result = asyncio.run(service.search_sui_docs("What is blockchain technology?"))
             
             # Verify all search methods were called and AI fallback was used
             assert mock_local.called
@@ -419,6 +431,1497 @@ class TestSearchService:
             # The search service now returns None when all methods are exhausted
             assert result is None
 
+    @patch('app.services.search_service.get_http_client')
+    def test_concurrent_searches_share_event_loop(self, mock_get_client):
+        import time
+        mock_response = Mock()
+        mock_response.json.return_value = {"AbstractText": "Sui docs"}
+
+        async def slow_get(url, **kwargs):
+            await asyncio.sleep(0.2)
+            return mock_response
+
+        mock_get_client.return_value.get = AsyncMock(side_effect=slow_get)
+
+        async def run_many():
+            return await asyncio.gather(*[self.service._search_duckduckgo("Sui objects") for _ in range(5)])
+
+        start = time.perf_counter()
+        results = asyncio.run(run_many())
+        elapsed = time.perf_counter() - start
+
+        assert results == ["Sui docs"] * 5
+        # Five 0.2s calls overlap instead of running back to back
+        assert elapsed < 0.6
+
+    def test_fanout_keeps_tier_priority(self):
+        from app.core.config import settings
+
+        async def slow_site_result(query):
+            await asyncio.sleep(0.1)
+            return "Site-specific result"
+
+        with patch.object(settings, 'search_mode', 'fanout'), \
+             patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_authoritative_sources', return_value=None), \
+             patch('app.services.search_service.SearchService._search_tavily_site_specific', side_effect=slow_site_result), \
+             patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value="DDG site result"), \
+             patch('app.services.search_service.SearchService._search_tavily', return_value="Tavily general result"), \
+             patch('app.services.search_service.SearchService._search_duckduckgo', return_value="DDG general result"):
+
+            result = asyncio.run(self.service.search_sui_docs("What is blockchain technology?"))
+
+            # Lower tiers finish first, but the higher-priority tier still wins
+            assert result == "Site-specific result"
+
+    def test_fanout_cancels_lower_tiers(self):
+        from app.core.config import settings
+        cancelled = []
+
+        async def hanging_search(query):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+
+        with patch.object(settings, 'search_mode', 'fanout'), \
+             patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_authoritative_sources', return_value="Authoritative result"), \
+             patch('app.services.search_service.SearchService._search_tavily_site_specific', side_effect=hanging_search), \
+             patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', side_effect=hanging_search), \
+             patch('app.services.search_service.SearchService._search_tavily', side_effect=hanging_search), \
+             patch('app.services.search_service.SearchService._search_duckduckgo', side_effect=hanging_search):
+
+            async def run():
+                result = await self.service.search_sui_docs("What is blockchain technology?")
+                await asyncio.sleep(0)
+                return result
+
+            result = asyncio.run(run())
+
+            assert result == "Authoritative result"
+            assert len(cancelled) == 4
+
+    def test_fanout_falls_through_failed_tiers(self):
+        from app.core.config import settings
+
+        with patch.object(settings, 'search_mode', 'fanout'), \
+             patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_authoritative_sources', side_effect=Exception("boom")), \
+             patch('app.services.search_service.SearchService._search_tavily_site_specific', return_value=None), \
+             patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value=None), \
+             patch('app.services.search_service.SearchService._search_tavily', return_value=None), \
+             patch('app.services.search_service.SearchService._search_duckduckgo', return_value="DDG general result"):
+
+            result = asyncio.run(self.service.search_sui_docs("What is blockchain technology?"))
+
+            assert result == "DDG general result"
+
+    def test_fanout_walrus_tier_shares_general_searches(self):
+        from app.core.config import settings
+        calls = []
+
+        async def tavily_search(query):
+            calls.append("tavily")
+            await asyncio.sleep(0.05)
+            return None
+
+        async def ddg_search(query):
+            calls.append("ddg")
+            await asyncio.sleep(0.05)
+            return "DDG general result"
+
+        with patch.object(settings, 'search_mode', 'fanout'), \
+             patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_authoritative_sources', return_value=None), \
+             patch('app.services.search_service.SearchService._search_tavily_site_specific', return_value=None), \
+             patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', return_value=None), \
+             patch('app.services.search_service.SearchService._search_tavily', side_effect=tavily_search), \
+             patch('app.services.search_service.SearchService._search_duckduckgo', side_effect=ddg_search):
+
+            result = asyncio.run(self.service.search_sui_docs("How does Walrus erasure coding work?"))
+
+        # The Walrus tier falls back through both general searches without repeating them
+        assert result == "DDG general result"
+        assert sorted(calls) == ["ddg", "tavily"]
+
+    def test_deadline_caps_total_search_time(self):
+        import time
+        from app.utils.deadline import remaining
+        budgets = []
+
+        async def slow_search(query):
+            budgets.append(remaining())
+            await asyncio.sleep(0.15)
+            return None
+
+        with patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_authoritative_sources', side_effect=slow_search), \
+             patch('app.services.search_service.SearchService._search_tavily_site_specific', side_effect=slow_search), \
+             patch('app.services.search_service.SearchService._search_duckduckgo_site_specific', side_effect=slow_search), \
+             patch('app.services.search_service.SearchService._search_tavily', side_effect=slow_search), \
+             patch('app.services.search_service.SearchService._search_duckduckgo', side_effect=slow_search):
+
+            start = time.monotonic()
+            result = asyncio.run(self.service.search_sui_docs("What is blockchain technology?", deadline=0.25))
+            elapsed = time.monotonic() - start
+
+        # The second tier is cut off by the deadline and the rest are skipped
+        assert result is None
+        assert elapsed < 0.5
+        assert len(budgets) == 2
+        assert budgets[0] > budgets[1] > 0
+
+    def test_deadline_exhausted_falls_through_to_ai(self):
+        from app.utils.metrics import SEARCH_ANSWERED
+
+        async def hanging_search(query, *general_searches):
+            await asyncio.sleep(10)
+
+        before = SEARCH_ANSWERED.value(step="deadline")
+        with patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value=None), \
+             patch('app.services.search_service.SearchService._search_walrus', side_effect=hanging_search), \
+             patch('app.services.search_service.SearchService._get_walrus_network_stats') as mock_stats:
+
+            result = asyncio.run(self.service.search_sui_docs("How do walrus storage proofs work?", deadline=0.05))
+
+        assert result is None
+        assert SEARCH_ANSWERED.value(step="deadline") == before + 1
+        # STEP 10 is skipped too once the budget is spent
+        mock_stats.assert_not_called()
+
+    def test_local_and_external_phases_split_the_search(self):
+        with patch('app.services.search_service.SearchService._search_authoritative_sources', return_value="Authoritative result"):
+            local_hit = asyncio.run(self.service.search_local("What is Sui?"))
+            local_miss = asyncio.run(self.service.search_local("How do Sui zkLogin salts get rotated?"))
+            external = asyncio.run(self.service.search_external("How do Sui zkLogin salts get rotated?"))
+
+        assert local_hit
+        assert local_miss is None
+        assert external == "Authoritative result"
+        with pytest.raises(SearchError):
+            asyncio.run(self.service.search_local("What is the weather today?"))
+
+    @patch('app.services.search_service.get_http_client')
+    def test_hung_provider_opens_breaker_under_deadlines(self, mock_get_client):
+        from app.core.config import settings
+        from app.services.search_service import SearchService
+        from app.utils.exceptions import CircuitOpenError
+        from app.utils.deadline import deadline_scope
+        service = SearchService()
+        url = f"{service.base_urls['duckduckgo']}/"
+
+        async def hang(url, **kwargs):
+            await asyncio.sleep(10)
+        mock_get_client.return_value.get = hang
+
+        async def run():
+            for _ in range(settings.circuit_breaker_failure_threshold):
+                with deadline_scope(0.02):
+                    assert await service._timed("ddg", lambda: service._get(url)) is None
+
+        asyncio.run(run())
+        assert service.breakers["duckduckgo"].state == "open"
+        with pytest.raises(CircuitOpenError):
+            asyncio.run(service._get(url))
+
+    @patch('app.services.search_service.get_http_client')
+    def test_early_cancellation_is_not_a_failure(self, mock_get_client):
+        from app.services.search_service import SearchService
+        service = SearchService()
+
+        async def hang(url, **kwargs):
+            await asyncio.sleep(10)
+        mock_get_client.return_value.get = hang
+
+        async def run():
+            # A losing fan-out tier: cancelled quickly, with no deadline involved
+            task = asyncio.create_task(service._get(f"{service.base_urls['duckduckgo']}/"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        assert service.breakers["duckduckgo"].consecutive_failures == 0
+
+    def test_nested_deadline_keeps_the_earlier_one(self):
+        from app.utils.deadline import deadline_scope, expired, remaining
+
+        assert remaining() is None
+        with deadline_scope(0.5):
+            with deadline_scope(10):
+                assert remaining() <= 0.5
+            with deadline_scope(0):
+                assert expired()
+        assert remaining() is None
+
+class TestAnswerCache:
+
+    def setup_method(self):
+        from app.services.answer_cache import AnswerCache, InMemoryCacheBackend
+        self.cache = AnswerCache(InMemoryCacheBackend(max_entries=2, ttl=60), ttl=60)
+
+    def test_key_uses_normalized_query(self):
+        from app.services.answer_cache import AnswerCache
+        assert AnswerCache.make_key("What is Sui?") == AnswerCache.make_key("  what   is SUI ")
+        assert AnswerCache.make_key("What is Sui?") != AnswerCache.make_key("What is Walrus?")
+
+    def test_key_changes_with_generation_settings(self):
+        from app.core.config import settings
+        from app.services.answer_cache import AnswerCache
+        key = AnswerCache.make_key("What is Sui?")
+        with patch.object(settings, 'ai_temperature', 0.9):
+            assert AnswerCache.make_key("What is Sui?") != key
+
+    def test_lru_eviction(self):
+        async def run():
+            await self.cache.set("what is sui", "Sui answer")
+            await self.cache.set("what is walrus", "Walrus answer")
+            await self.cache.get("what is sui")
+            await self.cache.set("what is move", "Move answer")
+            return [await self.cache.get(q) for q in ("what is sui", "what is walrus", "what is move")]
+
+        assert asyncio.run(run()) == ["Sui answer", None, "Move answer"]
+
+    def test_entries_expire(self):
+        from app.utils.cache import TTLCache
+        cache = TTLCache(max_entries=10, ttl=60)
+        with patch('app.utils.cache.time.monotonic', return_value=1000.0):
+            cache.set("key", "value")
+        with patch('app.utils.cache.time.monotonic', return_value=1059.0):
+            assert cache.get("key") == "value"
+        with patch('app.utils.cache.time.monotonic', return_value=1061.0):
+            assert cache.get("key") is None
+
+    def test_redis_backend_with_local_stand_in(self):
+        from app.services.answer_cache import AnswerCache, RedisCacheBackend
+
+        class FakeRedis:
+            def __init__(self):
+                self.store = {}
+
+            async def get(self, key):
+                return self.store.get(key)
+
+            async def set(self, key, value, ex=None):
+                self.store[key] = value.encode("utf-8")
+                self.ttl = ex
+
+        fake = FakeRedis()
+        cache = AnswerCache(RedisCacheBackend(fake), ttl=120)
+
+        asyncio.run(cache.set("What is Sui?", "Sui answer"))
+
+        assert asyncio.run(cache.get("what is sui")) == "Sui answer"
+        assert fake.ttl == 120
+        assert all(key.startswith("suibot:answer:") for key in fake.store)
+
+    def test_backend_errors_are_misses(self):
+        from app.services.answer_cache import AnswerCache
+        backend = Mock()
+        backend.get = AsyncMock(side_effect=ConnectionError("redis down"))
+        backend.set = AsyncMock(side_effect=ConnectionError("redis down"))
+        cache = AnswerCache(backend, ttl=60)
+
+        assert asyncio.run(cache.get("What is Sui?")) is None
+        asyncio.run(cache.set("What is Sui?", "Sui answer"))
+
+
+class TestSearchCache:
+
+    def setup_method(self):
+        from app.services.search_cache import SearchCache
+        self.cache = SearchCache(ttls={"docs": 100, "price": 10}, max_entries=3, stale_factor=1.0)
+
+    def test_hits_and_misses_are_counted(self):
+        fetch = AsyncMock(return_value="Sui docs")
+
+        async def run():
+            first = await self.cache.get_or_fetch("docs", "what is sui", fetch)
+            second = await self.cache.get_or_fetch("docs", "what is sui", fetch)
+            return first, second
+
+        assert asyncio.run(run()) == ("Sui docs", "Sui docs")
+        assert fetch.await_count == 1
+        assert self.cache.stats()["sources"]["docs"] == {"hits": 1, "stale_hits": 0, "misses": 1}
+
+    def test_empty_results_are_not_cached(self):
+        fetch = AsyncMock(return_value=None)
+
+        async def run():
+            await self.cache.get_or_fetch("docs", "unknown", fetch)
+            await self.cache.get_or_fetch("docs", "unknown", fetch)
+
+        asyncio.run(run())
+        assert fetch.await_count == 2
+
+    def test_stale_entry_served_while_revalidating(self):
+        fetch = AsyncMock(side_effect=["$1.00", "$1.10"])
+
+        async def run():
+            with patch('app.services.search_cache.time.monotonic', return_value=1000.0), \
+                 patch('app.utils.cache.time.monotonic', return_value=1000.0):
+                await self.cache.get_or_fetch("price", "walrus", fetch)
+            with patch('app.services.search_cache.time.monotonic', return_value=1015.0), \
+                 patch('app.utils.cache.time.monotonic', return_value=1015.0):
+                stale = await self.cache.get_or_fetch("price", "walrus", fetch)
+                await asyncio.sleep(0)
+                refreshed = await self.cache.get_or_fetch("price", "walrus", fetch)
+            return stale, refreshed
+
+        stale, refreshed = asyncio.run(run())
+        # The stale value is returned immediately and the background refresh replaces it
+        assert stale == "$1.00"
+        assert refreshed == "$1.10"
+        assert self.cache.stats()["sources"]["price"]["stale_hits"] == 1
+
+    def test_memory_is_bounded(self):
+        async def run():
+            for i in range(10):
+                await self.cache.get_or_fetch("docs", f"query {i}", AsyncMock(return_value=f"result {i}"))
+
+        asyncio.run(run())
+        assert self.cache.stats()["entries"] == 3
+
+    @patch('app.services.search_service.get_http_client')
+    def test_search_methods_use_cache(self, mock_get_client):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        mock_response = Mock()
+        mock_response.json.return_value = {"AbstractText": "Sui docs"}
+        mock_get = mock_get_client.return_value.get = AsyncMock(return_value=mock_response)
+
+        async def run():
+            await service._search_duckduckgo("What is Sui?")
+            return await service._search_duckduckgo("what is sui")
+
+        assert asyncio.run(run()) == "Sui docs"
+        assert mock_get.await_count == 1
+
+    def test_stats_outage_is_not_cached(self):
+        from app.services.search_service import SearchService, WALRUS_NETWORK_FALLBACK
+        service = SearchService()
+        request = httpx.Request("GET", "https://api.walrusscan.com/api/v1/network/stats")
+        good = httpx.Response(200, json={"validators": {"total": 101}}, request=request)
+        mock_client = Mock(get=AsyncMock(side_effect=[httpx.ConnectError("unreachable", request=request), good]))
+
+        async def run():
+            return await service._walrus_network_stats(), await service._walrus_network_stats()
+
+        with patch('app.services.search_service.get_http_client', return_value=mock_client):
+            during_outage, after_recovery = asyncio.run(run())
+
+        assert during_outage == WALRUS_NETWORK_FALLBACK
+        assert "Active Validators: 101" in after_recovery
+        assert service.search_cache.stats()["entries"] == 1
+
+
+class TestLiveDataRefresher:
+
+    def test_failed_refresh_keeps_last_good_value(self):
+        from app.services.live_data import LiveDataRefresher
+        fetch = AsyncMock(side_effect=["Walrus price: $1.00", Exception("CoinGecko down"), None])
+        refresher = LiveDataRefresher({"walrus_price": fetch}, interval=60)
+
+        for _ in range(3):
+            asyncio.run(refresher.refresh_once())
+
+        status = refresher.status()["walrus_price"]
+        assert refresher.get("walrus_price") == "Walrus price: $1.00"
+        assert status["available"] is True
+        assert status["age_seconds"] is not None
+        assert status["last_error"] == "No data returned"
+
+    def test_walrus_stats_outage_keeps_last_good_snapshot(self):
+        from app.services.search_service import SearchService, WALRUS_NETWORK_FALLBACK
+        service = SearchService()
+        request = httpx.Request("GET", "https://api.walrusscan.com/api/v1/network/stats")
+        good = httpx.Response(200, json={"validators": {"total": 101}}, request=request)
+        mock_client = Mock(get=AsyncMock(side_effect=[good, httpx.ConnectError("unreachable", request=request)]))
+
+        snapshot = service.live_data.snapshots["walrus_network_stats"]
+        with patch('app.services.search_service.get_http_client', return_value=mock_client):
+            asyncio.run(service.live_data._refresh("walrus_network_stats"))
+            refreshed_at = snapshot.updated_at
+            asyncio.run(service.live_data._refresh("walrus_network_stats"))
+
+        assert "Active Validators: 101" in snapshot.value
+        assert snapshot.updated_at == refreshed_at
+        assert snapshot.last_error == "No data returned"
+        assert WALRUS_NETWORK_FALLBACK not in snapshot.value
+
+    def test_walrus_stats_fallback_only_without_any_snapshot(self):
+        from app.services.search_service import SearchService, WALRUS_NETWORK_FALLBACK
+        service = SearchService()
+        with patch.object(SearchService, "_get_walrus_network_stats", AsyncMock(return_value=None)):
+            assert asyncio.run(service._walrus_network_stats()) == WALRUS_NETWORK_FALLBACK
+
+    def test_snapshot_age(self):
+        from app.services.live_data import Snapshot
+        with patch('app.services.live_data.time.time', return_value=1030.0):
+            assert Snapshot(value="x", updated_at=1000.0).age == 30.0
+            assert Snapshot().age is None
+
+    def test_search_reads_snapshot_without_network(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+
+        async def run():
+            service.live_data.fetchers = {
+                "walrus_price": AsyncMock(return_value="Current Walrus price (CoinGecko): $2.00"),
+                "walrus_network_stats": AsyncMock(return_value="Walrus Network Stats"),
+                "sui_network_stats": AsyncMock(return_value="Sui Network Stats"),
+            }
+            service.live_data.start()
+            await asyncio.sleep(0.01)
+            try:
+                return await service.search_sui_docs("What is the Walrus coin price?")
+            finally:
+                await service.live_data.stop()
+
+        with patch('app.services.search_service.get_http_client') as mock_get_client:
+            result = asyncio.run(run())
+            assert not mock_get_client.called
+
+        assert result == "Current Walrus price (CoinGecko): $2.00"
+
+
+class TestIntentClassifier:
+
+    def test_reports_every_intent_in_one_pass(self):
+        from app.services.intent_classifier import classify_query
+        intents = classify_query("How many validators does the Walrus network have and what is the WAL price?")
+        assert intents.blockchain_related
+        assert intents.walrus
+        assert intents.price
+        assert intents.stats
+        assert intents.network
+        assert not intents.sui_stats
+        assert intents.local_info_keys[0] == ("walrus", "walrus_validators")
+        assert ("walrus", "walrus_storage_costs") in intents.local_info_keys
+
+    def test_ordered_patterns_respect_order(self):
+        from app.services.intent_classifier import classify_query
+        assert classify_query("sui mainnet validator count").sui_stats
+        assert not classify_query("validator count on sui").sui_stats
+
+    def test_regex_patterns_still_supported(self):
+        from app.services.intent_classifier import classify_query
+        assert classify_query("walrus market   cap").price
+        assert classify_query("Walrus MarketCap").price
+
+    def test_dot_star_does_not_cross_lines(self):
+        from app.services.intent_classifier import classify_query
+        assert ("walrus", "walrus_epochs") in classify_query("walrus stuff epoch").local_info_keys
+        assert ("walrus", "walrus_epochs") not in classify_query("wal\nrus epoch").local_info_keys
+
+    def test_local_info_ranks_chunks_instead_of_first_match(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        # "walrus blob" also matches walrus_blobs, but BM25 ranks the Blob ID entry first
+        result = service._check_local_info("How do walrus blob ids work?")
+        assert result.startswith("Walrus Blob IDs are unique identifiers")
+        assert "SUI is a Layer 1 blockchain" in service._check_local_info("What is Sui?")
+        assert service._check_local_info("What is the weather?") is None
+
+    def test_local_info_keeps_every_matched_chunk_sharing_a_term(self):
+        from app.services.local_index import LOCAL_INDEX
+        from app.services.search_service import SearchService
+        result = SearchService()._check_local_info("How do transactions work on Ethereum?")
+
+        # "transaction" matches the sui_transactions pattern; BM25 alone ranks other entries higher
+        expected = [chunk for chunk in LOCAL_INDEX.chunks
+                    if chunk.key == "sui_transactions" and "transaction" in chunk.text.lower()]
+        assert len(expected) > 1
+        assert all(chunk.text in result for chunk in expected)
+        assert "proof of work" not in result.lower()
+
+    @pytest.mark.parametrize("query", [
+        "What are the gas fees for publishing a package on Sui testnet?",
+        "How do I call a Move function from Rust?",
+        "How do I run a Sui full node?",
+    ])
+    def test_unmatched_questions_go_to_web_search(self, query):
+        from app.services.search_service import SearchService
+        assert SearchService()._check_local_info(query) is None
+
+
+class TestLocalIndex:
+
+    def test_tokenize_drops_stopwords_and_folds_plurals(self):
+        from app.services.local_index import tokenize
+        assert tokenize("How many Validators are on the network?") == ["validator", "network"]
+        assert tokenize("Address class") == ["address", "class"]
+
+    def test_chunk_corpus_splits_entries_into_paragraphs(self):
+        from app.services.local_index import chunk_corpus
+        from app.data.walrus_info import WALRUS_INFO
+        from app.data.sui_info import SUI_BLOCKCHAIN_INFO
+        chunks = chunk_corpus()
+        assert len(chunks) > len(WALRUS_INFO) + len(SUI_BLOCKCHAIN_INFO)
+        assert {c.key for c in chunks} == set(WALRUS_INFO) | set(SUI_BLOCKCHAIN_INFO)
+        assert len({c.text for c in chunks}) == len(chunks)
+
+    def test_bm25_ranks_relevant_chunks(self):
+        from app.services.local_index import BM25Index, Chunk
+        index = BM25Index([
+            Chunk("walrus", "walrus_epochs", "An epoch lasts two weeks on mainnet."),
+            Chunk("walrus", "walrus_token", "WAL pays for storage and staking."),
+            Chunk("sui", "what_is_sui", "Sui is a layer 1 blockchain."),
+        ])
+        results = index.search("How long is an epoch?", k=2)
+        assert [chunk.key for _, chunk in results] == ["walrus_epochs"]
+        assert index.search("weather forecast") == []
+
+    def test_bm25_boost_keys(self):
+        from app.services.local_index import BM25Index, Chunk
+        index = BM25Index([
+            Chunk("walrus", "walrus_token", "Storage is paid in WAL."),
+            Chunk("walrus", "walrus_storage", "Storage nodes keep storage slivers."),
+        ])
+        assert index.search("storage")[0][1].key == "walrus_storage"
+        boosted = index.search("storage", boost_keys=frozenset({"walrus_token"}), boost=3.0)
+        assert boosted[0][1].key == "walrus_token"
+
+    def test_bm25_search_entries(self):
+        from app.services.local_index import BM25Index, Chunk
+        index = BM25Index([
+            Chunk("walrus", "walrus_token", "Storage is paid in WAL."),
+            Chunk("walrus", "walrus_storage", "Storage nodes keep storage slivers."),
+            Chunk("sui", "sui_gas", "Gas is paid in SUI."),
+            Chunk("sui", "sui_gas", "Storage fees are part of gas."),
+        ])
+        results = index.search_entries("storage fees", ["sui_gas", "missing"])
+        assert [chunk.text for _, chunk in results] == ["Storage fees are part of gas."]
+        assert index.search_entries("storage", ["walrus_token", "walrus_storage"])[0][1].key == "walrus_storage"
+        assert index.search_entries("weather", ["sui_gas"]) == []
+
+    def test_weak_match_without_pattern_is_not_local(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        assert service._check_local_info("How does Walrus erasure coding work?") is None
+        assert service._check_local_info("What is a walrus blob?") is not None
+
+
+class TestEmbeddingIndex:
+
+    def test_embedder_is_deterministic_and_normalised(self):
+        import numpy as np
+        from app.services.embedding_index import HashingEmbedder
+        embedder = HashingEmbedder(dim=256)
+        first, second = embedder.embed(["Walrus stores blobs", "Walrus stores blobs"])
+        assert first.dtype == np.float32
+        assert np.allclose(first, second)
+        assert abs(float(np.linalg.norm(first)) - 1.0) < 1e-5
+        assert not embedder.embed(["the of and"])[0].any()
+
+    def test_build_and_memory_map_index(self, tmp_path):
+        import numpy as np
+        from app.services.embedding_index import build_index, load_index
+        path = tmp_path / "chunks.npy"
+        build_index(path, dim=256)
+        index = load_index(path, dim=256)
+        assert isinstance(index.matrix, np.memmap)
+        assert index.matrix.shape == (len(index.chunks), 256)
+        results = index.search("how long does a walrus epoch last", k=2)
+        assert len(results) == 2
+        assert results[0][0] >= results[1][0]
+        assert results[0][1].key == "walrus_epochs"
+
+    def test_stale_or_missing_index_is_built_in_memory(self, tmp_path):
+        import numpy as np
+        from app.services.embedding_index import build_index, load_index
+        path = tmp_path / "chunks.npy"
+        assert not isinstance(load_index(path, dim=256).matrix, np.memmap)
+        build_index(path, dim=256)
+        # A different dimension changes the fingerprint
+        assert not isinstance(load_index(path, dim=128).matrix, np.memmap)
+
+    def test_semantic_step_applies_min_score(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        with patch('app.services.search_service.settings') as mock_settings:
+            mock_settings.semantic_search_top_k = 3
+            mock_settings.semantic_search_min_score = 0.1
+            assert "epoch" in service._check_semantic_info("how long does a walrus epoch last").lower()
+            mock_settings.semantic_search_min_score = 0.99
+            assert service._check_semantic_info("how long does a walrus epoch last") is None
+
+    def test_semantic_step_runs_before_external_search(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        with patch('app.services.search_service.SearchService._check_local_info', return_value=None), \
+             patch('app.services.search_service.SearchService._check_semantic_info', return_value="Semantic chunk"), \
+             patch('app.services.search_service.SearchService._search_tavily') as mock_tavily:
+            result = asyncio.run(service.search_sui_docs("How are sui stakers paid?"))
+        assert result == "Semantic chunk"
+        mock_tavily.assert_not_called()
+
+    @pytest.mark.parametrize("query", [
+        "What is the latest Sui release version?",
+        "What wallet supports sui?",
+        "ethereum gas estimation in hardhat",
+        "mint an NFT on Sui with kiosk",
+    ])
+    def test_unrelated_and_time_sensitive_queries_reach_external_search(self, query):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        assert service._check_semantic_info(query) is None
+        with patch('app.services.search_service.SearchService._search_external',
+                   AsyncMock(return_value="Web result")) as mock_external:
+            result = asyncio.run(service.search_sui_docs(query))
+        assert result == "Web result"
+        mock_external.assert_awaited_once()
+
+    def test_time_sensitive_query_skips_semantic_step_whatever_the_score(self):
+        from app.services.search_service import SearchService
+        service = SearchService()
+        with patch('app.services.search_service.settings') as mock_settings:
+            mock_settings.semantic_search_top_k = 3
+            mock_settings.semantic_search_min_score = 0.0
+            assert service._check_semantic_info("latest walrus epoch length") is None
+            assert service._check_semantic_info("walrus epoch length") is not None
+
+
+class TestCircuitBreaker:
+
+    def _breaker(self, **kwargs):
+        from app.services.circuit_breaker import CircuitBreaker
+        options = {"failure_threshold": 3, "slow_call_seconds": 1.0, "recovery_seconds": 30.0}
+        options.update(kwargs)
+        return CircuitBreaker("tavily", **options)
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = self._breaker()
+        for _ in range(2):
+            assert breaker.allow_request()
+            breaker.record_failure("timeout")
+        assert breaker.state == "closed"
+        breaker.record_success(0.1)
+        assert breaker.consecutive_failures == 0
+        for _ in range(3):
+            breaker.record_failure("timeout")
+        assert breaker.state == "open"
+        assert not breaker.allow_request()
+        assert breaker.status()["rejected"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        breaker = self._breaker(failure_threshold=2)
+        breaker.record_success(1.5)
+        breaker.record_success(2.0)
+        assert breaker.state == "open"
+        assert "Slow call" in breaker.last_failure
+
+    def test_half_open_allows_one_probe(self):
+        breaker = self._breaker(failure_threshold=1, recovery_seconds=0.0)
+        breaker.record_failure("HTTP 503")
+        assert breaker.allow_request()
+        assert breaker.state == "half_open"
+        assert not breaker.allow_request()
+        breaker.record_failure("HTTP 503")
+        assert breaker.state == "open"
+        assert breaker.allow_request()
+        breaker.record_success(0.1)
+        assert breaker.state == "closed"
+        assert breaker.allow_request() and breaker.allow_request()
+
+    @patch('app.services.search_service.get_http_client')
+    def test_open_circuit_skips_provider_without_network_call(self, mock_get_client):
+        from app.services.search_service import SearchService
+        mock_get_client.return_value.get = AsyncMock(side_effect=httpx.ConnectTimeout("timed out"))
+        service = SearchService()
+        service.search_cache = None
+        threshold = service.breakers["duckduckgo"].failure_threshold
+
+        for _ in range(threshold + 3):
+            assert asyncio.run(service._search_duckduckgo("What is Sui?")) is None
+
+        assert mock_get_client.return_value.get.call_count == threshold
+        status = service.circuit_status()["duckduckgo"]
+        assert status["state"] == "open"
+        assert status["rejected"] == 3
+        assert service.circuit_status()["tavily"]["state"] == "closed"
+
+    @patch('app.services.search_service.get_http_client')
+    def test_client_errors_do_not_trip_breaker(self, mock_get_client):
+        from app.services.search_service import SearchService
+        request = httpx.Request("GET", "https://api.coingecko.com/api/v3/search")
+        mock_get_client.return_value.get = AsyncMock(return_value=httpx.Response(404, request=request))
+        service = SearchService()
+        for _ in range(10):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(service._get("https://api.coingecko.com/api/v3/search"))
+        assert service.breakers["coingecko"].state == "closed"
+
+        mock_get_client.return_value.get = AsyncMock(return_value=httpx.Response(503, request=request))
+        for _ in range(service.breakers["coingecko"].failure_threshold):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(service._get("https://api.coingecko.com/api/v3/search"))
+        assert service.breakers["coingecko"].state == "open"
+
+
+class TestHedging:
+
+    def _tracker(self, samples=(0.02,) * 20):
+        from app.services.hedging import LatencyTracker
+        tracker = LatencyTracker(window=50, quantile=0.9, min_samples=20, min_delay=0.01)
+        for sample in samples:
+            tracker.record(sample)
+        return tracker
+
+    @staticmethod
+    def _calls(*behaviours):
+        """make_call that plays one (delay, result-or-exception) per invocation"""
+        calls = {"started": 0, "cancelled": 0}
+
+        async def make_call():
+            delay, outcome = behaviours[calls["started"]]
+            calls["started"] += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                calls["cancelled"] += 1
+                raise
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return make_call, calls
+
+    def test_hedge_delay_needs_enough_samples(self):
+        assert self._tracker(samples=[0.1] * 5).hedge_delay() is None
+        # Only the last 50 samples (0.51 - 1.00) are in the window
+        tracker = self._tracker(samples=[0.01 * i for i in range(1, 101)])
+        assert tracker.hedge_delay() == pytest.approx(0.95)
+        assert self._tracker(samples=[0.001] * 20).hedge_delay() == 0.01
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        tracker = self._tracker()
+        make_call, calls = self._calls((1.0, "primary"), (0.01, "hedge"))
+
+        assert asyncio.run(tracker.call(make_call)) == "hedge"
+        assert calls == {"started": 2, "cancelled": 1}
+        assert tracker.status()["hedged"] == 1
+        assert tracker.status()["hedge_wins"] == 1
+
+    def test_fast_primary_is_not_hedged(self):
+        tracker = self._tracker()
+        make_call, calls = self._calls((0.0, "primary"))
+
+        assert asyncio.run(tracker.call(make_call)) == "primary"
+        assert calls["started"] == 1
+        assert tracker.status()["hedged"] == 0
+
+    def test_primary_error_before_delay_is_raised(self):
+        tracker = self._tracker()
+        make_call, calls = self._calls((0.0, ValueError("boom")))
+
+        with pytest.raises(ValueError):
+            asyncio.run(tracker.call(make_call))
+        assert calls["started"] == 1
+
+    def test_hedge_covers_primary_failing_late(self):
+        tracker = self._tracker()
+        make_call, _ = self._calls((0.05, ValueError("boom")), (0.1, "hedge"))
+
+        assert asyncio.run(tracker.call(make_call)) == "hedge"
+
+    @patch('app.services.search_service.get_http_client')
+    def test_request_hedges_slow_provider(self, mock_get_client):
+        from app.core.config import settings
+        from app.services.search_service import SearchService
+        request = httpx.Request("GET", "https://api.duckduckgo.com/")
+        delays = iter([1.0, 0.0])
+
+        async def get(url, **kwargs):
+            await asyncio.sleep(next(delays))
+            return httpx.Response(200, json={"results": []}, request=request)
+
+        mock_get_client.return_value.get = get
+        service = SearchService()
+        for _ in range(settings.hedge_min_samples):
+            service.latency["duckduckgo"].record(0.02)
+
+        response = asyncio.run(service._get("https://api.duckduckgo.com/"))
+
+        assert response.status_code == 200
+        assert service.hedging_status()["duckduckgo"]["hedge_wins"] == 1
+        assert service.breakers["duckduckgo"].state == "closed"
+
+    @patch('app.services.search_service.get_http_client')
+    def test_fast_error_status_does_not_beat_slow_success(self, mock_get_client):
+        from app.core.config import settings
+        from app.services.search_service import SearchService
+        request = httpx.Request("GET", "https://api.duckduckgo.com/")
+        responses = iter([(0.2, 200), (0.0, 503)])
+
+        async def get(url, **kwargs):
+            delay, status = next(responses)
+            await asyncio.sleep(delay)
+            return httpx.Response(status, json={"results": []}, request=request)
+
+        mock_get_client.return_value.get = get
+        service = SearchService()
+        for _ in range(settings.hedge_min_samples):
+            service.latency["duckduckgo"].record(0.02)
+
+        response = asyncio.run(service._get("https://api.duckduckgo.com/"))
+
+        assert response.status_code == 200
+        assert service.hedging_status()["duckduckgo"]["hedged"] == 1
+
+    @patch('app.services.search_service.get_http_client')
+    def test_posts_are_hedged_only_when_enabled(self, mock_get_client):
+        from app.core.config import settings
+        from app.services.search_service import SearchService
+        request = httpx.Request("POST", "https://api.tavily.com/search")
+        calls, delays = [], iter([0.1, 0.1, 0.0])
+
+        async def post(url, **kwargs):
+            calls.append(url)
+            await asyncio.sleep(next(delays))
+            return httpx.Response(200, json={"results": []}, request=request)
+
+        mock_get_client.return_value.post = post
+        service = SearchService()
+        for _ in range(settings.hedge_min_samples):
+            service.latency["tavily"].record(0.02)
+
+        asyncio.run(service._post("https://api.tavily.com/search", json={}))
+        assert len(calls) == 1
+        assert service.hedging_status()["tavily"]["hedged"] == 0
+
+        with patch.object(settings, "hedge_post_requests", True):
+            asyncio.run(service._post("https://api.tavily.com/search", json={}))
+        assert len(calls) == 3
+        assert service.hedging_status()["tavily"]["hedge_wins"] == 1
+
+    @patch('app.services.search_service.get_http_client')
+    def test_configured_base_url_keeps_provider_breaker(self, mock_get_client):
+        from app.core.config import settings
+        from app.services.search_service import SearchService
+        request = httpx.Request("GET", "http://127.0.0.1:9103/api/v3/search")
+        mock_get_client.return_value.get = AsyncMock(return_value=httpx.Response(503, request=request))
+
+        with patch.object(settings, "coingecko_base_url", "http://127.0.0.1:9103/api/v3"):
+            service = SearchService()
+        assert asyncio.run(service._get_walrus_price.__wrapped__(service)) is None
+
+        mock_get_client.return_value.get.assert_awaited_once()
+        assert mock_get_client.call_args.args[0] == "http://127.0.0.1:9103/api/v3/search"
+        assert service.circuit_status()["coingecko"]["consecutive_failures"] == 1
+
+
+class TestHTTPClient:
+
+    def teardown_method(self):
+        from app.core.http_client import close_http_client
+        asyncio.run(close_http_client())
+
+    def test_one_pool_per_host(self):
+        from app.core.http_client import get_http_client
+        tavily = get_http_client("https://api.tavily.com/search")
+        assert get_http_client("https://api.tavily.com/other") is tavily
+        assert get_http_client("https://api.coingecko.com/api/v3/search") is not tavily
+        assert get_http_client("https://api.tavily.com:8443/search") is not tavily
+
+    def test_dns_lookups_are_cached(self):
+        from app.core.http_client import CachingDNSBackend
+
+        async def run():
+            backend = CachingDNSBackend(ttl=60)
+            loop = asyncio.get_running_loop()
+            infos = [(None, None, None, None, ("10.0.0.1", 443))]
+            with patch.object(loop, "getaddrinfo", AsyncMock(return_value=infos)) as mock_lookup:
+                assert await backend.resolve("api.tavily.com", 443) == ["10.0.0.1"]
+                assert await backend.resolve("api.tavily.com", 443) == ["10.0.0.1"]
+                assert await backend.resolve("127.0.0.1", 443) == ["127.0.0.1"]
+            return mock_lookup.call_count
+
+        assert asyncio.run(run()) == 1
+
+    def test_requests_go_through_caching_backend(self):
+        from app.core import http_client
+
+        async def handle(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+            await writer.drain()
+            writer.close()
+
+        async def run():
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                url = f"http://localhost:{port}/"
+                response = await http_client.get_http_client(url).get(url)
+            return response.text, port
+
+        text, port = asyncio.run(run())
+        assert text == "ok"
+        assert ("localhost", port) in http_client._dns_backend._cache
+
+
+    def test_transport_internals_used_for_dns_cache_exist(self):
+        # Guards the httpx/httpcore pins: the DNS cache replaces a private attribute of the pool
+        import httpcore
+        from app.core.http_client import CachingDNSBackend, _use_network_backend
+        transport = httpx.AsyncHTTPTransport()
+        assert isinstance(transport._pool, httpcore.AsyncConnectionPool)
+        assert hasattr(transport._pool, "_network_backend")
+
+        backend = CachingDNSBackend(ttl=60)
+        assert _use_network_backend(transport, backend)
+        assert transport._pool._network_backend is backend
+        assert not _use_network_backend(httpx.MockTransport(lambda request: None), backend)
+
+
+class TestWarmUp:
+
+    def test_builds_shared_state_without_opening_pools(self):
+        from app.core import http_client
+        from app.core.dependencies import get_search_service
+        from app.core.warmup import warm_up
+
+        asyncio.run(http_client.close_http_client())
+        warm_up()
+        warm_up()
+        assert http_client._ssl_context is not None
+        assert http_client._clients == {}
+        assert get_search_service.cache_info().currsize == 1
+
+    def test_gunicorn_sizes_workers_to_cores(self):
+        import runpy
+        from pathlib import Path
+        from app.core.config import settings
+
+        conf = str(Path(__file__).resolve().parents[2] / "gunicorn.conf.py")
+        with patch.object(settings, "web_workers", 0), patch("multiprocessing.cpu_count", return_value=6):
+            config = runpy.run_path(conf)
+        assert config["workers"] == 6
+        assert config["preload_app"] is True
+        assert config["worker_class"] == "uvicorn.workers.UvicornWorker"
+        with patch.object(settings, "web_workers", 3):
+            assert runpy.run_path(conf)["workers"] == 3
+
+
+class TestSingleFlight:
+
+    def test_concurrent_calls_share_one_computation(self):
+        from app.utils.singleflight import SingleFlight
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        async def run():
+            results = await asyncio.gather(*(flight.do("what is sui", work) for _ in range(5)))
+            # Finished keys are released, so a later call runs again
+            await flight.do("what is sui", work)
+            return results
+
+        assert asyncio.run(run()) == ["answer"] * 5
+        assert len(calls) == 2
+        assert flight.stats() == {"in_flight": 0, "calls": 6, "shared": 4}
+
+    def test_errors_are_shared(self):
+        from app.utils.singleflight import SingleFlight
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise SearchError("boom")
+
+        async def run():
+            return await asyncio.gather(*(flight.do("k", work) for _ in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert all(isinstance(r, SearchError) for r in results)
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        from app.utils.singleflight import SingleFlight
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        async def run():
+            first = asyncio.ensure_future(flight.do("k", work))
+            second = asyncio.ensure_future(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            return await second
+
+        assert asyncio.run(run()) == "done"
+
+    def test_work_is_cancelled_once_every_caller_has_gone(self):
+        from app.utils.singleflight import SingleFlight
+        flight = SingleFlight()
+        cancelled = []
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            caller = asyncio.ensure_future(flight.do("k", work))
+            await asyncio.sleep(0.01)
+            caller.cancel()
+            await asyncio.sleep(0.01)
+            return flight.stats()["in_flight"]
+
+        assert asyncio.run(run()) == 0
+        assert cancelled == [True]
+
+    def test_search_coalesces_normalized_queries(self):
+        service = SearchService()
+
+        async def slow_search(query):
+            await asyncio.sleep(0.01)
+            return f"context for {query}"
+
+        async def run():
+            return await asyncio.gather(
+                service.search_sui_docs("What is Sui?"),
+                service.search_sui_docs("what is   SUI"),
+                service.search_sui_docs("How do Move modules work?"),
+            )
+
+        with patch.object(service, '_search_sui_docs', side_effect=slow_search) as mock_search:
+            results = asyncio.run(run())
+        assert results[0] == results[1] == "context for What is Sui?"
+        assert mock_search.call_count == 2
+
+    def test_search_is_not_shared_across_deadlines(self):
+        from app.utils.deadline import remaining
+        service = SearchService()
+
+        async def budgeted_search(query):
+            budget = remaining()
+            await asyncio.sleep(0.05)
+            return f"searched within {budget:.0f}s"
+
+        async def run():
+            return await asyncio.gather(
+                service.search_sui_docs("What is Sui?", deadline=1),
+                service.search_sui_docs("What is Sui?", deadline=1),
+                service.search_sui_docs("What is Sui?", deadline=30),
+            )
+
+        with patch.object(service, '_search_sui_docs', side_effect=budgeted_search) as mock_search:
+            results = asyncio.run(run())
+        # A caller with a longer budget does not inherit a search cut short by a shorter one
+        assert results == ["searched within 1s", "searched within 1s", "searched within 30s"]
+        assert mock_search.call_count == 2
+
+    def test_generation_coalesces_same_query_and_context(self):
+        service = AIService()
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Shared answer"
+
+        async def create(**kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=create)
+        service._async_client = mock_client
+
+        async def run():
+            return await asyncio.gather(
+                service.agenerate_response("What is Walrus?", "ctx"),
+                service.agenerate_response("what is walrus", "ctx"),
+                service.agenerate_response("What is Walrus?", "other ctx"),
+            )
+
+        assert asyncio.run(run()) == ["Shared answer"] * 3
+        assert mock_client.chat.completions.create.call_count == 2
+
+
+class TestSemanticAnswerCache:
+
+    def _cache(self, threshold=0.7, max_entries=10, ttl=60):
+        from app.services.embedding_index import HashingEmbedder
+        from app.services.semantic_cache import SemanticAnswerCache
+        embedder = HashingEmbedder(256)
+
+        async def embed(query):
+            return embedder.embed([query])[0]
+        return SemanticAnswerCache(embed, threshold=threshold, max_entries=max_entries, ttl=ttl)
+
+    def test_serves_near_duplicate_questions(self):
+        cache = self._cache()
+
+        async def run():
+            await cache.set("How many validators does Walrus have?", "About 100 validators.")
+            return (
+                await cache.get("how many walrus validators are there"),
+                await cache.get("How do I write a Move module?"),
+            )
+
+        hit, miss = asyncio.run(run())
+        assert hit == "About 100 validators."
+        assert miss is None
+        stats = cache.stats()
+        assert stats["hits"] == 1 and stats["lookups"] == 2
+        assert stats["hit_rate"] == 0.5
+
+    def test_similar_question_on_another_topic_is_a_false_hit(self):
+        cache = self._cache(threshold=0.5)
+
+        async def run():
+            await cache.set("how long is a walrus epoch", "Two weeks.")
+            return await cache.get("how long is a sui epoch")
+
+        assert asyncio.run(run()) is None
+        assert cache.stats()["false_hits"] == 1
+        assert cache.stats()["false_hit_rate"] == 1.0
+
+    def test_capacity_evicts_least_recently_used(self):
+        cache = self._cache(max_entries=2)
+
+        async def run():
+            await cache.set("What is Sui?", "Sui answer")
+            await cache.set("What is Walrus?", "Walrus answer")
+            await cache.get("What is Sui?")
+            await cache.set("How do Move modules work?", "Move answer")
+            return [await cache.get(q) for q in ("What is Sui?", "What is Walrus?", "How do Move modules work?")]
+
+        assert asyncio.run(run()) == ["Sui answer", None, "Move answer"]
+        assert len(cache) == 2
+
+    def test_expired_entries_do_not_match(self):
+        cache = self._cache(ttl=0)
+
+        async def run():
+            await cache.set("What is Sui?", "Sui answer")
+            return await cache.get("What is Sui?")
+
+        assert asyncio.run(run()) is None
+
+    def _same_vector_cache(self):
+        """Every query embeds identically, as an embedding model does for near-paraphrases and close contrasts"""
+        from app.services.semantic_cache import SemanticAnswerCache
+        vector = np.ones(8, dtype=np.float32) / np.sqrt(8)
+        return SemanticAnswerCache(AsyncMock(return_value=vector), threshold=0.85, max_entries=10, ttl=60)
+
+    def test_paraphrase_is_served(self):
+        cache = self._same_vector_cache()
+
+        async def run():
+            await cache.set("how long is a walrus epoch", "Two weeks on mainnet.")
+            return await cache.get("walrus epoch duration")
+
+        assert asyncio.run(run()) == "Two weeks on mainnet."
+
+    @pytest.mark.parametrize("stored, asked", [
+        ("Is Sui a PoS chain", "Is Sui not a PoS chain"),
+        ("Sui vs Aptos", "Sui vs Solana"),
+        ("how do I stake SUI", "unstake SUI tokens"),
+        ("gas fees on Sui mainnet", "gas fees on Sui testnet"),
+        ("create a Move module", "delete a Move module"),
+        ("how do I lock a Sui coin", "how do I unlock a Sui coin"),
+        ("Sui TPS in 2023", "Sui TPS in 2024"),
+    ])
+    def test_negation_antonym_and_entity_pairs_miss(self, stored, asked):
+        cache = self._same_vector_cache()
+
+        async def run():
+            await cache.set(stored, "stored answer")
+            return await cache.get(asked)
+
+        assert asyncio.run(run()) is None
+        assert cache.stats()["false_hits"] == 1
+
+    def test_uses_openai_embeddings(self):
+        from app.core.config import settings
+        from app.services.semantic_cache import build_semantic_cache
+        ai_service = Mock()
+        with patch.object(settings, "semantic_cache_enabled", True):
+            assert build_semantic_cache(ai_service).embed is ai_service.aembed
+
+    def test_same_question_overwrites_its_row(self):
+        cache = self._cache(max_entries=3)
+
+        async def run():
+            await cache.set("What is Sui?", "First Sui answer")
+            await cache.set("What is Walrus?", "Walrus answer")
+            await cache.set("what is SUI", "Second Sui answer")
+            return await cache.get("What is Sui?"), await cache.get("What is Walrus?")
+
+        assert asyncio.run(run()) == ("Second Sui answer", "Walrus answer")
+        assert len(cache) == 2
+
+    def test_full_cache_evicts_expired_rows_first(self):
+        cache = self._cache(max_entries=2)
+
+        async def run():
+            await cache.set("What is Sui?", "Sui answer")
+            await cache.set("What is Walrus?", "Walrus answer")
+            await cache.get("What is Sui?")
+            # The Sui row was used more recently but has expired
+            cache._expires[0] = 0
+            await cache.set("How do Move modules work?", "Move answer")
+            return await cache.get("What is Walrus?"), await cache.get("How do Move modules work?")
+
+        assert asyncio.run(run()) == ("Walrus answer", "Move answer")
+
+    def test_disabled_by_default(self):
+        from app.core.config import Settings
+        assert Settings(openai_api_key="k", _env_file=None).semantic_cache_enabled is False
+
+    def test_embedding_failure_is_a_miss(self):
+        from app.services.semantic_cache import SemanticAnswerCache
+        cache = SemanticAnswerCache(AsyncMock(side_effect=AIServiceError("down")), 0.7, 10, 60)
+
+        async def run():
+            await cache.set("What is Sui?", "Sui answer")
+            return await cache.get("What is Sui?")
+
+        assert asyncio.run(run()) is None
+        assert len(cache) == 0
+
+
+class TestMetrics:
+
+    def _registry(self):
+        from app.utils import metrics
+        return metrics
+
+    def test_counter_and_histogram_render(self):
+        metrics = self._registry()
+        counter = metrics.Counter("test_events_total", "Test events", ["kind"])
+        histogram = metrics.Histogram("test_latency_seconds", "Test latency", ["stage"], buckets=(0.1, 1.0))
+        try:
+            counter.inc(kind="a")
+            counter.inc(2, kind="a")
+            histogram.observe(0.05, stage="x")
+            histogram.observe(0.5, stage="x")
+            histogram.observe(3.0, stage="x")
+            text = metrics.render_metrics()
+        finally:
+            metrics.REGISTRY.remove(counter)
+            metrics.REGISTRY.remove(histogram)
+
+        assert "# TYPE test_events_total counter" in text
+        assert 'test_events_total{kind="a"} 3' in text
+        # Buckets are cumulative and end with +Inf
+        assert 'test_latency_seconds_bucket{stage="x",le="0.1"} 1' in text
+        assert 'test_latency_seconds_bucket{stage="x",le="1"} 2' in text
+        assert 'test_latency_seconds_bucket{stage="x",le="+Inf"} 3' in text
+        assert 'test_latency_seconds_count{stage="x"} 3' in text
+        assert 'test_latency_seconds_sum{stage="x"} 3.55' in text
+
+    def test_wrong_labels_are_rejected(self):
+        metrics = self._registry()
+        counter = metrics.Counter("test_labels_total", "Test", ["kind"])
+        metrics.REGISTRY.remove(counter)
+        with pytest.raises(ValueError):
+            counter.inc(other="a")
+
+    def test_token_usage_skips_missing_fields(self):
+        from app.utils.metrics import OPENAI_TOKENS, record_token_usage
+        before = OPENAI_TOKENS.value(kind="prompt"), OPENAI_TOKENS.value(kind="completion")
+        record_token_usage(Mock(prompt_tokens=12, completion_tokens=None))
+        assert OPENAI_TOKENS.value(kind="prompt") == before[0] + 12
+        assert OPENAI_TOKENS.value(kind="completion") == before[1]
+
+    def test_search_records_answering_step(self):
+        from app.utils.metrics import SEARCH_ANSWERED, STAGE_SECONDS
+        before = SEARCH_ANSWERED.value(step="local"), STAGE_SECONDS.count(stage="search_local")
+        result = asyncio.run(SearchService().search_sui_docs("What is Sui?"))
+        assert result
+        assert SEARCH_ANSWERED.value(step="local") == before[0] + 1
+        assert STAGE_SECONDS.count(stage="search_local") == before[1] + 1
+
+
+class TestContextAssembler:
+
+    def _assembler(self, max_tokens=1500, passage_tokens=200, dedupe_threshold=0.8):
+        from app.services.context_assembler import ContextAssembler
+        return ContextAssembler(max_tokens, passage_tokens, dedupe_threshold)
+
+    def test_short_context_is_unchanged(self):
+        context = "Sui is a layer 1 blockchain.\n\nMove is its smart contract language."
+        assert self._assembler().assemble("What is Sui?", context) == context
+
+    def test_prompt_context_stays_within_budget(self):
+        from app.data.walrus_info import WALRUS_INFO
+        from app.services.context_assembler import count_tokens
+        context = "\n\n".join(WALRUS_INFO.values())
+        assert count_tokens(context) > 300
+
+        assembled = self._assembler(max_tokens=300).assemble("How are Walrus blobs stored?", context)
+
+        assert count_tokens(assembled) <= 300
+        assert "blob" in assembled.lower()
+
+    def test_most_relevant_passage_wins_the_budget(self):
+        context = (
+            "Validators on Sui stake SUI tokens and vote on checkpoints every epoch.\n\n"
+            "Move modules define structs with abilities such as key, store, copy and drop."
+        )
+        assembled = self._assembler(max_tokens=20).assemble("What abilities can a Move struct have?", context)
+        assert assembled.startswith("Move modules define structs")
+        assert "Validators" not in assembled
+
+    def test_overlapping_passages_are_deduplicated(self):
+        passage = "Walrus stores blobs with erasure coding across storage nodes so data survives node failures."
+        context = f"{passage}\n\n{passage} Read more on the Walrus blog.\n\nSui checkpoints finalize transactions."
+        assembled = self._assembler().assemble("How does Walrus store blobs?", context)
+        assert assembled.count("erasure coding") == 1
+        assert assembled.endswith("Sui checkpoints finalize transactions.")
+
+    def test_long_paragraph_is_split_and_truncated(self):
+        from app.services.context_assembler import count_tokens
+        sentence = "Sui executes transactions on owned objects in parallel without consensus. "
+        context = sentence * 50
+        assembler = self._assembler(max_tokens=40, passage_tokens=30)
+
+        assert len(assembler.split(context)) > 1
+        assembled = assembler.assemble("parallel execution", context)
+        assert 0 < count_tokens(assembled) <= 40
+
+    def test_token_estimate_is_close_to_word_count(self):
+        from app.services.context_assembler import count_tokens
+        text = "Sui is a layer 1 blockchain designed for low latency and high throughput."
+        assert len(text.split()) <= count_tokens(text) <= 2 * len(text.split())
+
+    def test_ai_service_sends_assembled_context(self):
+        with patch('app.services.ai_service.settings') as mock_settings:
+            mock_settings.openai_api_key = "test_key"
+            mock_settings.openai_base_url = None
+            service = AIService()
+        service.context_assembler = self._assembler(max_tokens=5)
+        messages = service._build_messages("What is Sui?", "Sui is a layer 1 blockchain designed for speed and scale.")
+        assert "designed for speed" not in messages[1]["content"]
+
+
+class TestChatPrompt:
+
+    def test_static_prefix_is_identical_across_requests(self):
+        from app.services.prompts import CHAT_PROMPT
+        first = CHAT_PROMPT.messages("What is Sui?", "Sui context")
+        second = CHAT_PROMPT.messages("How do Walrus blobs work?", "Walrus context")
+        assert first[0] is second[0]
+        assert first[0]["content"] == CHAT_PROMPT.system
+        assert first[1]["content"] == "Context (Sui/Move/Walrus): Sui context\n\nQuestion: What is Sui?"
+
+    def test_fingerprint_tracks_version_and_text(self):
+        from app.services.prompts import CHAT_PROMPT, ChatPrompt
+        same = ChatPrompt(CHAT_PROMPT.version, CHAT_PROMPT.system, CHAT_PROMPT.user_template)
+        bumped = ChatPrompt("chat-v2", CHAT_PROMPT.system, CHAT_PROMPT.user_template)
+        assert same.fingerprint == CHAT_PROMPT.fingerprint
+        assert bumped.fingerprint != CHAT_PROMPT.fingerprint
+
+    def test_cached_prompt_tokens_are_recorded(self):
+        from app.utils.metrics import OPENAI_TOKENS, record_token_usage
+        before = OPENAI_TOKENS.value(kind="cached_prompt")
+        usage = Mock(prompt_tokens=1500, completion_tokens=40, prompt_tokens_details=Mock(cached_tokens=1280))
+
+        assert record_token_usage(usage) == {"prompt": 1500, "cached_prompt": 1280, "completion": 40}
+        assert OPENAI_TOKENS.value(kind="cached_prompt") == before + 1280
+
+    def test_requests_carry_prompt_cache_key(self):
+        from app.services.prompts import CHAT_PROMPT
+        kwargs = AIService._completion_kwargs(CHAT_PROMPT.messages("q", "c"))
+        assert kwargs["extra_body"] == {"prompt_cache_key": f"suibot-{CHAT_PROMPT.fingerprint}"}
+
+    def test_prompt_cache_key_can_be_turned_off(self):
+        from app.services.prompts import CHAT_PROMPT
+        with patch('app.services.ai_service.settings.ai_prompt_cache_key_enabled', False):
+            kwargs = AIService._completion_kwargs(CHAT_PROMPT.messages("q", "c"))
+        assert "extra_body" not in kwargs
+
+
+class TestTracing:
+
+    class ListExporter:
+        def __init__(self):
+            self.spans = []
+
+        def export(self, span):
+            self.spans.append(span.to_dict())
+
+    def setup_method(self):
+        from app.utils import tracing
+        self.exporter = self.ListExporter()
+        tracing.set_exporter(self.exporter)
+
+    def teardown_method(self):
+        from app.utils import tracing
+        tracing.set_exporter(None)
+
+    def test_child_spans_share_the_trace_and_carry_request_id(self):
+        from app.utils.tracing import request_context, set_attributes, span
+
+        with request_context("req-1"), span("parent", kind="SERVER") as parent:
+            with span("child", {"search.step": "local"}):
+                set_attributes({"cache.hit": True})
+
+        child, root = self.exporter.spans
+        assert root["parent_id"] is None and root["kind"] == "SpanKind.SERVER"
+        assert child["parent_id"] == root["context"]["span_id"]
+        assert child["context"]["trace_id"] == root["context"]["trace_id"]
+        assert child["attributes"] == {"search.step": "local", "request.id": "req-1", "cache.hit": True}
+        assert child["status"]["status_code"] == "OK"
+        assert parent.end_ns >= parent.start_ns
+
+    def test_exception_marks_span_as_error(self):
+        from app.utils.tracing import span
+
+        with pytest.raises(SearchError):
+            with span("failing"):
+                raise SearchError("no results")
+
+        assert self.exporter.spans[0]["status"] == {"status_code": "ERROR", "description": "SearchError: no results"}
+
+    def test_outbound_call_span_records_provider_and_bytes(self):
+        from app.utils.tracing import span
+        url = "https://api.tavily.com/search"
+        response = httpx.Response(200, content=b'{"results": []}', request=httpx.Request("POST", url))
+        client = Mock(post=AsyncMock(return_value=response))
+
+        async def run():
+            with patch('app.services.search_service.get_http_client', return_value=client):
+                with span("search.tavily"):
+                    await SearchService()._post(url, json={})
+
+        asyncio.run(run())
+        http_span, tier_span = self.exporter.spans
+        assert http_span["name"] == "POST tavily"
+        assert http_span["parent_id"] == tier_span["context"]["span_id"]
+        assert http_span["attributes"]["peer.service"] == "tavily"
+        assert http_span["attributes"]["http.response.status_code"] == 200
+        assert http_span["attributes"]["http.response.body.size"] == len(b'{"results": []}')
+
+    def test_log_records_carry_request_id(self):
+        import logging
+        from app.utils.tracing import RequestIdFilter, request_context
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "message", None, None)
+
+        with request_context("req-2"):
+            RequestIdFilter().filter(record)
+        assert record.request_id == "req-2"
+        RequestIdFilter().filter(record)
+        assert record.request_id == "-"
+
+
 class TestAIService:
 
 
@@ -469,3 +1972,60 @@ class TestAIService:
             with pytest.raises(AIServiceError) as exc:
                 AIService()
             assert "OpenAI API key not configured" in str(exc.value.message)
+
+    def test_agenerate_response_uses_async_client(self):
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "Walrus stores blobs on Sui."
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        self.service._async_client = mock_client
+
+        result = asyncio.run(self.service.agenerate_response("What is Walrus?", "Walrus context"))
+
+        assert result == "Walrus stores blobs on Sui."
+        call_args = mock_client.chat.completions.create.call_args[1]
+        assert "Context (Sui/Move/Walrus): Walrus context" in call_args['messages'][1]['content']
+
+    def test_agenerate_response_handles_errors(self):
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(side_effect=Exception("API Error"))
+        self.service._async_client = mock_client
+
+        with pytest.raises(AIServiceError) as exc:
+            asyncio.run(self.service.agenerate_response("tests query", "tests context"))
+
+        assert "Failed to generate response" in str(exc.value.message)
+
+    def test_aembed_returns_normalised_vector(self):
+        mock_response = Mock()
+        mock_response.data = [Mock(embedding=[3.0, 4.0])]
+        mock_client = Mock()
+        mock_client.embeddings.create = AsyncMock(return_value=mock_response)
+        self.service._async_client = mock_client
+
+        vector = asyncio.run(self.service.aembed("What is Walrus?"))
+
+        assert vector.dtype.name == "float32"
+        assert vector.tolist() == pytest.approx([0.6, 0.8])
+
+    def test_astream_response_yields_deltas(self):
+        def chunk(content):
+            c = Mock()
+            c.choices = [Mock()]
+            c.choices[0].delta.content = content
+            return c
+
+        async def fake_stream():
+            for content in ["Walrus ", None, "stores blobs."]:
+                yield chunk(content)
+
+        mock_client = Mock()
+        mock_client.chat.completions.create = AsyncMock(return_value=fake_stream())
+        self.service._async_client = mock_client
+
+        async def collect():
+            return [text async for text in self.service.astream_response("What is Walrus?", "ctx")]
+
+        assert asyncio.run(collect()) == ["Walrus ", "stores blobs."]
+        assert mock_client.chat.completions.create.call_args[1]["stream"] is True
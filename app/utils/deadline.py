@@ -0,0 +1,41 @@
+# ======================
+# app/utils/deadline.py
+# ======================
+"""Request-scoped deadline shared by every step of one search.
+
+The deadline is an absolute ``time.monotonic()`` value held in a context
+variable, so tasks started inside ``deadline_scope`` (fan-out tiers, hedged
+calls) see the same budget without it being passed through each call.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[None]:
+    """Run the block with a deadline ``seconds`` from now (an enclosing, earlier deadline wins)."""
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
@@ -20,6 +20,11 @@ class SearchError(SuiBotException):
     def __init__(self, message: str):
         super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
 
+class CircuitOpenError(SuiBotException):
+    """Upstream provider skipped because its circuit breaker is open"""
+    def __init__(self, message: str):
+        super().__init__(message, status.HTTP_503_SERVICE_UNAVAILABLE)
+
 class AIServiceError(SuiBotException):
 
     def __init__(self, message: str):
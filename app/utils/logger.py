@@ -3,6 +3,7 @@
 # ======================
 import logging
 from app.core.config import settings
+from app.utils.tracing import RequestIdFilter
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -12,9 +13,10 @@ def get_logger(name: str) -> logging.Logger:
     if not logger.handlers:
         handler = logging.StreamHandler()
         formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] - %(message)s'
         )
         handler.setFormatter(formatter)
+        handler.addFilter(RequestIdFilter())
         logger.addHandler(handler)
 
     return logger
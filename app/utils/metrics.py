@@ -0,0 +1,187 @@
+# ======================
+# app/utils/metrics.py
+# ======================
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms keyed by label values, rendered by
+``render_metrics()`` for the ``/metrics`` endpoint. Values are per process;
+with several workers each one reports its own series.
+"""
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        header = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return header + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket (non-cumulative) counts, then sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+
+def render_metrics() -> str:
+    return "".join(metric.render() for metric in REGISTRY)
+
+
+STAGE_SECONDS = Histogram(
+    "suibot_stage_duration_seconds",
+    "Time spent in each stage of the chat pipeline (validation, search steps, generation)",
+    ["stage"],
+)
+SEARCH_ANSWERED = Counter(
+    "suibot_search_answered_total", "Search steps that produced the context for an answer", ["step"]
+)
+CACHE_REQUESTS = Counter(
+    "suibot_cache_requests_total", "Cache lookups by cache and result (hit, stale, miss)", ["cache", "result"]
+)
+UPSTREAM_SECONDS = Histogram(
+    "suibot_upstream_request_duration_seconds", "Outbound HTTP call latency by provider", ["provider"]
+)
+UPSTREAM_ERRORS = Counter(
+    "suibot_upstream_errors_total", "Failed or skipped upstream calls by provider and reason", ["provider", "reason"]
+)
+SPECULATION = Counter(
+    "suibot_speculative_generation_total",
+    "Speculative no-context answers by outcome (speculative: used after the grace window, "
+    "no_context: search found nothing, contextual: cancelled for a contextual answer)",
+    ["outcome"],
+)
+OPENAI_TOKENS = Counter(
+    "suibot_openai_tokens_total", "OpenAI token usage (prompt, cached_prompt, completion)", ["kind"]
+)
+HTTP_REQUESTS = Counter("suibot_http_requests_total", "HTTP requests by route and status", ["route", "status"])
+HTTP_SECONDS = Histogram("suibot_http_request_duration_seconds", "HTTP request latency by route", ["route"])
+IN_FLIGHT = Gauge("suibot_requests_in_flight", "HTTP requests currently being handled", ["route"])
+
+
+def record_token_usage(usage) -> Dict[str, int]:
+    """Count prompt, cached prompt and completion tokens from an OpenAI usage object.
+
+    Missing fields are skipped; returns the counts that were recorded by kind.
+    """
+    counts = {
+        "prompt": getattr(usage, "prompt_tokens", None),
+        "cached_prompt": getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None),
+        "completion": getattr(usage, "completion_tokens", None),
+    }
+    recorded = {kind: tokens for kind, tokens in counts.items() if isinstance(tokens, int)}
+    for kind, tokens in recorded.items():
+        OPENAI_TOKENS.inc(tokens, kind=kind)
+    return recorded
@@ -0,0 +1,50 @@
+# ======================
+# app/utils/singleflight.py
+# ======================
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one in-flight computation.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same result (or exception). Each caller waits through
+    ``asyncio.shield``, so one caller being cancelled does not cancel the work the
+    others are waiting on; the work is cancelled only once every caller has gone.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        self._counters["calls"] += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["shared"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    task.cancel()
+                    # New callers must start fresh rather than join the cancelled call
+                    self._forget(key, task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._inflight), **self._counters}
@@ -0,0 +1,214 @@
+# ======================
+# app/utils/tracing.py
+# ======================
+"""Per-request tracing with OpenTelemetry-shaped spans.
+
+``span()`` opens a child of the current span (tracked in a context variable, so
+it follows asyncio tasks) and exports it when it ends. Exported spans use the
+JSON layout of the OpenTelemetry SDK's ``ConsoleSpanExporter`` (trace/span ids,
+parent id, ISO timestamps, status, attributes), one per line, to stdout or a
+file. Attribute names follow the OpenTelemetry semantic conventions where one
+exists (``http.*``, ``gen_ai.*``).
+
+The request ID lives in its own context variable, set by the HTTP middleware;
+it is added to every span and, through ``RequestIdFilter``, to every log line.
+"""
+import json
+import logging
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.config import settings
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Caller-supplied IDs end up in log lines and response headers, so only plain tokens are kept
+_REQUEST_ID_RE = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+def _iso(ns: int) -> str:
+    return datetime.fromtimestamp(ns / 1e9, tz=timezone.utc).isoformat()
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any],
+                 kind: str = "INTERNAL"):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "UNSET"
+        self.description: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, description: str) -> None:
+        self.status = "ERROR"
+        self.description = description
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = {"status_code": self.status}
+        if self.description:
+            status["description"] = self.description
+        return {
+            "name": self.name,
+            "context": {"trace_id": f"0x{self.trace_id}", "span_id": f"0x{self.span_id}"},
+            "kind": f"SpanKind.{self.kind}",
+            "parent_id": f"0x{self.parent_id}" if self.parent_id else None,
+            "start_time": _iso(self.start_ns),
+            "end_time": _iso(self.end_ns) if self.end_ns else None,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3) if self.end_ns else None,
+            "status": status,
+            "attributes": self.attributes,
+            "resource": {"attributes": {"service.name": settings.app_name, "service.version": settings.version}},
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is off so callers never need a None check."""
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_error(self, description: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ConsoleSpanExporter:
+    def export(self, span: Span) -> None:
+        sys.stdout.write(json.dumps(span.to_dict(), default=str) + "\n")
+        sys.stdout.flush()
+
+
+class FileSpanExporter:
+    """Appends one JSON span per line; meant for local debugging, not high request rates."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def _build_exporter():
+    if settings.tracing_exporter == "console":
+        return ConsoleSpanExporter()
+    if settings.tracing_exporter == "file":
+        return FileSpanExporter(settings.tracing_file_path)
+    return None
+
+
+_exporter = _build_exporter()
+
+
+def set_exporter(exporter) -> None:
+    """Replace the span exporter (None turns tracing off)."""
+    global _exporter
+    _exporter = exporter
+
+
+def current_span():
+    return _current_span.get() or NOOP_SPAN
+
+
+def set_attributes(attributes: Dict[str, Any]) -> None:
+    """Set attributes on the current span (no-op outside a span or with tracing off)."""
+    span_ = current_span()
+    for key, value in attributes.items():
+        span_.set_attribute(key, value)
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: str = "INTERNAL") -> Iterator[Any]:
+    """Trace the enclosed block as a child of the current span.
+
+    ``kind`` is an OpenTelemetry span kind name (INTERNAL, SERVER, CLIENT).
+    Exceptions, including cancellation, mark the span as an error and propagate.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current_span.get()
+    attrs = dict(attributes or {})
+    request_id = _request_id.get()
+    if request_id:
+        attrs["request.id"] = request_id
+    span_ = Span(
+        name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None, attrs, kind
+    )
+    token = _current_span.set(span_)
+    try:
+        yield span_
+    except BaseException as e:
+        span_.set_error(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+        raise
+    else:
+        if span_.status == "UNSET":
+            span_.status = "OK"
+    finally:
+        span_.end_ns = time.time_ns()
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Ended from a different context (e.g. an async generator closed by another task)
+            _current_span.set(parent)
+        exporter.export(span_)
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+def new_request_id() -> str:
+    return secrets.token_hex(8)
+
+
+def incoming_request_id(value: Optional[str]) -> str:
+    """The caller's ``X-Request-ID`` if it is a plain token of at most 128 characters, else a new ID."""
+    if value and _REQUEST_ID_RE.fullmatch(value):
+        return value
+    return new_request_id()
+
+
+@contextmanager
+def request_context(request_id: str) -> Iterator[None]:
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds ``request_id`` to log records ("-" outside a request) for the log format."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get() or "-"
+        return True
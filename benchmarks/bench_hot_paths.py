@@ -0,0 +1,147 @@
+# ======================
+# benchmarks/bench_hot_paths.py
+# ======================
+"""pytest-benchmark micro-benchmarks for the CPU-bound work done on every chat request.
+
+Each benchmark runs one function over the whole query corpus below (topic hits,
+misses, typo variants and 1000-character inputs), so a regression on any kind
+of input moves the number. The file name does not match ``test_*.py``, so the
+regular test run does not collect it; pass it explicitly. Run from the
+repository root:
+
+    # record a baseline (stored per machine under benchmarks/baselines/<platform>/)
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-storage=benchmarks/baselines --benchmark-save=baseline
+
+    # compare against the latest stored run; fails if any median is more than 15% slower
+    python -m pytest benchmarks/bench_hot_paths.py --benchmark-storage=benchmarks/baselines \\
+        --benchmark-compare --benchmark-compare-fail=median:15%
+
+Timings only compare meaningfully on the machine that recorded the baseline;
+record a fresh one when the hardware or Python version changes.
+"""
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-openai-key")
+
+pytest.importorskip("pytest_benchmark")
+
+from app.models.chat import ChatRequest, ChatResponse  # noqa: E402
+from app.services.intent_classifier import classify_query  # noqa: E402
+from app.services.search_service import SearchService  # noqa: E402
+from app.services.validation_service import ValidationService  # noqa: E402
+
+
+def _long(sentences, length=1000):
+    """Repeat ``sentences`` up to exactly ``length`` characters, the longest query the API accepts."""
+    text = ""
+    while len(text) < length:
+        text += " ".join(sentences) + " "
+    return text[:length]
+
+
+HITS = [
+    "What is Sui?",
+    "What is the Move programming language?",
+    "How does Sui consensus work with Narwhal and Bullshark?",
+    "What are Sui objects and how does ownership work?",
+    "What is Walrus storage?",
+    "How does Walrus store blobs and how long are they kept?",
+    "How many validators does Walrus have?",
+    "What is the current Walrus token price?",
+    "How many transactions per second does the Sui network process right now?",
+    "How do I write a Move module that mints an NFT on Sui?",
+    "How do I integrate Walrus storage into a Sui dApp?",
+    "What are the gas fees for publishing a package on Sui testnet?",
+    "Explain zkLogin on Sui",
+    "What is the difference between shared and owned objects in Sui?",
+]
+MISSES = [
+    "What is the weather in Paris today?",
+    "Give me a recipe for sourdough bread",
+    "Who won the football world cup in 2018?",
+    "How do I center a div in CSS?",
+    "Translate 'good morning' into Japanese",
+]
+TYPOS = [
+    "waht is sui blokchain",
+    "how dose walrsu store blobs",
+    "mvoe langauge smart contarct tutorial",
+    "wal tokn prise",
+    "how many validaters on suii network",
+    "SUI   consensus??? ",
+]
+LONG = [
+    _long(["How do I write a Move smart contract on Sui that stores NFT metadata in Walrus blobs,",
+           "pays storage fees in WAL, and lets owners transfer the object while keeping the blob alive?"]),
+    _long(["I am planning a trip through Italy next summer and would like suggestions",
+           "for restaurants, museums and train routes between the major cities."]),
+    "sui " * 250,
+]
+CORPUS = HITS + MISSES + TYPOS + LONG
+
+
+@pytest.fixture(scope="module")
+def search_service():
+    return SearchService()
+
+
+@pytest.fixture(params=["cold", "cached"])
+def classifier_cache(request):
+    """'cold' clears the classification cache before every round (a query seen for the first time)."""
+    classify_query.cache_clear()
+    return request.param
+
+
+def _run(benchmark, fn, cache_mode="cached"):
+    def over_corpus():
+        for query in CORPUS:
+            fn(query)
+
+    if cache_mode == "cold":
+        benchmark.pedantic(over_corpus, setup=classify_query.cache_clear, rounds=200, warmup_rounds=5)
+    else:
+        benchmark(over_corpus)
+
+
+@pytest.mark.benchmark(group="classifier")
+def test_is_blockchain_related(benchmark, search_service, classifier_cache):
+    _run(benchmark, search_service._is_blockchain_related, classifier_cache)
+
+
+@pytest.mark.benchmark(group="classifier")
+def test_is_walrus_query(benchmark, search_service, classifier_cache):
+    _run(benchmark, search_service._is_walrus_query, classifier_cache)
+
+
+@pytest.mark.benchmark(group="local-search")
+def test_check_local_info(benchmark, search_service, classifier_cache):
+    _run(benchmark, search_service._check_local_info, classifier_cache)
+
+
+@pytest.mark.benchmark(group="request")
+def test_validate_query(benchmark):
+    _run(benchmark, ValidationService.validate_query)
+
+
+@pytest.mark.benchmark(group="request")
+def test_chat_model_round_trip(benchmark):
+    """Parse a request body and serialize the response, as FastAPI does around /chat."""
+    bodies = [ChatRequest(query=query).model_dump_json() for query in CORPUS]
+    answer = _long(["Sui is a layer 1 blockchain built around objects and the Move language."], 1500)
+
+    def round_trip():
+        for body in bodies:
+            request = ChatRequest.model_validate_json(body)
+            ChatResponse(
+                success=True, response=answer, query=request.query, context_found=True, processing_time=0.42
+            ).model_dump_json()
+
+    benchmark(round_trip)
+
+
+def test_corpus_is_accepted_by_the_api():
+    """Every corpus entry is a query the API would actually see."""
+    for query in CORPUS:
+        assert ValidationService.validate_query(query)
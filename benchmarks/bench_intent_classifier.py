@@ -0,0 +1,95 @@
+# ======================
+# benchmarks/bench_intent_classifier.py
+# ======================
+"""Compare the compiled intent classifier with the per-pattern regex loops it replaced.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_intent_classifier
+"""
+import os
+import re
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "bench-openai-key")
+
+from app.services.intent_classifier import (  # noqa: E402
+    BLOCKCHAIN_TERMS,
+    NETWORK_TERMS,
+    PRICE_TERMS,
+    STATS_TERMS,
+    SUI_INFO_PATTERNS,
+    SUI_STATS_TERMS,
+    WALRUS_INFO_PATTERNS,
+    WALRUS_TERMS,
+    _classify,
+)
+
+QUERIES = [
+    "What is Sui?",
+    "How many validators are on the Walrus network?",
+    "What is the Walrus coin price?",
+    "How do I write a Move smart contract that mints an NFT?",
+    "Explain the difference between proof of work and proof of stake",
+    "How long is a walrus epoch in days?",
+    "What is the weather today?",
+    "How to integrate Walrus with custom applications",
+    "sui " * 250,
+]
+
+
+def _any(patterns, query):
+    q = query.lower()
+    return any(re.search(p, q, re.IGNORECASE) for p in list(patterns))
+
+
+def _legacy_local(query):
+    q = query.lower()
+    for table in (dict(WALRUS_INFO_PATTERNS), dict(SUI_INFO_PATTERNS)):
+        for key, patterns in table.items():
+            for pattern in patterns:
+                if re.search(pattern, q, re.IGNORECASE):
+                    return key
+    return None
+
+
+def legacy_request(query):
+    """Intent checks one search_sui_docs request used to make before the classifier."""
+    if not _any(BLOCKCHAIN_TERMS, query):
+        return
+    if _any(PRICE_TERMS, query):
+        _any(WALRUS_TERMS, query)
+    if _any(STATS_TERMS, query):
+        _any(WALRUS_TERMS, query)
+        _any(SUI_STATS_TERMS, query)
+    if _legacy_local(query):
+        return
+    # External tiers re-check Walrus/blockchain intent inside each search helper
+    for _ in range(4):
+        _any(WALRUS_TERMS, query)
+    _any(BLOCKCHAIN_TERMS, query)
+    _any(BLOCKCHAIN_TERMS, query)
+    _any(WALRUS_TERMS, query)
+    _any(NETWORK_TERMS, query)
+
+
+def classifier_request(query):
+    """The same request now: one uncached pass (later calls hit the lru_cache)."""
+    _classify(query)
+
+
+def main(number: int = 2000) -> None:
+    print(f"{'query':<48} {'legacy us':>10} {'compiled us':>12} {'speedup':>8}")
+    total_legacy = total_new = 0.0
+    for query in QUERIES:
+        legacy = timeit.timeit(lambda: legacy_request(query), number=number) / number * 1e6
+        compiled = timeit.timeit(lambda: classifier_request(query), number=number) / number * 1e6
+        total_legacy += legacy
+        total_new += compiled
+        label = query if len(query) <= 45 else query[:42] + "..."
+        print(f"{label:<48} {legacy:>10.1f} {compiled:>12.1f} {legacy / compiled:>7.1f}x")
+    print(f"{'total':<48} {total_legacy:>10.1f} {total_new:>12.1f} {total_legacy / total_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# ======================
+# benchmarks/bench_prompt_cache_ttft.py
+# ======================
+"""Time to first token with a stable prompt prefix vs. one that defeats the provider's prompt cache.
+
+Both variants send the same question and a local-knowledge context (~2k prompt
+tokens, above OpenAI's 1024-token caching minimum). The "cold" variant puts a
+random nonce at the very start of the system prompt so no prefix ever matches.
+Needs a real OPENAI_API_KEY and makes ``2 * rounds`` small streamed completions.
+Run from the repository root:
+
+    python -m benchmarks.bench_prompt_cache_ttft [rounds]
+"""
+import asyncio
+import secrets
+import statistics
+import sys
+import time
+
+from app.core.config import settings
+from app.data.walrus_info import WALRUS_INFO
+from app.services.ai_service import AIService
+from app.services.prompts import CHAT_PROMPT
+
+QUESTION = "How does Walrus store blobs and how long are they kept?"
+
+
+async def first_token(service: AIService, messages):
+    """Seconds until the first content chunk, and the cached prompt tokens the response reported."""
+    kwargs = service._completion_kwargs(messages)
+    kwargs["max_tokens"] = 16
+    start = time.perf_counter()
+    stream = await service.async_client.chat.completions.create(
+        **kwargs, stream=True, stream_options={"include_usage": True}
+    )
+    ttft, cached = None, 0
+    async for chunk in stream:
+        if ttft is None and chunk.choices and chunk.choices[0].delta.content:
+            ttft = time.perf_counter() - start
+        if getattr(chunk, "usage", None) is not None:
+            details = chunk.usage.prompt_tokens_details
+            cached = (details.cached_tokens or 0) if details else 0
+    return ttft if ttft is not None else time.perf_counter() - start, cached
+
+
+async def main(rounds: int = 10) -> None:
+    service = AIService()
+    context = service.context_assembler.assemble(QUESTION, "\n\n".join(WALRUS_INFO.values()))
+    warm = CHAT_PROMPT.messages(QUESTION, context)
+    results = {"warm": [], "cold": []}
+    # Prime the cache once so the first warm round is not a miss
+    await first_token(service, warm)
+    for _ in range(rounds):
+        cold = [{"role": "system", "content": f"[{secrets.token_hex(8)}] {CHAT_PROMPT.system}"}, warm[1]]
+        results["cold"].append(await first_token(service, cold))
+        results["warm"].append(await first_token(service, warm))
+    await service.aclose()
+
+    print(f"model={settings.ai_model} prompt={CHAT_PROMPT.version} rounds={rounds}")
+    print(f"{'variant':<8} {'p50 ttft ms':>12} {'p90 ttft ms':>12} {'cached tokens':>14}")
+    for variant, samples in results.items():
+        ttfts = sorted(ttft for ttft, _ in samples)
+        p90 = ttfts[min(len(ttfts) - 1, int(0.9 * len(ttfts)))]
+        cached = statistics.mean(cached for _, cached in samples)
+        print(f"{variant:<8} {statistics.median(ttfts) * 1000:>12.0f} {p90 * 1000:>12.0f} {cached:>14.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10))
@@ -0,0 +1,278 @@
+# ======================
+# benchmarks/load_test.py
+# ======================
+"""Drive /api/v1/chat against local upstream stubs and report throughput and tail latency.
+
+Starts ``benchmarks.stub_upstreams`` and the app (uvicorn, or gunicorn with
+``--workers``) pointed at the stubs, sends a realistic query mix for
+``--duration`` seconds and prints throughput and p50/p95/p99 latency. Nothing
+leaves the machine and no API keys are needed. Run from the repository root:
+
+    # closed loop: 32 clients, each sending its next request as soon as the last returns
+    python -m benchmarks.load_test --concurrency 32 --duration 30
+
+    # open loop: 50 requests/s on a fixed schedule, slow OpenAI and a flaky Tavily
+    python -m benchmarks.load_test --qps 50 --latency openai=0.8 --error-rate tavily=0.1
+
+In open-loop mode latency is measured from each request's scheduled send time,
+so a stalled server shows up in the percentiles instead of silently lowering the
+offered load. Answer, semantic and search caches are off unless ``--cache`` is
+given, so every request runs the full pipeline; any other app setting is taken
+from the environment (e.g. SPECULATIVE_GENERATION_ENABLED=true). Pass
+``--max-p95-ms`` / ``--max-error-rate`` to exit non-zero on a regression.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.stub_upstreams import PROVIDERS, add_fault_arguments, base_url_env
+
+# Local-knowledge, Walrus, live price/stats, external-search and off-topic queries, roughly in production proportions
+QUERIES = [
+    "What is Sui?",
+    "What is the Move programming language?",
+    "How does Sui consensus work?",
+    "What are Sui objects and how does ownership work?",
+    "What is Walrus storage?",
+    "How does Walrus store blobs and how long are they kept?",
+    "How many validators does Walrus have?",
+    "What is the current Walrus token price?",
+    "How many transactions per second does the Sui network process right now?",
+    "How do I write a Move module that mints an NFT on Sui?",
+    "How do I integrate Walrus storage into a Sui dApp?",
+    "What are the gas fees for publishing a package on Sui testnet?",
+    "How do I use programmable transaction blocks with the TypeScript SDK?",
+    "What is the difference between shared and owned objects in Sui?",
+    "Explain zkLogin on Sui",
+    "What is the weather in Paris today?",
+]
+
+
+@dataclass
+class Results:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    started: float = 0.0
+    finished: float = 0.0
+
+    def record(self, latency: float, status: str) -> None:
+        self.statuses[status] += 1
+        if status == "200":
+            self.latencies.append(latency)
+
+    @property
+    def total(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def errors(self) -> int:
+        return self.total - self.statuses["200"]
+
+    def percentile(self, p: float) -> float:
+        """Nearest-rank percentile of successful request latencies, in milliseconds."""
+        if not self.latencies:
+            return float("nan")
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] * 1000
+
+    def summary(self) -> Dict:
+        elapsed = max(self.finished - self.started, 1e-9)
+        return {
+            "requests": self.total,
+            "errors": self.errors,
+            "error_rate": self.errors / self.total if self.total else 0.0,
+            "throughput_rps": self.statuses["200"] / elapsed,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(self.latencies) * 1000 if self.latencies else float("nan"),
+            "statuses": dict(self.statuses),
+        }
+
+
+async def _send(client: httpx.AsyncClient, query: str, sent_at: float, results: Results, record: bool) -> None:
+    try:
+        response = await client.post("/api/v1/chat", json={"query": query})
+        status = str(response.status_code)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    if record:
+        results.record(time.perf_counter() - sent_at, status)
+
+
+async def closed_loop(client: httpx.AsyncClient, concurrency: int, duration: float, warmup: float) -> Results:
+    results, queries = Results(), itertools.cycle(QUERIES)
+    start = time.perf_counter()
+    results.started, end = start + warmup, start + warmup + duration
+
+    async def user() -> None:
+        while (now := time.perf_counter()) < end:
+            await _send(client, next(queries), now, results, record=now >= results.started)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    results.finished = time.perf_counter()
+    return results
+
+
+async def open_loop(client: httpx.AsyncClient, qps: float, duration: float, warmup: float) -> Results:
+    results, queries, tasks = Results(), itertools.cycle(QUERIES), []
+    start = time.perf_counter()
+    results.started = start + warmup
+    for i in range(int((warmup + duration) * qps)):
+        scheduled = start + i / qps
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        tasks.append(asyncio.create_task(
+            _send(client, next(queries), scheduled, results, record=scheduled >= results.started)
+        ))
+    await asyncio.gather(*tasks)
+    results.finished = time.perf_counter()
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout:.0f}s")
+
+
+def _stub_command(args: argparse.Namespace) -> List[str]:
+    command = [sys.executable, "-m", "benchmarks.stub_upstreams", "--port", str(args.stub_port),
+               "--jitter", str(args.jitter), "--error-status", str(args.error_status),
+               "--token-delay", str(args.token_delay)]
+    for value in args.latency:
+        command += ["--latency", value]
+    for value in args.error_rate:
+        command += ["--error-rate", value]
+    return command
+
+
+def _app_command(args: argparse.Namespace, port: int) -> List[str]:
+    if args.workers > 1:
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "main:app"]
+    return [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log"]
+
+
+def _app_env(args: argparse.Namespace, port: int) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        **base_url_env("127.0.0.1", args.stub_port),
+        "OPENAI_API_KEY": "load-test-key",
+        "TAVILY_API_KEY": "load-test-key",
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WEB_WORKERS": str(args.workers),
+        "LOG_LEVEL": "WARNING",
+    }
+    if not args.cache:
+        env.update({"ANSWER_CACHE_ENABLED": "false", "SEMANTIC_CACHE_ENABLED": "false",
+                    "SEARCH_CACHE_ENABLED": "false"})
+    return env
+
+
+def print_report(args: argparse.Namespace, summary: Dict) -> None:
+    mode = f"qps={args.qps:g}" if args.qps else f"concurrency={args.concurrency}"
+    print(f"{mode} duration={args.duration:g}s requests={summary['requests']} errors={summary['errors']} "
+          f"({summary['error_rate']:.1%}) statuses={summary['statuses']}")
+    print(f"{'throughput rps':>15} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    print(f"{summary['throughput_rps']:>15.1f} {summary['p50_ms']:>9.1f} {summary['p95_ms']:>9.1f} "
+          f"{summary['p99_ms']:>9.1f} {summary['max_ms']:>9.1f}")
+
+
+async def run(args: argparse.Namespace, base_url: str) -> Dict:
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        if args.qps:
+            results = await open_loop(client, args.qps, args.duration, args.warmup)
+        else:
+            results = await closed_loop(client, args.concurrency, args.duration, args.warmup)
+    return results.summary()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--concurrency", type=int, default=16, help="closed-loop clients (default)")
+    load.add_argument("--qps", type=float, help="open-loop arrival rate in requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="seconds of load before measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client timeout per request")
+    parser.add_argument("--workers", type=int, default=1, help="app workers; more than 1 runs gunicorn")
+    parser.add_argument("--cache", action="store_true", help="keep the answer, semantic and search caches on")
+    parser.add_argument("--target", help="load an already running app at this URL instead of starting one")
+    parser.add_argument("--stub-port", type=int, default=9100, help="first of the stubs' six ports")
+    parser.add_argument("--json", help="also write the summary to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the app's and stubs' log output")
+    parser.add_argument("--max-p95-ms", type=float, help="exit 1 if p95 latency is above this")
+    parser.add_argument("--max-error-rate", type=float, help="exit 1 if the error rate is above this fraction")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    processes = []
+    try:
+        output = None if args.verbose else subprocess.DEVNULL
+        stubs = subprocess.Popen(_stub_command(args), stdout=output, stderr=output)
+        processes.append(stubs)
+        for i in range(len(PROVIDERS)):
+            _wait_for_port(args.stub_port + i, stubs)
+
+        base_url = args.target
+        if base_url is None:
+            port = _free_port()
+            app = subprocess.Popen(_app_command(args, port), env=_app_env(args, port), stdout=output, stderr=output)
+            processes.append(app)
+            _wait_for_port(port, app, timeout=60)
+            base_url = f"http://127.0.0.1:{port}"
+
+        summary = asyncio.run(run(args, base_url))
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    print_report(args, summary)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), **summary}, f, indent=2)
+
+    failed = []
+    if args.max_p95_ms is not None and not summary["p95_ms"] <= args.max_p95_ms:
+        failed.append(f"p95 {summary['p95_ms']:.1f}ms > {args.max_p95_ms:g}ms")
+    if args.max_error_rate is not None and summary["error_rate"] > args.max_error_rate:
+        failed.append(f"error rate {summary['error_rate']:.1%} > {args.max_error_rate:.1%}")
+    if failed:
+        print(f"FAILED: {'; '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
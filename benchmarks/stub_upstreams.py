@@ -0,0 +1,255 @@
+# ======================
+# benchmarks/stub_upstreams.py
+# ======================
+"""Local stand-ins for every upstream the chat pipeline calls, with injectable latency and errors.
+
+Each provider gets its own port (so its own connection pool in the app), starting at ``--port``:
+
+    openai +0, tavily +1, duckduckgo +2, coingecko +3, walrusscan +4, suiscan +5
+
+Responses have the shape the app parses; the content is canned. Faults are set
+per provider as ``NAME=VALUE`` (or a bare value for every provider):
+
+    python -m benchmarks.stub_upstreams --latency 0.05 --latency openai=0.8 --error-rate tavily=0.1
+
+and the app is pointed at the stubs with the environment variables printed on
+startup. ``benchmarks/load_test.py`` starts this module itself.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+PROVIDERS = ("openai", "tavily", "duckduckgo", "coingecko", "walrusscan", "suiscan")
+# Path prefix the app's base URL setting must carry for each provider
+BASE_PATHS = {"openai": "/v1", "coingecko": "/api/v3", "walrusscan": "/api/v1", "suiscan": "/api/v1"}
+
+ANSWER = (
+    "Sui is a layer 1 blockchain that uses the Move language and an object-centric data model. "
+    "Walrus is a decentralized storage network built on Sui that stores large blobs with erasure coding."
+)
+SNIPPET = (
+    "Sui executes independent transactions in parallel because objects with a single owner need no consensus. "
+    "Walrus encodes blobs with RedStuff and pays storage nodes in WAL for each storage epoch."
+)
+
+
+@dataclass
+class Fault:
+    """Delay every response by ~``latency`` seconds and fail ``error_rate`` of them with ``error_status``."""
+    latency: float = 0.0
+    jitter: float = 0.2
+    error_rate: float = 0.0
+    error_status: int = 503
+
+    async def inject(self) -> None:
+        if self.latency > 0:
+            await asyncio.sleep(max(0.0, random.gauss(self.latency, self.latency * self.jitter)))
+        if self.error_rate > 0 and random.random() < self.error_rate:
+            raise HTTPException(status_code=self.error_status, detail="injected failure")
+
+
+def _openai_app(fault: Fault, token_delay: float) -> FastAPI:
+    app = FastAPI()
+
+    def _usage(prompt: int, completion: int) -> Dict:
+        return {
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "total_tokens": prompt + completion,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await fault.inject()
+        completion_id, created, model = f"chatcmpl-{uuid.uuid4().hex}", int(time.time()), body.get("model", "stub")
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+        words = ANSWER.split(" ")
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": ANSWER},
+                    "finish_reason": "stop",
+                }],
+                "usage": _usage(prompt_tokens, len(words)),
+            }
+
+        def chunk(delta: Dict, finish_reason: Optional[str] = None, usage: Optional[Dict] = None) -> str:
+            choices = [] if usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                       "model": model, "choices": choices, "usage": usage}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            for i, word in enumerate(words):
+                if token_delay > 0:
+                    await asyncio.sleep(token_delay)
+                yield chunk({"content": word if i == 0 else f" {word}"})
+            yield chunk({}, finish_reason="stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield chunk({}, usage=_usage(prompt_tokens, len(words)))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def _tavily_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/search")
+    async def search(request: Request):
+        body = await request.json()
+        await fault.inject()
+        results = [
+            {"title": f"Result {i} for {body.get('query', '')[:40]}", "url": f"https://docs.sui.io/{i}", "content": SNIPPET}
+            for i in range(min(int(body.get("max_results", 5)), 5))
+        ]
+        return {"query": body.get("query"), "answer": None, "results": results}
+
+    return app
+
+
+def _duckduckgo_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/")
+    async def search(q: str = ""):
+        await fault.inject()
+        return {
+            "AbstractText": SNIPPET,
+            "RelatedTopics": [{"Text": f"{q[:40]} - related topic {i}"} for i in range(3)],
+            "results": [{"title": "Sui Documentation", "abstract": SNIPPET}],
+        }
+
+    return app
+
+
+def _coingecko_app(fault: Fault) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v3/search")
+    async def search(query: str = ""):
+        await fault.inject()
+        return {"coins": [{"id": "walrus-2", "name": "Walrus", "symbol": "WAL"}]}
+
+    @app.get("/api/v3/simple/price")
+    async def price(ids: str = ""):
+        await fault.inject()
+        return {coin_id: {"usd": round(random.uniform(0.3, 0.6), 4)} for coin_id in ids.split(",") if coin_id}
+
+    return app
+
+
+def _network_stats_app(fault: Fault, extra: Dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/network/stats")
+    async def stats():
+        await fault.inject()
+        return {"validators": {"total": 103}, "network": {"total_stake": 1_250_000_000, **extra}}
+
+    return app
+
+
+def build_apps(faults: Dict[str, Fault], token_delay: float = 0.0) -> Dict[str, FastAPI]:
+    return {
+        "openai": _openai_app(faults["openai"], token_delay),
+        "tavily": _tavily_app(faults["tavily"]),
+        "duckduckgo": _duckduckgo_app(faults["duckduckgo"]),
+        "coingecko": _coingecko_app(faults["coingecko"]),
+        "walrusscan": _network_stats_app(faults["walrusscan"], {"active_nodes": 120}),
+        "suiscan": _network_stats_app(faults["suiscan"], {"tps": 850}),
+    }
+
+
+def base_url_env(host: str, port: int) -> Dict[str, str]:
+    """Environment that points the app's provider base URL settings at stubs served from ``port``."""
+    return {
+        f"{provider.upper()}_BASE_URL": f"http://{host}:{port + i}{BASE_PATHS.get(provider, '')}"
+        for i, provider in enumerate(PROVIDERS)
+    }
+
+
+def parse_per_provider(values: List[str], cast=float) -> Dict[str, float]:
+    """``["0.05", "openai=0.8"]`` -> a value for every provider, later and named entries winning."""
+    parsed: Dict[str, float] = {}
+    for item in values or []:
+        name, sep, value = item.rpartition("=")
+        if not sep:
+            parsed.update({provider: cast(value) for provider in PROVIDERS})
+        elif name in PROVIDERS:
+            parsed[name] = cast(value)
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown provider {name!r}, expected one of {', '.join(PROVIDERS)}")
+    return parsed
+
+
+def add_fault_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", action="append", default=[], metavar="[NAME=]SECONDS",
+                        help="mean injected latency, for every provider or one NAME (repeatable)")
+    parser.add_argument("--error-rate", action="append", default=[], metavar="[NAME=]FRACTION",
+                        help="fraction of responses that fail (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--jitter", type=float, default=0.2, help="latency standard deviation as a fraction of the mean")
+    parser.add_argument("--token-delay", type=float, default=0.005,
+                        help="seconds between streamed OpenAI chunks")
+
+
+def faults_from_args(args: argparse.Namespace) -> Dict[str, Fault]:
+    latency = parse_per_provider(args.latency)
+    error_rate = parse_per_provider(args.error_rate)
+    return {
+        provider: Fault(
+            latency=latency.get(provider, 0.0),
+            jitter=args.jitter,
+            error_rate=error_rate.get(provider, 0.0),
+            error_status=args.error_status,
+        )
+        for provider in PROVIDERS
+    }
+
+
+async def serve(host: str, port: int, faults: Dict[str, Fault], token_delay: float) -> None:
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=host, port=port + i, log_level="warning", access_log=False))
+        for i, app in enumerate(build_apps(faults, token_delay).values())
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100, help="first of six consecutive ports")
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    faults = faults_from_args(args)
+
+    for provider, fault in faults.items():
+        print(f"{provider:<11} latency={fault.latency * 1000:.0f}ms error_rate={fault.error_rate:.1%}", flush=True)
+    for name, value in base_url_env(args.host, args.port).items():
+        print(f"export {name}={value}", flush=True)
+    asyncio.run(serve(args.host, args.port, faults, args.token_delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# ======================
+# gunicorn.conf.py
+# ======================
+"""Production server: gunicorn master with one uvicorn worker per CPU core.
+
+    gunicorn -c gunicorn.conf.py main:app
+
+The app is imported and warmed up (knowledge base, indexes, compiled patterns,
+tokenizer, SSL context) once in the master, then the GC is frozen and workers
+fork from it, sharing those pages copy-on-write. Connection pools, the OpenAI
+client's sockets and the live-data refresher are created per worker in the
+FastAPI lifespan, since sockets and event loops must not cross a fork.
+
+Each worker keeps its own in-memory search and semantic caches; set
+ANSWER_CACHE_BACKEND=redis so answers are shared by every worker.
+"""
+import multiprocessing
+
+from app.core.config import settings
+
+bind = f"{settings.host}:{settings.port}"
+workers = settings.web_workers or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = settings.web_worker_timeout
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+loglevel = settings.log_level.lower()
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before any worker forks
+    from app.core.warmup import freeze_for_fork, warm_up
+
+    if workers > 1 and settings.answer_cache_enabled and settings.answer_cache_backend == "memory":
+        server.log.warning(f"{workers} workers with ANSWER_CACHE_BACKEND=memory: "
+                           "each worker caches answers separately, use redis to share them")
+    warm_up()
+    freeze_for_fork()
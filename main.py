@@ -1,14 +1,21 @@
 # ======================
 # main.py
 # ======================
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+import time
 import uvicorn
 
 from app.core.config import settings
+from app.core.http_client import close_http_client
+from app.core.dependencies import get_ai_service, get_search_service
+from app.core.warmup import warm_up
 from app.api.routes.chat import router as chat_router
 from app.utils.logger import get_logger
+from app.utils.metrics import HTTP_REQUESTS, HTTP_SECONDS, IN_FLIGHT, render_metrics
+from app.utils.tracing import incoming_request_id, request_context, span
 
 logger = get_logger(__name__)
 
@@ -18,9 +25,17 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info(f"Starting {settings.app_name} v{settings.version}")
     logger.info(f"Debug mode: {settings.debug}")
+    # Already done in the gunicorn master when preloading; cheap to repeat per worker
+    warm_up()
+    search_service = get_search_service()
+    if settings.live_data_refresh_enabled:
+        search_service.live_data.start()
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await search_service.live_data.stop()
+    await close_http_client()
+    await get_ai_service().aclose()
 
 
 # Create FastAPI app
@@ -46,6 +61,48 @@ app.add_middleware(
 app.include_router(chat_router, prefix="/api/v1", tags=["chat"])
 
 
+def _route_label(request: Request) -> str:
+    """The request path if it is one of the API's routes, else "other", so metric labels stay bounded."""
+    path = request.url.path
+    return path if path in app.openapi()["paths"] or path == "/metrics" else "other"
+
+
+if settings.metrics_enabled:
+    @app.middleware("http")
+    async def record_request_metrics(request: Request, call_next):
+        route = _route_label(request)
+        start = time.perf_counter()
+        status = 500
+        with IN_FLIGHT.track_inprogress(route=route):
+            try:
+                response = await call_next(request)
+                status = response.status_code
+                return response
+            finally:
+                HTTP_SECONDS.observe(time.perf_counter() - start, route=route)
+                HTTP_REQUESTS.inc(route=route, status=str(status))
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.middleware("http")
+async def trace_request(request: Request, call_next):
+    # Honour a caller-supplied ID so logs can be joined across services
+    request_id = incoming_request_id(request.headers.get("X-Request-ID"))
+    route = _route_label(request)
+    with request_context(request_id), span(
+        f"{request.method} {route}",
+        {"http.request.method": request.method, "http.route": route, "url.path": request.url.path},
+        kind="SERVER",
+    ) as request_span:
+        response = await call_next(request)
+        request_span.set_attribute("http.response.status_code", response.status_code)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+
 @app.get("/")
 async def root():
 
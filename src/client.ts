@@ -1,5 +1,5 @@
 // SUI Chatbot API Client
-import { ChatRequest, ChatResponse } from '../types/api';
+import { ChatRequest, ChatResponse, ChatStreamEvent } from '../types/api';
 
 /**
  * Function to query the SUI Chatbot API
@@ -34,6 +34,49 @@ async function askSuiChatbot(query: string, apiKey?: string): Promise<ChatRespon
   }
 }
 
+/**
+ * Stream an answer from the SUI Chatbot API as Server-Sent Events
+ * @param query The question to ask about SUI blockchain
+ * @param onToken Called with each piece of the answer as it arrives
+ * @returns Promise with the final chat response
+ */
+async function streamSuiChatbot(query: string, onToken: (text: string) => void): Promise<ChatResponse> {
+  const response = await fetch('http://localhost:8000/api/v1/chat/stream', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ query } as ChatRequest),
+  });
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail?.message || 'Unknown error');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = block.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] ?? 'null');
+      const message = { event, data } as ChatStreamEvent;
+      if (message.event === 'token') onToken(message.data.text);
+      else if (message.event === 'done') return message.data;
+      else if (message.event === 'error') throw new Error(message.data.message);
+    }
+  }
+  throw new Error('Stream ended without a final response');
+}
+
 // Example usage
 async function example() {
   try {
@@ -46,4 +89,4 @@ async function example() {
 }
 
 // Export the function for use in other files
-export { askSuiChatbot, example };
\ No newline at end of file
+export { askSuiChatbot, streamSuiChatbot, example };
\ No newline at end of file
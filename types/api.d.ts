@@ -3,6 +3,8 @@
 export interface ChatRequest {
   query: string;
   api_key?: string;
+  /** Seconds the search may take before the AI answers without context (server default if omitted) */
+  search_deadline?: number;
 }
 
 export interface ChatResponse {
@@ -11,4 +13,32 @@ export interface ChatResponse {
   query: string;
   context_found: boolean;
   processing_time: number;
-}
\ No newline at end of file
+  cached: boolean;
+}
+
+export interface BatchChatRequest {
+  queries: string[];
+  search_deadline?: number;
+}
+
+export interface BatchChatResult {
+  success: boolean;
+  response: string | null;
+  query: string;
+  context_found: boolean;
+  cached: boolean;
+  error: string | null;
+}
+
+export interface BatchChatResponse {
+  results: BatchChatResult[];
+  total: number;
+  unique_queries: number;
+  processing_time: number;
+}
+
+/** Events sent by POST /api/v1/chat/stream */
+export type ChatStreamEvent =
+  | { event: 'token'; data: { text: string } }
+  | { event: 'done'; data: ChatResponse }
+  | { event: 'error'; data: { error: string; message: string } };
\ No newline at end of file